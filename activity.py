@@ -17,6 +17,7 @@
 """Pilas Activity.  Live interpreter to learn programming with games."""
 
 import gtk
+import time
 import logging
 
 from gettext import gettext as _
@@ -38,6 +39,8 @@ import copy
 base = os.environ['SUGAR_BUNDLE_PATH']
 os.chdir(base)
 
+import pilas_host
+
 qtlib = os.path.join(base, 'qt/lib/')
 new_env = copy.copy(os.environ)
 new_env['LD_LIBRARY_PATH'] = qtlib
@@ -47,6 +50,7 @@ class PilasActivity(activity.Activity):
 
     def __init__(self, handle):
         """Set up the Pilas activity."""
+        self._launch_time = time.time()
         activity.Activity.__init__(self, handle)
 
         # we do not have collaboration features,
@@ -91,8 +95,17 @@ class PilasActivity(activity.Activity):
         screen_width = gtk.gdk.screen_width()
         screen_height = gtk.gdk.screen_height()
 
-        Popen(["python", "pilas_plug.py", str(socket.get_id()),
-               str(screen_width), str(screen_height)], env=new_env)
+        # A warm host (see pilas_host.py) already has PyQt and pilas
+        # imported, so it can show the window much faster.
+        if pilas_host.request_embed(socket.get_id(), screen_width, screen_height):
+            self._launch_mode = "warm host"
+        else:
+            self._launch_mode = "new process"
+            Popen(["python", "pilas_plug.py", str(socket.get_id()),
+                   str(screen_width), str(screen_height)], env=new_env)
+            # Start the host now, so the next launch is warm.
+            Popen(["python", "pilas_host.py"], env=new_env)
 
     def _on_plugged_event(self, widget):
-        logging.info("Plug inserted")
+        logging.info("Plug inserted %.2f seconds after launch (%s)",
+                     time.time() - self._launch_time, self._launch_mode)
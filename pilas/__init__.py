@@ -9,19 +9,21 @@
 mundo = None
 bg = None
 
+import os
 import sys
-import utils
-from mundo import Mundo
-import actores
-import fondos
-import habilidades
-import eventos
-import sonidos
-import colores
-import atajos
-import escenas
-import ejemplos
-import interfaz
+import importador
+
+importador.medidor.instalar('al importar pilas')
+
+try:
+    import utils
+    import eventos
+    import colores
+
+    if utils.esta_en_sesion_interactiva():
+        utils.cargar_autocompletado()
+finally:
+    importador.medidor.desinstalar()
 
 __doc__ = """
 Módulo pilas
@@ -35,9 +37,6 @@ Este módulo contiene las funciones principales
 para iniciar y ejecutar la biblioteca.
 """
 
-if utils.esta_en_sesion_interactiva():
-    utils.cargar_autocompletado()
-
 def iniciar(ancho=640, alto=480, titulo='Pilas', usar_motor='qtgl', 
             rendimiento=60, modo='detectar', economico=True, 
             gravedad=(0, -90), pantalla_completa=False):
@@ -55,7 +54,7 @@ def iniciar(ancho=640, alto=480, titulo='Pilas', usar_motor='qtgl',
     :ancho: el tamaño en pixels para la ventana.
     :alto: el tamaño en pixels para la ventana.
     :titulo: el titulo a mostrar en la ventana.
-    :usar_motor: el motor multimedia a utilizar, puede ser 'qt' o 'qtgl'.
+    :usar_motor: el motor multimedia a utilizar, puede ser 'qt', 'qtgl', 'headless' (sin ventana) o 'headless_con_dibujo'.
     :rendimiento: cantidad de cuadros por segundo a mostrar.
     :modo: si se utiliza modo interactivo o no.
     :economico: si tiene que evitar consumir muchos recursos de procesador
@@ -66,9 +65,22 @@ def iniciar(ancho=640, alto=480, titulo='Pilas', usar_motor='qtgl',
     
     global mundo
 
-    motor = __crear_motor(usar_motor)
-    mundo = Mundo(motor, ancho, alto, titulo, rendimiento, economico, gravedad, pantalla_completa)
-    escenas.Normal(colores.grisclaro)
+    importador.medidor.instalar('al iniciar')
+
+    # Permite registrar una sesion de juego sin modificar el codigo.
+    if os.environ.get('PILAS_TRAZAS'):
+        import trazas
+        trazas.iniciar(os.environ['PILAS_TRAZAS'])
+
+    try:
+        from mundo import Mundo
+        import escenas
+
+        motor = __crear_motor(usar_motor, rendimiento)
+        mundo = Mundo(motor, ancho, alto, titulo, rendimiento, economico, gravedad, pantalla_completa)
+        escenas.Normal(colores.grisclaro)
+    finally:
+        importador.medidor.desinstalar()
 
 
 def ejecutar(ignorar_errores=False):
@@ -103,7 +115,7 @@ def version():
 
     return pilasversion.VERSION
 
-def __crear_motor(usar_motor):
+def __crear_motor(usar_motor, rendimiento=60):
     """Genera instancia del motor multimedia en base a un nombre.
     
     Esta es una función interna y no debe ser ejecutada
@@ -111,19 +123,27 @@ def __crear_motor(usar_motor):
 
     if usar_motor == 'qt':
         from motores import motor_qt
-        motor = motor_qt.Qt()
+        motor = motor_qt.Qt(rendimiento)
     elif usar_motor == 'qtgl':
         from motores import motor_qt
-        motor = motor_qt.QtGL()
+        motor = motor_qt.QtGL(rendimiento)
+    elif usar_motor == 'headless':
+        from motores import motor_headless
+        motor = motor_headless.Headless(rendimiento=rendimiento)
+    elif usar_motor == 'headless_con_dibujo':
+        from motores import motor_headless
+        motor = motor_headless.Headless(dibujar=True, rendimiento=rendimiento)
     else:
         print "El motor multimedia seleccionado (%s) no esta disponible" %(usar_motor)
-        print "Las opciones de motores que puedes probar son 'qt' y 'qtgl'."
+        print "Las opciones de motores que puedes probar son 'qt', 'qtgl' y 'headless'."
         sys.exit(1)
 
     return motor
 
 def reiniciar():
     """Elimina todos los actores y vuelve al estado inicial."""
+    import actores
+
     actores.utils.eliminar_a_todos()
     mundo.reiniciar()
 
@@ -138,6 +158,8 @@ def avisar(mensaje):
         >>> pilas.avisar("Use la tecla <esc> para terminar el programa")
     """
     global anterior_texto
+    import actores
+
     izquierda, derecha, arriba, abajo = utils.obtener_bordes()
 
     if anterior_texto:
@@ -170,3 +192,59 @@ def abrir_cargador():
         print "Lo siento, no tienes instalada la extesion de ejemplos."
         print "Instale el paquete 'pilas-examples' para continuar."
     return []
+
+def imprimir_reporte_de_inicio():
+    """Muestra cuanto tiempo llevo importar cada modulo, y por que se importo.
+
+    Sirve para detectar los modulos que demoran el inicio de pilas.
+    """
+    importador.imprimir_reporte_de_inicio()
+
+def imprimir_tiempos_por_fase():
+    """Muestra cuanto tardo cada fase (fisica, actores, dibujado...) en los ultimos cuadros.
+
+    Sirve para saber que parte del juego hay que optimizar, la tecla
+    F6 muestra los mismos tiempos como un grafico.
+    """
+    mundo.motor.perfilador.imprimir_estadisticas()
+
+def imprimir_costos_por_clase(cantidad=None):
+    """Muestra cuanto tarda cada clase de actor en actualizarse y dibujarse.
+
+    Los costos solo se miden mientras esta activo el modo depuracion
+    F5, o si se habilita ``pilas.mundo.motor.perfilador.medir_actores``.
+    """
+    mundo.motor.perfilador.imprimir_costos_por_clase(cantidad)
+
+# Estos modulos se importan recien la primera vez que se usan, asi
+# 'import pilas' es mucho mas rapido.
+importador.hacer_perezoso(__name__, {
+    'Mundo': 'mundo',
+    'actores': 'actores',
+    'atajos': 'atajos',
+    'cache': 'cache',
+    'camara': 'camara',
+    'colisiones': 'colisiones',
+    'comportamientos': 'comportamientos',
+    'control': 'control',
+    'depurador': 'depurador',
+    'ejemplos': 'ejemplos',
+    'escenas': 'escenas',
+    'fisica': 'fisica',
+    'fondos': 'fondos',
+    'fps': 'fps',
+    'grupo': 'grupo',
+    'habilidades': 'habilidades',
+    'imagenes': 'imagenes',
+    'interfaz': 'interfaz',
+    'interpolaciones': 'interpolaciones',
+    'motores': 'motores',
+    'paquete': 'paquete',
+    'perfilador': 'perfilador',
+    'precarga': 'precarga',
+    'pytweener': 'pytweener',
+    'recursos': 'recursos',
+    'simbolos': 'simbolos',
+    'sonidos': 'sonidos',
+    'tareas': 'tareas',
+})
@@ -12,6 +12,7 @@ import math
 import pilas
 import utils
 from actor import Actor
+from pilas import importador
 
 todos = []
 
@@ -35,37 +36,40 @@ escribir la siguiente sentencia:
 
 
 
-from mono import Mono
-from ejes import Ejes
-from animado import Animado
-from animacion import Animacion
-from explosion import Explosion
-from bomba import Bomba
-from pingu import Pingu
-from banana import Banana
-from texto import Texto
-from temporizador import Temporizador
-from moneda import Moneda
-from pizarra import Pizarra
-from pelota import Pelota
-from puntaje import Puntaje
-from estrella import Estrella
-from caja import Caja
-from nave import Nave
-from disparo import Disparo
-from cursordisparo import CursorDisparo
-from piedra import Piedra
-from menu import Menu
-from opcion import Opcion
-from tortuga import Tortuga
-from mapa import Mapa
-from martian import Martian
-from boton import Boton
-from entradadetexto import EntradaDeTexto
-from aceituna import Aceituna
-from globo import Globo
-from dialogo import Dialogo
-from globoelegir import GloboElegir
-from pausa import Pausa
-from mano import CursorMano
-from cooperativista import Cooperativista
+# Cada actor se importa recien la primera vez que se usa.
+importador.hacer_perezoso(__name__, {
+    'Mono': 'mono',
+    'Ejes': 'ejes',
+    'Animado': 'animado',
+    'Animacion': 'animacion',
+    'Explosion': 'explosion',
+    'Bomba': 'bomba',
+    'Pingu': 'pingu',
+    'Banana': 'banana',
+    'Texto': 'texto',
+    'Temporizador': 'temporizador',
+    'Moneda': 'moneda',
+    'Pizarra': 'pizarra',
+    'Pelota': 'pelota',
+    'Puntaje': 'puntaje',
+    'Estrella': 'estrella',
+    'Caja': 'caja',
+    'Nave': 'nave',
+    'Disparo': 'disparo',
+    'CursorDisparo': 'cursordisparo',
+    'Piedra': 'piedra',
+    'Menu': 'menu',
+    'Opcion': 'opcion',
+    'Tortuga': 'tortuga',
+    'Mapa': 'mapa',
+    'Martian': 'martian',
+    'Boton': 'boton',
+    'EntradaDeTexto': 'entradadetexto',
+    'Aceituna': 'aceituna',
+    'Globo': 'globo',
+    'Dialogo': 'dialogo',
+    'GloboElegir': 'globoelegir',
+    'Pausa': 'pausa',
+    'CursorMano': 'mano',
+    'Cooperativista': 'cooperativista',
+})
@@ -71,6 +71,9 @@ class Actor(object, Estudiante):
 
         # Define el nivel de lejanía respecto del observador.
         self.z = 0
+        # Los actores estaticos se pueden dibujar desde una capa
+        # guardada en lugar de hacerlo en cada cuadro.
+        self.estatico = False
         self._espejado = False
         self.radio_de_colision = 10
         pilas.actores.utils.insertar_como_nuevo_actor(self)
@@ -137,6 +140,40 @@ class Actor(object, Estudiante):
     def dibujar(self, aplicacion):
         self._actor.dibujar(aplicacion)
 
+    def obtener_bordes_en_pantalla(self, motor):
+        """Retorna el area (izquierda, arriba, derecha, abajo) que ocupa el actor en pantalla.
+
+        El motor usa esta area para evitar dibujar a los actores que
+        quedan fuera de la camara. Si el actor redefine el metodo
+        ``dibujar`` no se puede conocer su area, asi que retorna None.
+        """
+        if self.__class__.dibujar.im_func is not Actor.dibujar.im_func:
+            return None
+
+        return self._actor.obtener_bordes_en_pantalla(motor)
+
+    def obtener_firma(self):
+        """Retorna un valor que cambia cada vez que el actor se ve distinto en pantalla.
+
+        Lo utiliza el modo de dibujado parcial del motor para saber que
+        actores se tienen que volver a dibujar. Retorna None si el actor
+        redefine el metodo ``dibujar``.
+        """
+        if self.__class__.dibujar.im_func is not Actor.dibujar.im_func:
+            return None
+
+        return self._actor.obtener_firma()
+
+    def obtener_fragmento(self, motor):
+        """Retorna una tupla (pixmap, fragmento) para que el motor dibuje al actor en un lote.
+
+        Retorna None si el actor se tiene que dibujar por separado.
+        """
+        if self.__class__.dibujar.im_func is not Actor.dibujar.im_func:
+            return None
+
+        return self._actor.obtener_fragmento(motor)
+
     def get_x(self):
         x, y = self.obtener_posicion()
         return x
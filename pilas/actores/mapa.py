@@ -6,7 +6,10 @@
 #
 # Website - http://www.pilas-engine.com.ar
 
+from array import array
+
 import pilas
+from pilas import tiled
 from pilas.actores import Actor
 
 
@@ -24,16 +27,32 @@ class Mapa(Actor):
     **tiled** puedes escribir:
 
         >>> mapa = pilas.actores.Mapa('untitled2.tmx')
+
+    Los bloques no son actores: el mapa guarda el numero de cada
+    bloque en una grilla compacta, y los dibuja en trozos de 16x16
+    bloques que se generan una sola vez. Solo se dibujan los trozos
+    que estan dentro de la camara, y al pintar un bloque solo se
+    vuelve a generar el trozo que lo contiene.
+
+    Los bloques solidos vecinos se agrupan en rectangulos, y cada
+    rectangulo tiene una sola figura fisica.
     """
 
+    # Cantidad de bloques (a lo ancho y a lo alto) de cada trozo.
+    bloques_por_trozo = 16
+
     def __init__(self, grilla_o_mapa=None, x=0, y=0, restitucion=0.56):
         Actor.__init__(self, 'invisible.png', x, y)
         self.restitucion = restitucion
         self.figuras = []
-        self.bloques = []
+        self.estatico = True
+        self.trozos_generados = 0
+        self.bloques_solidos = 0
+        self._version = 0
+        self._figuras_modificadas = False
 
         if not grilla_o_mapa:
-            grilla_o_mapa = grilla = pilas.imagenes.cargar_grilla("grillas/plataformas_10_10.png", 10, 10)
+            grilla_o_mapa = pilas.imagenes.cargar_grilla("grillas/plataformas_10_10.png", 10, 10)
             
         self.grilla_o_mapa = grilla_o_mapa
 
@@ -44,74 +63,247 @@ class Mapa(Actor):
             self._ancho_cuadro = grilla_o_mapa.cuadro_ancho
             self._alto_cuadro = grilla_o_mapa.cuadro_alto
 
+            # Inicialmente el mapa ocupa toda la ventana, y crece si
+            # se pintan bloques fuera de ella.
+            ancho, alto = pilas.mundo.motor.obtener_area()
+            self._crear_grilla((alto + self._alto_cuadro - 1) / self._alto_cuadro,
+                    (ancho + self._ancho_cuadro - 1) / self._ancho_cuadro, 1)
+
     def _cargar_mapa(self, archivo):
         "Carga el escenario desde un archivo .tmz (del programa tiled)."
 
         archivo = pilas.utils.obtener_ruta_al_recurso(archivo)
-
-        # Carga los nodos principales.
-        nodo = pilas.utils.xmlreader.makeRootNode(archivo)
-        nodo_mapa = nodo.getChild('map')
-        nodo_tileset = nodo_mapa.getChild('tileset')
-
-        # Cantidad de bloques en el mapa.
-        self.columnas = int(nodo_mapa.getAttributeValue('width'))
-        self.filas = int(nodo_mapa.getAttributeValue('height'))
+        mapa = tiled.cargar(archivo)
 
         # Atributos de la imagen asociada al mapa.
-        self._ruta = nodo_tileset.getChild('image').getAttributeValue('source')
-        self._ruta = pilas.utils.obtener_ruta_al_recurso(self._ruta)
-
-        self._ancho_imagen = int(nodo_tileset.getChild('image').getAttributeValue('width'))
-        self._alto_imagen = int(nodo_tileset.getChild('image').getAttributeValue('height'))
-        self._ancho_cuadro = int(nodo_tileset.getAttributeValue('tilewidth'))
-        self._alto_cuadro = int(nodo_tileset.getAttributeValue('tileheight'))
+        self._ruta = pilas.utils.obtener_ruta_al_recurso(mapa.imagen)
+        self._ancho_imagen = mapa.ancho_imagen
+        self._alto_imagen = mapa.alto_imagen
+        self._ancho_cuadro = mapa.ancho_cuadro
+        self._alto_cuadro = mapa.alto_cuadro
 
         # Carga la grilla de imagenes desde el mapa.
         self.grilla = pilas.imagenes.cargar_grilla(self._ruta, 
                 self._ancho_imagen / self._ancho_cuadro, 
                 self._alto_imagen / self._alto_cuadro)
 
-        # Carga las capas del mapa.
-        layers = nodo.getChild('map').getChildren('layer')
-
-        if len(layers) == 0:
+        if len(mapa.capas) == 0:
             raise Exception("Debe tener al menos una capa (layer).")
 
-        # La capa 0 (inferior) define los bloques no-solidos.
-        self._crear_bloques(layers[0], solidos=False)
+        # Las capas guardan el numero de cuadro mas uno, y 0 en las celdas vacias.
+        self._crear_grilla(mapa.filas, mapa.columnas, 0)
+
+        for (nombre, bloques) in mapa.capas:
+            if mapa.primer_gid != 1:
+                bloques = array('H', [x and x - mapa.primer_gid + 1 for x in bloques])
+
+            self.capas.append(bloques)
+
+        # La capa 0 (inferior) define los bloques no-solidos, y
+        # el resto de las capas definen bloques solidos.
+        self._crear_figuras()
+
+    def _crear_grilla(self, filas, columnas, cantidad_de_capas):
+        "Crea capas vacias para un mapa de ``filas`` x ``columnas`` bloques."
+        self.filas = filas
+        self.columnas = columnas
+        self.capas = [array('H', [0]) * (filas * columnas) for x in range(cantidad_de_capas)]
+        self._trozos = {}
+        self._trozos_modificados = set()
+        self._version += 1
+
+    def _redimensionar(self, filas, columnas):
+        "Agranda el mapa conservando los bloques que ya estaban pintados."
+        capas = []
+
+        for anterior in self.capas:
+            capa = array('H', [0]) * (filas * columnas)
 
-        # El resto de las capas definen bloques solidos
-        for layer in layers[1:]:
-            self._crear_bloques(layer, solidos=True)
+            for fila in range(self.filas):
+                inicio = fila * self.columnas
+                capa[fila * columnas:fila * columnas + self.columnas] = anterior[inicio:inicio + self.columnas]
 
-    def _crear_bloques(self, capa, solidos):
-        "Genera actores que representan los bloques del escenario."
-        datos = capa.getChild('data').getData()
+            capas.append(capa)
 
-        # Convierte todo el mapa en una matriz de numeros.
-        bloques = [[int(x) for x in x.split(',') if x] for x in datos.split()]
+        self._crear_grilla(filas, columnas, 0)
+        self.capas = capas
 
-        for (y, fila) in enumerate(bloques):
-            for (x, bloque) in enumerate(fila):
-                if bloque:
-                    self.pintar_bloque(y, x, bloque -1, solidos)
+    def _obtener_capa(self, numero):
+        while len(self.capas) <= numero:
+            self.capas.append(array('H', [0]) * (self.filas * self.columnas))
+
+        return self.capas[numero]
+
+    def _crear_figuras(self):
+        "Vuelve a generar las figuras fisicas de todos los bloques solidos."
+        self._eliminar_figuras()
+        self._figuras_modificadas = False
+
+        if len(self.capas) < 2:
+            self.bloques_solidos = 0
+            return
+
+        solidos = [any(x) for x in zip(*self.capas[1:])]
+        self.bloques_solidos = solidos.count(True)
+
+        for (fila, columna, ancho, alto) in tiled.agrupar_en_rectangulos(solidos, self.columnas, self.filas):
+            self._crear_figura(fila, columna, ancho, alto)
+
+    def _crear_figura(self, fila, columna, ancho=1, alto=1):
+        "Crea una figura que ocupa ``ancho`` x ``alto`` bloques."
+        izquierda, arriba = self._obtener_esquina()
+        ancho, alto = ancho * self._ancho_cuadro, alto * self._alto_cuadro
+        figura = pilas.fisica.Rectangulo(
+                izquierda + columna * self._ancho_cuadro + ancho / 2, 
+                arriba - fila * self._alto_cuadro - alto / 2,
+                ancho, alto, dinamica=False, 
+                restitucion=self.restitucion)
+        self.figuras.append(figura)
+
+    def _eliminar_figuras(self):
+        for f in self.figuras:
+            f.eliminar()
+
+        self.figuras = []
 
     def pintar_bloque(self, fila, columna, indice, es_bloque_solido=False):
-        nuevo_bloque = pilas.actores.Actor('invisible.png')
-        nuevo_bloque.imagen = self.grilla
-        nuevo_bloque.imagen.definir_cuadro(indice)
-        nuevo_bloque.izquierda = columna * self._ancho_cuadro - 320
-        nuevo_bloque.arriba = -fila * self._alto_cuadro + 240
-        self.bloques.append(nuevo_bloque)
+        """Pinta el cuadro ``indice`` de la grilla en una celda del mapa.
+
+        Los bloques solidos se pintan sobre los no-solidos, y ademas
+        tienen una figura fisica. Las figuras se vuelven a agrupar en
+        la siguiente actualizacion del mapa.
+        """
+        if fila < 0 or columna < 0:
+            raise Exception("La fila y la columna del bloque no pueden ser negativas.")
+
+        if fila >= self.filas or columna >= self.columnas:
+            self._redimensionar(max(fila + 1, self.filas), max(columna + 1, self.columnas))
+
+        capa = self._obtener_capa(1 if es_bloque_solido else 0)
+        capa[fila * self.columnas + columna] = indice + 1
+        self._trozos_modificados.add((fila / self.bloques_por_trozo, columna / self.bloques_por_trozo))
+        self._version += 1
 
         if es_bloque_solido:
-            figura = pilas.fisica.Rectangulo(nuevo_bloque.izquierda + self._ancho_cuadro / 2, 
-                    nuevo_bloque.arriba - self._alto_cuadro / 2,
-                    self._ancho_cuadro, self._alto_cuadro, dinamica=False, 
-                    restitucion=self.restitucion)
-            self.figuras.append(figura)
+            self._figuras_modificadas = True
+
+    def actualizar(self):
+        if self._figuras_modificadas:
+            self._crear_figuras()
 
+    def obtener_estadisticas(self):
+        """Retorna un diccionario con la cantidad de bloques solidos, figuras y trozos.
+
+        Sin agrupar, cada bloque solido necesitaria su propia figura (un
+        cuerpo con una forma), asi que 'bloques_solidos' es la cantidad
+        de cuerpos que se ahorran al agrupar.
+        """
+        return {
+            'bloques_solidos': self.bloques_solidos,
+            'figuras': len(self.figuras),
+            'trozos': len([x for x in self._trozos.values() if x]),
+            'trozos_generados': self.trozos_generados,
+        }
+
+    def obtener_bloque(self, fila, columna, capa=0):
+        "Retorna el indice del cuadro pintado en una celda, o None si esta vacia."
+        if 0 <= fila < self.filas and 0 <= columna < self.columnas and capa < len(self.capas):
+            bloque = self.capas[capa][fila * self.columnas + columna]
+
+            if bloque:
+                return bloque - 1
+
+        return None
+
+    def _obtener_esquina(self):
+        "Retorna la posicion de la esquina superior izquierda del mapa."
+        return self.x - 320, self.y + 240
+
+    def _obtener_esquina_en_pantalla(self, motor):
+        izquierda, arriba = self._obtener_esquina()
+
+        if not self.fijo:
+            izquierda -= motor.camara_x
+            arriba -= motor.camara_y
+
+        centro_x, centro_y = motor.centro_fisico()
+        return izquierda + centro_x, centro_y - arriba
+
+    def dibujar(self, motor):
+        "Dibuja los trozos del mapa que estan dentro del area visible."
+        n = self.bloques_por_trozo
+        ancho_del_trozo = n * self._ancho_cuadro
+        alto_del_trozo = n * self._alto_cuadro
+        izquierda, arriba = self._obtener_esquina_en_pantalla(motor)
+        centro_x, centro_y = motor.centro_fisico()
+        x0, y0, x1, y1 = motor.obtener_area_visible()
+
+        primera_columna = max(int((x0 - izquierda) // ancho_del_trozo), 0)
+        ultima_columna = min(int((x1 - izquierda) // ancho_del_trozo), (self.columnas - 1) / n)
+        primera_fila = max(int((y0 - arriba) // alto_del_trozo), 0)
+        ultima_fila = min(int((y1 - arriba) // alto_del_trozo), (self.filas - 1) / n)
+
+        for fila in range(primera_fila, ultima_fila + 1):
+            for columna in range(primera_columna, ultima_columna + 1):
+                trozo = self._obtener_trozo(fila, columna)
+
+                if trozo:
+                    x = izquierda + columna * ancho_del_trozo - centro_x
+                    y = centro_y - (arriba + fila * alto_del_trozo)
+                    trozo.dibujar(motor, x, y, transparencia=self.transparencia)
+
+    def _obtener_trozo(self, fila, columna):
+        "Retorna la superficie de un trozo, o None si el trozo esta vacio."
+        clave = (fila, columna)
+
+        if clave in self._trozos and clave not in self._trozos_modificados:
+            return self._trozos[clave]
+
+        self._trozos_modificados.discard(clave)
+        self._trozos[clave] = self._generar_trozo(fila, columna, self._trozos.get(clave))
+        return self._trozos[clave]
+
+    def _generar_trozo(self, fila, columna, superficie=None):
+        "Pinta los bloques de un trozo sobre una superficie (reutilizando la anterior si existe)."
+        n = self.bloques_por_trozo
+        ancho, alto = self._ancho_cuadro, self._alto_cuadro
+        bloques = []
+
+        for capa in self.capas:
+            for f in range(fila * n, min(fila * n + n, self.filas)):
+                inicio = f * self.columnas
+
+                for c in range(columna * n, min(columna * n + n, self.columnas)):
+                    if capa[inicio + c]:
+                        bloques.append((f - fila * n, c - columna * n, capa[inicio + c] - 1))
+
+        if not bloques:
+            return None
+
+        if superficie:
+            superficie.limpiar()
+        else:
+            superficie = pilas.imagenes.cargar_superficie(n * ancho, n * alto)
+
+        columnas_de_la_grilla = self.grilla.columnas
+
+        with superficie.lote():
+            for (f, c, cuadro) in bloques:
+                superficie.pintar_parte_de_imagen(self.grilla,
+                        (cuadro % columnas_de_la_grilla) * ancho,
+                        (cuadro / columnas_de_la_grilla) * alto,
+                        ancho, alto, c * ancho, f * alto)
+
+        self.trozos_generados += 1
+        return superficie
+
+    def obtener_bordes_en_pantalla(self, motor):
+        izquierda, arriba = self._obtener_esquina_en_pantalla(motor)
+        return (izquierda, arriba, izquierda + self.columnas * self._ancho_cuadro,
+                arriba + self.filas * self._alto_cuadro)
+
+    def obtener_firma(self):
+        return (self.x, self.y, self.fijo, self.transparencia, self._version)
 
     def reiniciar(self):
         self._eliminar_bloques()
@@ -121,10 +313,10 @@ class Mapa(Actor):
 
     def eliminar(self):
         self._eliminar_bloques()
+        Actor.eliminar(self)
 
     def _eliminar_bloques(self):
-        for b in self.bloques:
-            b.eliminar()
-
-        for f in self.figuras:
-            f.eliminar()
+        self._eliminar_figuras()
+        self.bloques_solidos = 0
+        self._figuras_modificadas = False
+        self._crear_grilla(self.filas, self.columnas, len(self.capas))
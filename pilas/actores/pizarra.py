@@ -24,6 +24,9 @@ class Pizarra(Actor):
 
         Actor.__init__(self, x=x, y=y)
         self.imagen = pilas.imagenes.cargar_superficie(ancho, alto)
+        # Todo lo que se pinte entre un cuadro y el siguiente se dibuja
+        # con un solo painter, que se cierra antes de mostrar la pizarra.
+        self.imagen.iniciar_lote()
 
     def dibujar_punto(self, x, y, color=colores.negro):
         x, y = self.obtener_coordenada_fisica(x, y)
@@ -0,0 +1,120 @@
+# -*- encoding: utf-8 -*-
+# Pilas engine - A video game framework.
+#
+# Copyright 2010 - Hugo Ruscitti
+# License: LGPLv3 (see http://www.gnu.org/licenses/lgpl.html)
+#
+# Website - http://www.pilas-engine.com.ar
+
+from collections import OrderedDict
+
+
+class Cache(object):
+    """Almacena valores usados recientemente, descartando los menos usados.
+
+    La cache se puede limitar por cantidad de elementos, por cantidad
+    de bytes o por ambas cosas. Para limitar por bytes se tiene que
+    indicar una funcion que mida el tamaño de cada valor, por ejemplo:
+
+        >>> textos = Cache(maximo_de_elementos=100)
+        >>> imagenes = Cache(maximo_de_bytes=1024 * 1024, medir=len)
+
+    Cuando se supera algún límite, se eliminan los elementos que
+    hace más tiempo que no se consultan.
+    """
+
+    def __init__(self, maximo_de_elementos=None, maximo_de_bytes=None, medir=None):
+        self.maximo_de_elementos = maximo_de_elementos
+        self.maximo_de_bytes = maximo_de_bytes
+        self._medir = medir
+        self._elementos = OrderedDict()
+        self.bytes = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.descartados = 0
+
+    def obtener(self, clave, por_defecto=None):
+        "Retorna el valor asociado a ``clave``, o ``por_defecto`` si no esta en la cache."
+        try:
+            valor, tamano = self._elementos.pop(clave)
+        except KeyError:
+            self.fallos += 1
+            return por_defecto
+
+        # Lo vuelve a insertar para marcarlo como el mas reciente.
+        self._elementos[clave] = (valor, tamano)
+        self.aciertos += 1
+        return valor
+
+    def agregar(self, clave, valor):
+        "Guarda un valor en la cache, descartando los elementos mas viejos si es necesario."
+        self.quitar(clave)
+
+        if self._medir:
+            tamano = self._medir(valor)
+        else:
+            tamano = 0
+
+        self._elementos[clave] = (valor, tamano)
+        self.bytes += tamano
+        self._descartar_excedente()
+        return valor
+
+    def quitar(self, clave):
+        "Elimina un elemento de la cache, retorna True si existía."
+        if clave in self._elementos:
+            valor, tamano = self._elementos.pop(clave)
+            self.bytes -= tamano
+            return True
+
+        return False
+
+    def limpiar(self):
+        "Elimina todos los elementos de la cache."
+        self._elementos.clear()
+        self.bytes = 0
+
+    def claves(self):
+        return self._elementos.keys()
+
+    def _descartar_excedente(self):
+        while self._elementos and self._supera_los_limites():
+            clave, (valor, tamano) = self._elementos.popitem(last=False)
+            self.bytes -= tamano
+            self.descartados += 1
+
+    def _supera_los_limites(self):
+        if self.maximo_de_elementos is not None and len(self._elementos) > self.maximo_de_elementos:
+            return True
+
+        if self.maximo_de_bytes is not None and self.bytes > self.maximo_de_bytes:
+            return True
+
+        return False
+
+    def obtener_estadisticas(self):
+        "Retorna un diccionario con la cantidad de elementos, bytes, aciertos y fallos."
+        consultas = self.aciertos + self.fallos
+
+        if consultas:
+            tasa_de_aciertos = self.aciertos / float(consultas)
+        else:
+            tasa_de_aciertos = 0
+
+        return {
+            'elementos': len(self._elementos),
+            'bytes': self.bytes,
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'descartados': self.descartados,
+            'tasa_de_aciertos': tasa_de_aciertos,
+        }
+
+    def __contains__(self, clave):
+        return clave in self._elementos
+
+    def __len__(self):
+        return len(self._elementos)
+
+    def __str__(self):
+        return "<Cache con %(elementos)d elementos, %(bytes)d bytes, %(aciertos)d aciertos y %(fallos)d fallos>" %(self.obtener_estadisticas())
@@ -53,7 +53,11 @@ class Depurador(object):
                 m.termina_dibujado(motor, self.lienzo)
     
     def cuando_pulsa_tecla(self, evento):
-        if evento.codigo == 'F7':
+        if evento.codigo == 'F5':
+            self._alternar_modo(ModoCostosPorClase)
+        elif evento.codigo == 'F6':
+            self._alternar_modo(ModoPerfilador)
+        elif evento.codigo == 'F7':
             self._alternar_modo(ModoInformacionDeSistema)
         elif evento.codigo == 'F8':
             self._alternar_modo(ModoPuntosDeControl)
@@ -92,6 +96,7 @@ class Depurador(object):
         instancia_a_eliminar = [x for x in self.modos 
                                 if x.__class__ == clase_del_modo]
         self.modos.remove(instancia_a_eliminar[0])
+        instancia_a_eliminar[0].terminar()
         
         if not self.modos:
             pilas.eventos.sale_modo_depuracion.send('depurador')
@@ -114,15 +119,18 @@ class Depurador(object):
         
     def _mostrar_cuadros_por_segundo(self, motor):
         izquierda, derecha, arriba, abajo = pilas.utils.obtener_bordes()
-        rendimiento = self.fps.obtener_cuadros_por_segundo()
-        texto = "Cuadros por segundo: %s" %(rendimiento)
+        estadisticas = self.fps.obtener_estadisticas()
+        texto = "Cuadros por segundo: %.1f (modo %s, 99%%: %.1f ms, atrasados: %d)" %(
+                estadisticas['cuadros_por_segundo'], estadisticas['modo'],
+                estadisticas['percentil_99'] * 1000, estadisticas['cuadros_atrasados'])
         self.lienzo.texto_absoluto(motor, texto, izquierda + 10, abajo + 10, 
                 color=pilas.colores.violeta)
 
     def _mostrar_cantidad_de_actores(self, motor):
         izquierda, derecha, arriba, abajo = pilas.utils.obtener_bordes()
         total_de_actores = len(pilas.actores.todos)
-        texto = "Cantidad de actores: %s" %(total_de_actores)
+        descartados = getattr(motor, 'actores_descartados', 0)
+        texto = "Cantidad de actores: %s (fuera de camara: %s)" %(total_de_actores, descartados)
         self.lienzo.texto_absoluto(motor, texto, izquierda + 10, abajo + 30, 
                 color=pilas.colores.violeta)
         
@@ -140,6 +148,10 @@ class ModoDepurador(object):
 
     def termina_dibujado(self, motor, lienzo):
         pass
+
+    def terminar(self):
+        "Se invoca cuando se desactiva el modo."
+        pass
      
     def orden_de_tecla(self):
         return int(self.tecla[1:])
@@ -181,6 +193,91 @@ class ModoFisica(ModoDepurador):
         grosor = ModoDepurador.grosor_de_lineas
         pilas.mundo.fisica.dibujar_figuras_sobre_lienzo(motor, lienzo, grosor)
 
+class ModoCostosPorClase(ModoDepurador):
+    """Muestra las clases de actores que mas tardan en actualizarse y dibujarse.
+
+    Mientras esta activo el perfilador mide a cada actor, y al
+    desactivarlo se dejan de medir.
+    """
+    tecla = "F5"
+    cantidad_de_clases = 8
+
+    def __init__(self, depurador):
+        ModoDepurador.__init__(self, depurador)
+        self.perfilador = pilas.mundo.motor.perfilador
+        self.perfilador.reiniciar_costos_por_clase()
+        self.perfilador.medir_actores = True
+
+    def terminar(self):
+        self.perfilador.medir_actores = False
+
+    def termina_dibujado(self, motor, lienzo):
+        izquierda, derecha, arriba, abajo = pilas.utils.obtener_bordes()
+        x = derecha - 300
+        y = arriba - 20
+        lienzo.texto_absoluto(motor, "clase: actores, actualizar + dibujar (ms)", x, y,
+                color=pilas.colores.violeta)
+
+        for costo in self.perfilador.obtener_costos_por_clase()[:self.cantidad_de_clases]:
+            y -= 20
+            texto = "%s: %.1f, %.2f + %.2f" %(costo['clase'], costo['actores'],
+                    (costo['pre_actualizar'] + costo['actualizar']) * 1000, costo['dibujar'] * 1000)
+            lienzo.texto_absoluto(motor, texto, x, y, color=pilas.colores.violeta)
+
+class ModoPerfilador(ModoDepurador):
+    """Dibuja un grafico con el tiempo de cada fase en los ultimos cuadros.
+
+    Cada barra es un cuadro, con una franja de color por fase. La
+    linea gris marca el tiempo disponible para un cuadro.
+    """
+    tecla = "F6"
+    milisegundos_por_pixel = 0.25
+    ancho_de_barra = 2
+
+    colores_por_fase = {
+        'interpolaciones': pilas.colores.violeta,
+        'tareas': pilas.colores.naranja,
+        'fisica': pilas.colores.azul,
+        'colisiones': pilas.colores.rojo,
+        'actores': pilas.colores.verdeoscuro,
+        'dibujado': pilas.colores.marron,
+    }
+
+    def termina_dibujado(self, motor, lienzo):
+        perfilador = motor.perfilador
+        izquierda, derecha, arriba, abajo = pilas.utils.obtener_bordes()
+        cuadros = int((derecha - izquierda - 20) / self.ancho_de_barra)
+        base = abajo + 60
+        alturas = None
+
+        for fase in perfilador.fases:
+            tiempos = perfilador.obtener_tiempos(fase)[-cuadros:]
+            color = self.colores_por_fase.get(fase, pilas.colores.gris)
+
+            if alturas is None:
+                alturas = [0] * len(tiempos)
+
+            for (i, tiempo) in enumerate(tiempos):
+                alto = tiempo * 1000 / self.milisegundos_por_pixel
+
+                if alto >= 1:
+                    x = izquierda + 10 + i * self.ancho_de_barra
+                    lienzo.rectangulo(motor, x, base + alturas[i] + alto, self.ancho_de_barra, alto,
+                            color=color, relleno=True)
+                    alturas[i] += alto
+
+        limite = base + 1000.0 / motor.fps.fps / self.milisegundos_por_pixel
+        lienzo.linea(motor, izquierda + 10, limite, derecha - 10, limite, color=pilas.colores.gris)
+        self._mostrar_referencias(motor, lienzo, perfilador, izquierda + 10, arriba - 20 - 20 * len(self.depurador.modos))
+
+    def _mostrar_referencias(self, motor, lienzo, perfilador, x, y):
+        estadisticas = perfilador.obtener_estadisticas()
+
+        for (i, fase) in enumerate(perfilador.fases):
+            texto = "%s: %.2f ms" %(fase, estadisticas[fase]['promedio'] * 1000)
+            lienzo.texto_absoluto(motor, texto, x, y - i * 20,
+                    color=self.colores_por_fase.get(fase, pilas.colores.gris))
+
 class ModoInformacionDeSistema(ModoDepurador):
     tecla = "F7"
 
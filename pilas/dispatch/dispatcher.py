@@ -1,6 +1,7 @@
 import weakref
 
 from pilas.dispatch import saferef
+from pilas import trazas
 
 WEAKREF_TYPES = (weakref.ReferenceType, saferef.BoundMethodWeakref)
 
@@ -38,6 +39,8 @@ class Signal(object):
             A list of the arguments this signal can pass along in a send() call.
         """
         self.receivers = []
+        # Identifica al evento en las trazas (ver pilas.trazas).
+        self.nombre = 'evento'
         if providing_args is None:
             providing_args = []
         self.providing_args = set(providing_args)
@@ -153,9 +156,16 @@ class Signal(object):
         if not self.receivers:
             return responses
 
-        for receiver in self._live_receivers(_make_id(sender)):
-            response = receiver(DictObj(named))
-            responses.append((receiver, response))
+        desde = trazas.trazador.comenzar()
+
+        try:
+            for receiver in self._live_receivers(_make_id(sender)):
+                response = receiver(DictObj(named))
+                responses.append((receiver, response))
+        finally:
+            if desde is not None:
+                trazas.trazador.terminar(self.nombre, 'eventos', desde)
+
         return responses
 
     def send_robust(self, sender, **named):
@@ -24,6 +24,15 @@ sale_modo_depuracion = dispatch.Signal(providing_args=[])
 actualiza_modo_depuracion = dispatch.Signal(providing_args=[])
 
 
+def _nombrar_eventos():
+    "Asigna a cada evento el nombre de su variable, para identificarlo en las trazas."
+    for (nombre, evento) in globals().items():
+        if isinstance(evento, dispatch.Signal):
+            evento.nombre = nombre
+
+_nombrar_eventos()
+
+
 def imprimir_todos():
     "Muestra en consola los eventos activos y a quienes invocan"
     imprime_alguno = False
@@ -8,6 +8,7 @@
 
 import pilas
 from pilas import colores
+from pilas import trazas
 
 try:
     import Box2D as box2d
@@ -21,6 +22,10 @@ class Fisica(object):
     
     def __init__(self, area, gravedad=(0, -90)):
         self.area = area
+        # Segundos de simulacion por cada segundo de juego. Historicamente
+        # cada cuadro de 1/60 avanzaba 1/20 de segundo, y los juegos
+        # estan ajustados a esa velocidad.
+        self.velocidad = 3.0
         try:
             self.escenario = box2d.b2AABB()
             self.escenario.lowerBound = (-1000.0, -1000.0)
@@ -67,9 +72,15 @@ class Fisica(object):
             self.constante_mouse.eliminar()
             self.constante_mouse = None
         
-    def actualizar(self):
+    def actualizar(self, dt=1/60.0):
+        "Avanza la simulacion ``dt`` segundos de juego."
         if self.mundo:
-            self.mundo.Step(1.0 / 20.0, 10, 8)
+            desde = trazas.trazador.comenzar()
+            self.mundo.Step(dt * self.velocidad, 10, 8)
+
+            if desde is not None:
+                trazas.trazador.terminar('Step', 'fisica', desde)
+
             self.i += 1
             self._procesar_figuras_a_eliminar()
 
@@ -13,6 +13,7 @@ class Fondo(pilas.actores.Actor):
     def __init__(self, imagen):
         pilas.actores.Actor.__init__(self, imagen)
         self.z = 1000
+        self.estatico = True
 
 class Volley(Fondo):
     "Muestra una escena que tiene un fondo de pantalla de paisaje."
@@ -62,3 +63,13 @@ class Color(Fondo):
     def dibujar(self, motor):
         if self.color:
             self.lienzo.pintar(motor, self.color)
+
+    def obtener_bordes_en_pantalla(self, motor):
+        ancho, alto = motor.obtener_area()
+        return 0, 0, ancho, alto
+
+    def obtener_firma(self):
+        if self.color:
+            return self.color.obtener_componentes()
+        else:
+            return ()
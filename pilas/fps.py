@@ -1,57 +1,199 @@
-#import pygame
-import time
-import pygame
+# -*- encoding: utf-8 -*-
+# Pilas engine - A video game framework.
+#
+# Copyright 2010 - Hugo Ruscitti
+# License: LGPLv3 (see http://www.gnu.org/licenses/lgpl.html)
+#
+# Website - http://www.pilas-engine.com.ar
 
-class ___FPS:
+import math
+import collections
 
-    def __init__(self, fps, usar_modo_economico):
-        pass
+from PyQt4 import QtCore
 
-    def actualizar(self):
-        time.sleep(1 / 40.0)
+from pilas import reloj as modulo_reloj
+
+# Modos de planificacion de cuadros.
+PERIODO = 'periodo'
+PRESUPUESTO = 'presupuesto'
+LIBRE = 'libre'
 
-    def obtener_cuadros_por_segundo(self):
-        return 0
 
 class FPS(object):
-    #print "Usando pygame en el modulo fps"
-
-    def __init__(self, fps, usar_modo_economico):
-        self.antes = self.ahora = pygame.time.get_ticks()
-        self.frecuencia = 1000.0 / fps
-        self.t_fps = self.ahora
-        self.rendimiento = 0
-        self.cuadros_por_segundo = "??"
-        self.usar_modo_economico = usar_modo_economico
-
-    def actualizar(self):
-        retorno = 0
-        self.ahora = pygame.time.get_ticks()
-
-        dt = self.ahora - self.antes 
-
-        while dt >= self.frecuencia:
-            self.antes += self.frecuencia
-            dt = self.ahora - self.antes 
-            retorno += 1
-
-            if self.ahora - self.t_fps > 1000.0:
-                #print self.cuadros_por_segundo
-                self.cuadros_por_segundo = str(self.rendimiento)
-                self.t_fps += 1000.0
-                self.rendimiento = 0
+    """Planifica los cuadros del juego y mide cuanto tiempo pasa entre uno y otro.
+
+    Cada cuadro se programa con un QTimer de precision de un solo
+    disparo, asi el hilo de la interfaz nunca se duerme: mientras
+    espera el siguiente cuadro sigue atendiendo al mouse y al teclado.
+
+    Hay tres modos:
+
+        - 'periodo': los cuadros comienzan en multiplos exactos del
+          periodo (1/fps) del temporizador. No se sincroniza con el
+          refresco del monitor. Si un cuadro se atrasa se salta al
+          siguiente.
+        - 'presupuesto': luego de cada cuadro se espera lo que falte
+          para completar ``presupuesto`` segundos.
+        - 'libre': los cuadros se ejecutan tan rapido como sea posible.
+
+    Los tiempos de los ultimos ``cuadros_en_la_ventana`` cuadros se usan
+    para calcular los cuadros por segundo reales, el percentil 99 del
+    tiempo por cuadro y la cantidad de cuadros atrasados.
+
+    Los tiempos se miden con ``reloj`` (una funcion que retorna
+    segundos). Si no se indica se usa QElapsedTimer, o el reloj
+    monotonico de pilas en las versiones de Qt anteriores a 4.7.
+    """
+
+    def __init__(self, fps=60, cuadros_en_la_ventana=120, reloj=None):
+        self.fps = fps
+        self.modo = PERIODO
+        self.presupuesto = 1.0 / fps
+        self.tiempos = collections.deque(maxlen=cuadros_en_la_ventana)
+        self.cuadros = 0
+        self.cuadros_atrasados = 0
+        self._ahora = reloj or self._crear_reloj()
+        self._origen = self._ahora()
+        self._anterior = None
+        self._funcion = None
+        self._temporizador = None
+
+    def _crear_reloj(self):
+        "Retorna una funcion que informa los segundos transcurridos desde que se creo el planificador."
+        if not hasattr(QtCore, 'QElapsedTimer'):
+            return modulo_reloj.monotonico
+
+        temporizador = QtCore.QElapsedTimer()
+        temporizador.start()
+
+        if hasattr(temporizador, 'nsecsElapsed'):
+            return lambda: temporizador.nsecsElapsed() / 1e9
+
+        return lambda: temporizador.elapsed() / 1000.0
+
+    def iniciar(self, funcion):
+        "Comienza a invocar a ``funcion`` en cada cuadro."
+        self._funcion = funcion
+
+        if not self._temporizador:
+            self._temporizador = QtCore.QTimer()
+            self._temporizador.setSingleShot(True)
+
+            # Qt 4 siempre usa temporizadores precisos, en Qt 5 hay que pedirlo.
+            if hasattr(self._temporizador, 'setTimerType'):
+                self._temporizador.setTimerType(QtCore.Qt.PreciseTimer)
+
+            self._temporizador.timeout.connect(self._ejecutar_cuadro)
+
+        self._origen = self._ahora()
+        self._temporizador.start(0)
+
+    def detener(self):
+        self._funcion = None
+
+        if self._temporizador:
+            self._temporizador.stop()
+
+    def definir_modo(self, modo, presupuesto=None):
+        """Cambia el modo de planificacion: 'periodo', 'presupuesto' o 'libre'.
+
+        En el modo 'presupuesto' se puede indicar la duracion de cada
+        cuadro en segundos (por omision es 1/fps).
+        """
+        if modo not in (PERIODO, PRESUPUESTO, LIBRE):
+            raise Exception("El modo '%s' no existe, use 'periodo', 'presupuesto' o 'libre'." %(modo))
+
+        self.modo = modo
+
+        if presupuesto:
+            self.presupuesto = presupuesto
+
+        self._origen = self._ahora()
+
+    def _ejecutar_cuadro(self):
+        if not self._funcion:
+            return
+
+        inicio = self._ahora()
+        self.actualizar(inicio)
+
+        try:
+            self._funcion()
+        finally:
+            self._programar_siguiente_cuadro(inicio)
+
+    def _programar_siguiente_cuadro(self, inicio):
+        # Se detuvo durante el cuadro.
+        if not self._funcion:
+            return
+
+        ahora = self._ahora()
+
+        if self.modo == LIBRE:
+            espera = 0
+        elif self.modo == PRESUPUESTO:
+            espera = self.presupuesto - (ahora - inicio)
         else:
-            if self.usar_modo_economico:
-                pygame.time.wait(int(self.frecuencia - dt))
-            else:
-                pygame.time.delay(int(self.frecuencia - dt))
+            periodo = 1.0 / self.fps
+            siguiente = self._origen + (math.floor((ahora - self._origen) / periodo) + 1) * periodo
+            espera = siguiente - ahora
 
-            returno = 1
+        self._temporizador.start(max(int(round(espera * 1000)), 0))
 
+    def _obtener_duracion_esperada(self):
+        if self.modo == PERIODO:
+            return 1.0 / self.fps
+        elif self.modo == PRESUPUESTO:
+            return self.presupuesto
 
-        self.rendimiento += 1
-        return retorno
+        return None
 
+    def actualizar(self, ahora=None):
+        """Registra el comienzo de un cuadro.
+
+        Lo invoca el planificador en cada cuadro, pero tambien se puede
+        llamar manualmente si los cuadros se generan de otra forma.
+        """
+        if ahora is None:
+            ahora = self._ahora()
+
+        if self._anterior is not None:
+            duracion = ahora - self._anterior
+            self.tiempos.append(duracion)
+            esperada = self._obtener_duracion_esperada()
+
+            # Un cuadro que tarda mas de un periodo y medio se considera atrasado.
+            if esperada and duracion > esperada * 1.5:
+                self.cuadros_atrasados += 1
+
+        self._anterior = ahora
+        self.cuadros += 1
+        return 1
 
     def obtener_cuadros_por_segundo(self):
-        return self.cuadros_por_segundo
+        "Retorna los cuadros por segundo reales de los ultimos cuadros."
+        total = sum(self.tiempos)
+
+        if not total:
+            return 0
+
+        return len(self.tiempos) / total
+
+    def obtener_percentil(self, percentil=99):
+        "Retorna el tiempo por cuadro (en segundos) que no supera el ``percentil`` % de los cuadros."
+        if not self.tiempos:
+            return 0
+
+        ordenados = sorted(self.tiempos)
+        posicion = int(math.ceil(percentil / 100.0 * len(ordenados))) - 1
+        return ordenados[min(max(posicion, 0), len(ordenados) - 1)]
+
+    def obtener_estadisticas(self):
+        "Retorna un diccionario con los cuadros por segundo, el percentil 99 y los cuadros atrasados."
+        return {
+            'modo': self.modo,
+            'cuadros_por_segundo': self.obtener_cuadros_por_segundo(),
+            'percentil_99': self.obtener_percentil(99),
+            'cuadros_atrasados': self.cuadros_atrasados,
+            'cuadros': self.cuadros,
+        }
@@ -8,6 +8,19 @@
 
 import pilas
 import os
+import copy
+from pilas import cache
+
+
+def medir_imagen(imagen):
+    "Retorna la cantidad aproximada de bytes que ocupa una imagen decodificada."
+    return imagen._ancho * imagen._alto * 4
+
+# Guarda una imagen por cada archivo (y forma de grilla) que se carga,
+# para no tener que leer y decodificar el archivo cada vez.
+cache_de_imagenes = cache.Cache(maximo_de_bytes=32 * 1024 * 1024, medir=medir_imagen)
+_motor_de_la_cache = None
+
 
 def cargar(ruta):
     """Intenta cargar la imagen indicada por el argumento ``ruta``.
@@ -28,6 +41,9 @@ def cargar(ruta):
         * por último en el directorio estándar de la biblioteca.
 
     En caso de error genera una excepción de tipo IOError.
+
+    Las imagenes se guardan en una cache (ver ``precargar``), asi
+    que cargar varias veces el mismo archivo no lo vuelve a leer.
     """
 
     if not pilas.mundo:
@@ -35,8 +51,7 @@ def cargar(ruta):
         print mensaje
         raise Exception(mensaje)
     
-    ruta = pilas.utils.obtener_ruta_al_recurso(ruta)
-    return pilas.mundo.motor.cargar_imagen(ruta)
+    return copy.copy(_obtener_desde_la_cache(ruta))
 
 def cargar_grilla(ruta, columnas=1, filas=1):
     """Representa una grilla de imagenes con varios cuadros de animación.
@@ -64,8 +79,117 @@ def cargar_grilla(ruta, columnas=1, filas=1):
         print mensaje
         raise Exception(mensaje)
     
+    # Cada grilla recuerda su cuadro actual, por eso se retorna una copia.
+    return copy.copy(_obtener_desde_la_cache(ruta, columnas, filas))
+
+def _obtener_clave(ruta, columnas=None, filas=None):
+    "Retorna la ruta completa al archivo y la clave que lo identifica en la cache."
+    global _motor_de_la_cache
+
+    # Las imagenes de un motor anterior no sirven para el motor actual.
+    if pilas.mundo.motor is not _motor_de_la_cache:
+        cache_de_imagenes.limpiar()
+        _motor_de_la_cache = pilas.mundo.motor
+
     ruta = pilas.utils.obtener_ruta_al_recurso(ruta)
-    return pilas.mundo.motor.obtener_grilla(ruta, columnas, filas)
+    return ruta, (os.path.abspath(ruta), columnas, filas)
+
+def _guardar_en_la_cache(clave, imagen):
+    # Las imagenes que no se pudieron leer no se guardan.
+    if medir_imagen(imagen):
+        cache_de_imagenes.agregar(clave, imagen)
+
+    return imagen
+
+def _obtener_desde_la_cache(ruta, columnas=None, filas=None):
+    "Retorna la imagen (o grilla) guardada en la cache, cargandola si es necesario."
+    motor = pilas.mundo.motor
+    ruta, clave = _obtener_clave(ruta, columnas, filas)
+    imagen = cache_de_imagenes.obtener(clave)
+
+    if imagen is None:
+        if columnas is None:
+            imagen = motor.cargar_imagen(ruta)
+        else:
+            imagen = motor.obtener_grilla(ruta, columnas, filas)
+
+        _guardar_en_la_cache(clave, imagen)
+
+    return imagen
+
+def precargar(*rutas):
+    """Carga varias imagenes en la cache, para que esten listas al usarlas.
+
+    Cada ruta puede ser el nombre de un archivo o una tupla
+    (ruta, columnas, filas) para precargar una grilla::
+
+        pilas.imagenes.precargar("disparo.png", ("pingu.png", 10))
+    """
+    for ruta in rutas:
+        if isinstance(ruta, tuple):
+            _obtener_desde_la_cache(*ruta)
+        else:
+            _obtener_desde_la_cache(ruta)
+
+def precargar_en_segundo_plano(*rutas, **kv):
+    """Lee varias imagenes usando hilos auxiliares, sin detener el juego.
+
+    Las rutas se indican igual que en ``precargar``. Retorna un objeto
+    que permite consultar el progreso o esperar a que todo este listo,
+    y opcionalmente se puede indicar una funcion ``cuando_avanza``
+    que recibe el progreso, por ejemplo para una pantalla de carga::
+
+        carga = pilas.imagenes.precargar_en_segundo_plano("fondos/selva.jpg",
+                ("pingu.png", 10), cuando_avanza=mostrar_progreso)
+
+    Una vez lista, cada imagen queda en la cache, asi que ``cargar``
+    la obtiene sin leer el archivo.
+    """
+    from pilas import precarga
+
+    motor = pilas.mundo.motor
+    cargas = []
+
+    for ruta in rutas:
+        if isinstance(ruta, tuple):
+            ruta, columnas, filas = (ruta + (1,))[:3]
+        else:
+            columnas, filas = None, None
+
+        ruta, clave = _obtener_clave(ruta, columnas, filas)
+        carga = precarga.Carga(ruta, motor.decodificar_imagen,
+                lambda datos, ruta=ruta, clave=clave, columnas=columnas, filas=filas:
+                    _guardar_en_la_cache(clave, motor.crear_imagen_decodificada(ruta, datos, columnas, filas)))
+
+        if clave in cache_de_imagenes:
+            carga.marcar_como_lista(cache_de_imagenes.obtener(clave))
+
+        cargas.append(carga)
+
+    return precarga.precargador.cargar(cargas, kv.get('cuando_avanza'))
+
+def liberar(ruta=None):
+    """Quita de la cache las imagenes y grillas de un archivo.
+
+    Si no se indica una ruta se vacia la cache completa.
+    """
+    if ruta is None:
+        cache_de_imagenes.limpiar()
+        return
+
+    ruta = os.path.abspath(pilas.utils.obtener_ruta_al_recurso(ruta))
+
+    for clave in cache_de_imagenes.claves():
+        if clave[0] == ruta:
+            cache_de_imagenes.quitar(clave)
+
+def definir_memoria_maxima(cantidad_de_bytes):
+    "Cambia la cantidad de bytes que pueden ocupar las imagenes de la cache."
+    cache_de_imagenes.maximo_de_bytes = cantidad_de_bytes
+
+def obtener_estadisticas():
+    "Retorna un diccionario con las imagenes, bytes, aciertos y fallos de la cache."
+    return cache_de_imagenes.obtener_estadisticas()
 
 def cargar_lienzo():
     """Representa un rectangulo (inicialmente transparente) para dibujar."""
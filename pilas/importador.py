@@ -0,0 +1,154 @@
+# -*- encoding: utf-8 -*-
+# Pilas engine - A video game framework.
+#
+# Copyright 2010 - Hugo Ruscitti
+# License: LGPLv3 (see http://www.gnu.org/licenses/lgpl.html)
+#
+# Website - http://www.pilas-engine.com.ar
+
+import sys
+import time
+import types
+import __builtin__
+
+
+class MedidorDeImportaciones(object):
+    """Registra cuanto tiempo demora cada importacion de modulos.
+
+    Mientras esta instalado reemplaza a la funcion ``__import__``, y
+    anota los modulos que se cargan por primera vez junto con el
+    tiempo que llevo cargarlos (incluyendo a sus dependencias).
+
+    Se puede instalar otra vez antes de desinstalarlo (por ejemplo si se
+    llama a ``pilas.iniciar`` mientras se importa pilas): el motivo nuevo
+    se usa hasta el ``desinstalar`` correspondiente.
+    """
+
+    def __init__(self):
+        self.registros = []
+        self.motivo = None
+        self._profundidad = 0
+        self._importar_original = None
+        self._motivos_anteriores = []
+
+    def instalar(self, motivo):
+        "Comienza a registrar las importaciones, indicando el motivo."
+        if self._importar_original:
+            self._motivos_anteriores.append(self.motivo)
+            self.motivo = motivo
+            return
+
+        self.motivo = motivo
+        self._importar_original = __builtin__.__import__
+        __builtin__.__import__ = self._importar
+
+    def desinstalar(self):
+        if self._motivos_anteriores:
+            self.motivo = self._motivos_anteriores.pop()
+        elif self._importar_original:
+            __builtin__.__import__ = self._importar_original
+            self._importar_original = None
+
+    def _importar(self, nombre, *k, **kv):
+        cantidad_de_modulos = len(sys.modules)
+        inicio = time.time()
+        self._profundidad += 1
+
+        try:
+            modulo = self._importar_original(nombre, *k, **kv)
+        finally:
+            self._profundidad -= 1
+
+        if len(sys.modules) > cantidad_de_modulos:
+            self.registrar(getattr(modulo, '__name__', nombre), time.time() - inicio,
+                    self.motivo, self._profundidad)
+
+        return modulo
+
+    def registrar(self, nombre, segundos, motivo, profundidad=0):
+        self.registros.append((nombre, segundos, motivo, profundidad))
+
+    def obtener_reporte(self):
+        """Retorna una lista de tuplas (modulo, segundos, motivo).
+
+        Solo se incluyen las importaciones principales (las que no
+        ocurrieron dentro de otra importacion), de la mas lenta
+        a la mas rapida.
+        """
+        principales = [(n, s, m) for (n, s, m, p) in self.registros if p == 0]
+        return sorted(principales, key=lambda registro: -registro[1])
+
+
+medidor = MedidorDeImportaciones()
+
+
+class ModuloPerezoso(types.ModuleType):
+    """Un modulo que importa algunos de sus nombres recien cuando se usan.
+
+    Reemplaza al modulo original en ``sys.modules``. Todos los atributos
+    se leen y escriben sobre el modulo original, salvo los que figuran
+    en ``perezosos``: un diccionario que asocia cada nombre con el
+    submodulo que lo define (por ejemplo 'Mono': 'mono'). Si el nombre
+    es el del propio submodulo se retorna el submodulo completo.
+    """
+
+    def __init__(self, modulo, perezosos):
+        types.ModuleType.__init__(self, modulo.__name__, modulo.__doc__)
+        contenido = self.__dict__
+        contenido['_modulo_original'] = modulo
+        contenido['_perezosos'] = perezosos
+
+        for nombre in ('__file__', '__path__', '__package__'):
+            if hasattr(modulo, nombre):
+                contenido[nombre] = getattr(modulo, nombre)
+
+        publicos = [x for x in dir(modulo) if not x.startswith('_')]
+        contenido['__all__'] = sorted(set(publicos + perezosos.keys()))
+
+    def __getattr__(self, nombre):
+        modulo = self._modulo_original
+
+        try:
+            return getattr(modulo, nombre)
+        except AttributeError:
+            if nombre not in self._perezosos:
+                raise
+
+        submodulo = self._perezosos[nombre]
+        inicio = time.time()
+        __import__(modulo.__name__ + '.' + submodulo)
+        medidor.registrar(modulo.__name__ + '.' + submodulo, time.time() - inicio,
+                "al usar '%s.%s'" %(modulo.__name__, nombre))
+        valor = getattr(sys.modules[modulo.__name__ + '.' + submodulo], nombre, None)
+
+        if nombre == submodulo or valor is None:
+            valor = sys.modules[modulo.__name__ + '.' + submodulo]
+
+        setattr(modulo, nombre, valor)
+        return valor
+
+    def __setattr__(self, nombre, valor):
+        setattr(self._modulo_original, nombre, valor)
+
+    def __delattr__(self, nombre):
+        delattr(self._modulo_original, nombre)
+
+    def __dir__(self):
+        return self.__all__
+
+
+def hacer_perezoso(nombre_del_modulo, perezosos):
+    "Reemplaza un modulo ya importado por un ModuloPerezoso."
+    modulo = ModuloPerezoso(sys.modules[nombre_del_modulo], perezosos)
+    sys.modules[nombre_del_modulo] = modulo
+    return modulo
+
+
+def imprimir_reporte_de_inicio():
+    """Muestra los modulos que se importaron, y por que.
+
+    Los que dicen 'al importar pilas' o 'al iniciar' estan en el camino
+    critico del inicio; el resto se cargaron recien cuando se usaron.
+    """
+    for (nombre, segundos, motivo) in medidor.obtener_reporte():
+        print "%8.1f ms  %-40s %s" %(segundos * 1000, nombre, motivo)
@@ -55,11 +55,14 @@ class Boton(pilas.actores.Actor):
     def _crear_imagen(self, tema, texto, ancho, dx):
         "Genera una imagen de superficie de boton."
         imagen = pilas.imagenes.cargar_superficie(20 + ancho, 30)
-        imagen.pintar_parte_de_imagen(tema, dx, 0, 5, 25, 0, 0)
 
-        for x in range(1, ancho + 20, 5):
-            imagen.pintar_parte_de_imagen(tema, dx + 5, 0, 5, 25, x, 0)
+        with imagen.lote():
+            imagen.pintar_parte_de_imagen(tema, dx, 0, 5, 25, 0, 0)
+
+            for x in range(1, ancho + 20, 5):
+                imagen.pintar_parte_de_imagen(tema, dx + 5, 0, 5, 25, x, 0)
+
+            imagen.pintar_parte_de_imagen(tema, dx + 75, 0, 5, 25, ancho + 15, 0)
+            imagen.texto(texto, 10, 17)
 
-        imagen.pintar_parte_de_imagen(tema, dx + 75, 0, 5, 25, ancho + 15, 0)
-        imagen.texto(texto, 10, 17)
         return imagen
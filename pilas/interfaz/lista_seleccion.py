@@ -26,13 +26,14 @@ class ListaSeleccion(Actor):
         self.centro = ("centro", "centro")
         
     def _pintar_opciones(self, pinta_indice_opcion=None):
-        self.imagen.pintar(pilas.colores.blanco)
-        
-        if pinta_indice_opcion != None:
-            self.imagen.rectangulo(0, pinta_indice_opcion * 19, self.imagen.ancho(), 17, relleno=True, color=pilas.colores.naranja)
-        
-        for indice, opcion in enumerate(self.opciones):
-            self.imagen.texto(opcion, 15, y=12 + indice * 20, color=pilas.colores.negro)
+        with self.imagen.lote():
+            self.imagen.pintar(pilas.colores.blanco)
+
+            if pinta_indice_opcion != None:
+                self.imagen.rectangulo(0, pinta_indice_opcion * 19, self.imagen.ancho(), 17, relleno=True, color=pilas.colores.naranja)
+
+            for indice, opcion in enumerate(self.opciones):
+                self.imagen.texto(opcion, 15, y=12 + indice * 20, color=pilas.colores.negro)
         
     def cuando_mueve_el_mouse(self, evento):
         if self.colisiona_con_un_punto(evento.x, evento.y):
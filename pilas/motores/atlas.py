@@ -0,0 +1,207 @@
+# -*- encoding: utf-8 -*-
+# pilas engine - a video game framework.
+#
+# copyright 2010 - hugo ruscitti
+# license: lgplv3 (see http://www.gnu.org/licenses/lgpl.html)
+#
+# website - http://www.pilas-engine.com.ar
+
+import os
+import json
+
+from PyQt4 import QtGui
+
+EXTENSIONES = ('.png', '.jpg', '.jpeg', '.bmp', '.gif')
+
+
+def normalizar_ruta(ruta):
+    "Retorna una ruta absoluta que sirve para identificar a un archivo."
+    return os.path.normcase(os.path.abspath(ruta))
+
+
+class Empaquetador(object):
+    """Ubica rectangulos dentro de una pagina usando 'estantes'.
+
+    Cada estante es una franja horizontal de la pagina, y los
+    rectangulos se colocan de izquierda a derecha dentro del
+    primer estante en donde entran.
+    """
+
+    def __init__(self, ancho, alto, margen=1):
+        self.ancho = ancho
+        self.alto = alto
+        self.margen = margen
+        self.estantes = []     # listas [y, alto, x_libre]
+        self.y_libre = 0
+
+    def ubicar(self, ancho, alto):
+        "Retorna la posicion (x, y) para un rectangulo, o None si no hay lugar."
+        ancho += self.margen * 2
+        alto += self.margen * 2
+
+        for estante in self.estantes:
+            y, alto_del_estante, x_libre = estante
+
+            if alto <= alto_del_estante and x_libre + ancho <= self.ancho:
+                estante[2] += ancho
+                return x_libre + self.margen, y + self.margen
+
+        if self.y_libre + alto > self.alto or ancho > self.ancho:
+            return None
+
+        self.estantes.append([self.y_libre, alto, ancho])
+        self.y_libre += alto
+        return self.margen, self.estantes[-1][0] + self.margen
+
+
+class Atlas(object):
+    """Agrupa imagenes pequeñas dentro de unos pocos pixmaps compartidos.
+
+    Las imagenes que se agregan al atlas se copian dentro de una
+    pagina, y el motor las dibuja como una region de esa pagina. De
+    esta forma, actores con imagenes distintas pueden compartir el
+    mismo pixmap y dibujarse en un mismo lote.
+
+    El atlas se puede llenar mientras se cargan las imagenes, o
+    armar por adelantado desde un directorio y guardarse en disco:
+
+        >>> atlas = Atlas()
+        >>> atlas.agregar_directorio('data')
+        >>> atlas.guardar('data/atlas')
+    """
+
+    def __init__(self, tamano_de_pagina=512, tamano_maximo=128):
+        self.tamano_de_pagina = tamano_de_pagina
+        self.tamano_maximo = tamano_maximo
+        self.paginas = []
+        self._empaquetadores = []
+        self._regiones = {}
+
+    def obtener_region(self, ruta):
+        "Retorna la region (pagina, x, y, ancho, alto) de una imagen, o None si no esta en el atlas."
+        return self._regiones.get(normalizar_ruta(ruta))
+
+    def agregar(self, ruta, pixmap=None):
+        """Agrega una imagen al atlas y retorna su region (pagina, x, y, ancho, alto).
+
+        Las imagenes que superan ``tamano_maximo`` o que no se pueden
+        leer no se agregan, y en ese caso se retorna None.
+        """
+        clave = normalizar_ruta(ruta)
+
+        if clave in self._regiones:
+            return self._regiones[clave]
+
+        if pixmap is None:
+            pixmap = QtGui.QPixmap(ruta)
+
+        ancho, alto = pixmap.width(), pixmap.height()
+
+        maximo = min(self.tamano_maximo, self.tamano_de_pagina - 2)
+
+        if pixmap.isNull() or max(ancho, alto) > maximo:
+            return None
+
+        numero, (x, y) = self._reservar(ancho, alto)
+        pagina = self.paginas[numero]
+
+        pintor = QtGui.QPainter(pagina)
+        pintor.setCompositionMode(QtGui.QPainter.CompositionMode_Source)
+        pintor.drawPixmap(x, y, pixmap)
+        pintor.end()
+
+        self._regiones[clave] = (pagina, x, y, ancho, alto)
+        return self._regiones[clave]
+
+    def agregar_directorio(self, directorio, excluir=None):
+        """Agrega todas las imagenes de un directorio (y sus subdirectorios).
+
+        Las imagenes se agregan de la mas alta a la mas baja, porque
+        asi se desperdicia menos espacio en cada pagina. Los archivos
+        que comienzan con ``excluir`` se ignoran.
+        """
+        imagenes = []
+
+        for (raiz, directorios, archivos) in os.walk(directorio):
+            for archivo in archivos:
+                if excluir and archivo.startswith(excluir):
+                    continue
+
+                if os.path.splitext(archivo)[1].lower() in EXTENSIONES:
+                    ruta = os.path.join(raiz, archivo)
+                    imagenes.append((ruta, QtGui.QPixmap(ruta)))
+
+        imagenes.sort(key=lambda (ruta, pixmap): -pixmap.height())
+
+        for (ruta, pixmap) in imagenes:
+            self.agregar(ruta, pixmap)
+
+    def _reservar(self, ancho, alto):
+        "Busca lugar en las paginas existentes, o crea una pagina nueva."
+        for (numero, empaquetador) in enumerate(self._empaquetadores):
+            posicion = empaquetador.ubicar(ancho, alto)
+
+            if posicion:
+                return numero, posicion
+
+        self._crear_pagina()
+        return len(self.paginas) - 1, self._empaquetadores[-1].ubicar(ancho, alto)
+
+    def _crear_pagina(self):
+        pagina = QtGui.QPixmap(self.tamano_de_pagina, self.tamano_de_pagina)
+        pagina.fill(QtGui.QColor(0, 0, 0, 0))
+        self.paginas.append(pagina)
+        self._empaquetadores.append(Empaquetador(self.tamano_de_pagina, self.tamano_de_pagina))
+
+    def guardar(self, ruta_base):
+        """Guarda las paginas como imagenes png y un indice en '<ruta_base>.atlas'.
+
+        Las rutas del indice se guardan en forma relativa al archivo
+        del indice, asi el atlas se puede distribuir junto a los datos.
+        """
+        directorio = os.path.dirname(os.path.abspath(ruta_base))
+        paginas = []
+
+        for (numero, pagina) in enumerate(self.paginas):
+            nombre = "%s_%d.png" %(os.path.basename(ruta_base), numero)
+            pagina.save(os.path.join(directorio, nombre), "PNG")
+            paginas.append(nombre)
+
+        regiones = {}
+
+        for (clave, (pagina, x, y, ancho, alto)) in self._regiones.items():
+            relativa = os.path.relpath(clave, directorio).replace(os.sep, '/')
+            regiones[relativa] = [self.paginas.index(pagina), x, y, ancho, alto]
+
+        archivo = open(ruta_base + '.atlas', 'w')
+        json.dump({'paginas': paginas, 'regiones': regiones}, archivo, indent=1)
+        archivo.close()
+
+    def cargar(self, ruta_del_indice):
+        "Incorpora un atlas generado previamente con ``guardar``."
+        directorio = os.path.dirname(os.path.abspath(ruta_del_indice))
+        archivo = open(ruta_del_indice)
+        indice = json.load(archivo)
+        archivo.close()
+
+        paginas = [QtGui.QPixmap(os.path.join(directorio, x)) for x in indice['paginas']]
+
+        for (relativa, (numero, x, y, ancho, alto)) in indice['regiones'].items():
+            clave = normalizar_ruta(os.path.join(directorio, relativa))
+            self._regiones[clave] = (paginas[numero], x, y, ancho, alto)
+
+        # Las paginas cargadas no se vuelven a usar para agregar imagenes.
+        self.paginas.extend(paginas)
+        self._empaquetadores.extend([Empaquetador(0, 0) for x in paginas])
+
+    def __str__(self):
+        return "<Atlas con %d imagenes en %d paginas>" %(len(self._regiones), len(self.paginas))
+
+
+def construir(directorio, ruta_base, tamano_de_pagina=512, tamano_maximo=128):
+    "Arma un atlas con las imagenes de un directorio y lo guarda en disco."
+    atlas = Atlas(tamano_de_pagina, tamano_maximo)
+    # Evita incluir las paginas de un atlas generado anteriormente.
+    atlas.agregar_directorio(directorio, excluir=os.path.basename(ruta_base) + '_')
+    atlas.guardar(ruta_base)
+    return atlas
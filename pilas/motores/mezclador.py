@@ -0,0 +1,218 @@
+# -*- encoding: utf-8 -*-
+# pilas engine - a video game framework.
+#
+# copyright 2010 - hugo ruscitti
+# license: lgplv3 (see http://www.gnu.org/licenses/lgpl.html)
+#
+# website - http://www.pilas-engine.com.ar
+
+import os
+import StringIO
+import threading
+
+from pilas import cache
+from pilas import paquete
+import musica
+
+
+class Mezclador(object):
+    """Administra el mixer de pygame, los sonidos leidos y los canales.
+
+    El mixer se inicia una sola vez, y cada archivo se decodifica una
+    sola vez (los sonidos se guardan en una cache por ruta).
+
+    Los sonidos se reproducen sobre una cantidad fija de canales, y
+    cada sonido puede sonar como maximo ``voces_por_sonido`` veces al
+    mismo tiempo: si se repite muy rapido (por ejemplo una explosion
+    tras otra) se interrumpe su voz mas vieja. Si todos los canales
+    estan ocupados se interrumpe el que suena hace mas tiempo.
+
+    La musica de fondo usa sus propios canales (ver ``obtener_musica``),
+    que nunca se usan para los efectos ni se interrumpen por ellos. Si ``habilitado`` es False no se usa el audio.
+    """
+
+    def __init__(self, cantidad_de_canales=16, voces_por_sonido=4,
+            maximo_de_bytes=16 * 1024 * 1024, mixer=None, habilitado=True):
+        self.habilitado = habilitado
+        self.cantidad_de_canales = cantidad_de_canales
+        self.voces_por_sonido = voces_por_sonido
+        self.sonidos = cache.Cache(maximo_de_bytes=maximo_de_bytes, medir=self._medir)
+        self.reproducciones = 0
+        self.voces_interrumpidas = 0
+        self.reproducciones_descartadas = 0
+        self._mixer = mixer
+        self._iniciado = False
+        self._hay_audio = False
+        self._voces = {}
+        self._canales = []
+        self._inicios = []
+        self._musica = None
+        self._bloqueo = threading.Lock()
+
+    def _iniciar(self):
+        """Inicia el mixer la primera vez que se usa.
+
+        Si no hay un dispositivo de audio el juego sigue funcionando,
+        pero los sonidos no se cargan ni se reproducen.
+        """
+        if self._iniciado:
+            return self._hay_audio
+
+        self._iniciado = True
+
+        if not self.habilitado:
+            return False
+
+        if self._mixer is None:
+            import pygame
+            self._mixer = pygame.mixer
+            error = pygame.error
+        else:
+            error = Exception
+
+        try:
+            if not self._mixer.get_init():
+                self._mixer.init()
+
+            self._mixer.set_num_channels(self.cantidad_de_canales + musica.CANALES_DE_MUSICA)
+            self._mixer.set_reserved(musica.CANALES_DE_MUSICA)
+            self._canales = [self._mixer.Channel(x) for x in
+                    range(musica.CANALES_DE_MUSICA, self._mixer.get_num_channels())]
+            self._inicios = [0] * len(self._canales)
+            self._hay_audio = True
+        except error as e:
+            print "No se puede iniciar el audio:", e
+
+        return self._hay_audio
+
+    def _medir(self, sonido):
+        "Retorna la cantidad aproximada de bytes que ocupa un sonido decodificado."
+        try:
+            frecuencia, formato, canales = self._mixer.get_init()
+            return int(sonido.get_length() * frecuencia * canales * abs(formato) / 8)
+        except Exception:
+            return 0
+
+    def cargar(self, ruta):
+        "Retorna el sonido de un archivo, decodificandolo solo la primera vez."
+        return self._obtener_sonido(ruta, lambda: paquete.abrir(ruta))
+
+    def cargar_desde_datos(self, ruta, datos):
+        """Retorna el sonido de un archivo a partir de su contenido ya leido.
+
+        Sirve para leer el archivo en un hilo auxiliar (ver
+        ``pilas.sonidos.precargar_en_segundo_plano``) y decodificarlo
+        luego en el hilo principal. El sonido queda en la cache con la
+        misma clave que usa ``cargar``.
+        """
+        return self._obtener_sonido(ruta, lambda: StringIO.StringIO(datos))
+
+    def esta_cargado(self, ruta):
+        "Indica si el sonido de un archivo ya esta en la cache."
+        with self._bloqueo:
+            return self.sonidos.obtener(os.path.abspath(ruta)) is not None
+
+    def _obtener_sonido(self, ruta, abrir):
+        clave = os.path.abspath(ruta)
+
+        with self._bloqueo:
+            if not self._iniciar():
+                return None
+
+            sonido = self.sonidos.obtener(clave)
+
+        if sonido is None:
+            sonido = self._mixer.Sound(abrir())
+
+            with self._bloqueo:
+                self.sonidos.agregar(clave, sonido)
+
+        return sonido
+
+    def reproducir(self, sonido):
+        """Reproduce un sonido cargado con ``cargar``.
+
+        Retorna el canal en donde suena, o None si no se pudo reproducir.
+        """
+        if sonido is None or not self._iniciar():
+            self.reproducciones_descartadas += 1
+            return None
+
+        voces = [x for x in self._voces.get(sonido, [])
+                if self._canales[x].get_busy() and self._canales[x].get_sound() is sonido]
+
+        if len(voces) >= self.voces_por_sonido:
+            indice = voces.pop(0)
+            self._canales[indice].stop()
+            self.voces_interrumpidas += 1
+        else:
+            indice, ocupado = self._buscar_canal()
+
+            if indice is None:
+                self.reproducciones_descartadas += 1
+                return None
+
+            if ocupado:
+                self.voces_interrumpidas += 1
+
+        canal = self._canales[indice]
+        canal.play(sonido)
+        voces.append(indice)
+        self._voces[sonido] = voces
+        self.reproducciones += 1
+        self._inicios[indice] = self.reproducciones
+        return canal
+
+    def _buscar_canal(self):
+        """Retorna el indice de un canal de efectos libre, o el del que suena hace mas tiempo.
+
+        El segundo valor indica si el canal estaba ocupado. No se usa
+        ``find_channel`` porque pygame no excluye los canales reservados
+        para la musica.
+        """
+        mas_viejo = None
+
+        for (indice, canal) in enumerate(self._canales):
+            if not canal.get_busy():
+                return (indice, False)
+
+            if mas_viejo is None or self._inicios[indice] < self._inicios[mas_viejo]:
+                mas_viejo = indice
+
+        return (mas_viejo, True)
+
+    def detener(self, sonido):
+        "Detiene todas las voces de un sonido."
+        for indice in self._voces.pop(sonido, []):
+            if self._canales[indice].get_sound() is sonido:
+                self._canales[indice].stop()
+
+    def obtener_voces_activas(self):
+        "Retorna la cantidad de canales que estan sonando."
+        if not self._hay_audio:
+            return 0
+
+        return len([x for x in self._canales if x.get_busy()])
+
+    def obtener_musica(self):
+        "Retorna el reproductor de musica de fondo, o None si no hay audio."
+        with self._bloqueo:
+            if self._musica is None and self._iniciar():
+                self._musica = musica.Reproductor(self._mixer)
+
+        return self._musica
+
+    def obtener_estadisticas(self):
+        "Retorna un diccionario con las voces activas, reproducciones y sonidos en la cache."
+        return {
+            'canales': self.cantidad_de_canales,
+            'voces_activas': self.obtener_voces_activas(),
+            'reproducciones': self.reproducciones,
+            'voces_interrumpidas': self.voces_interrumpidas,
+            'reproducciones_descartadas': self.reproducciones_descartadas,
+            'sonidos': len(self.sonidos),
+            'bytes': self.sonidos.bytes,
+        }
+
+    def __str__(self):
+        return "<Mezclador con %(voces_activas)d voces activas y %(reproducciones_descartadas)d reproducciones descartadas>" %(self.obtener_estadisticas())
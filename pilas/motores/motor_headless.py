@@ -0,0 +1,284 @@
+# -*- encoding: utf-8 -*-
+# pilas engine - a video game framework.
+#
+# copyright 2010 - hugo ruscitti
+# license: lgplv3 (see http://www.gnu.org/licenses/lgpl.html)
+#
+# website - http://www.pilas-engine.com.ar
+
+import time
+
+from PyQt4 import QtGui, QtCore
+
+from pilas import fps
+from pilas import reloj
+from pilas import actores
+from pilas import paquete
+from pilas.motores import mezclador
+from pilas.motores.motor_qt import QtBase, QtImagen, QtGrilla, QtSuperficie
+
+
+class SinDibujo(object):
+    """Comportamiento de las imagenes que no se dibujan.
+
+    Solo se lee el tamaño de la imagen (sin decodificarla), asi
+    que no hace falta una QApplication ni una pantalla.
+    """
+
+    usa_un_pixmap = False
+
+    def _cargar(self, ruta):
+        if isinstance(ruta, paquete.RutaEnPaquete):
+            datos = QtCore.QBuffer()
+            datos.setData(ruta.leer())
+            tamano = QtGui.QImageReader(datos).size()
+        else:
+            tamano = QtGui.QImageReader(ruta).size()
+
+        if not tamano.isValid():
+            raise IOError("No se puede leer la imagen '%s'." %(ruta))
+
+        return QtCore.QRect(QtCore.QPoint(0, 0), tamano)
+
+    def dibujar(self, *k, **kv):
+        pass
+
+    def obtener_firma(self):
+        return self.ruta_original
+
+
+class ImagenSinDibujo(SinDibujo, QtImagen):
+    pass
+
+
+class GrillaSinDibujo(SinDibujo, QtGrilla):
+    pass
+
+
+class SuperficieSinDibujo(SinDibujo, QtSuperficie):
+    "Superficie que solo recuerda su tamaño e ignora las operaciones de dibujo."
+
+    def __init__(self, ancho, alto):
+        self.ruta_original = None
+        self._origen_x, self._origen_y = 0, 0
+        self._ancho, self._alto = ancho, alto
+
+    def iniciar_lote(self):
+        pass
+
+    def terminar_lote(self):
+        return 0
+
+    def pintar(self, *k, **kv):
+        pass
+
+    def pintar_parte_de_imagen(self, *k, **kv):
+        pass
+
+    def texto(self, *k, **kv):
+        pass
+
+    def circulo(self, *k, **kv):
+        pass
+
+    def rectangulo(self, *k, **kv):
+        pass
+
+    def linea(self, *k, **kv):
+        pass
+
+    def limpiar(self):
+        pass
+
+
+class SonidoSinAudio(object):
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+
+    def reproducir(self):
+        pass
+
+    def detener(self):
+        pass
+
+
+class Headless(QtBase):
+    """Motor que funciona sin ventana, pensado para servidores y pruebas.
+
+    La simulacion avanza tan rapido como sea posible en lugar de
+    hacerlo con un temporizador de 60 cuadros por segundo. Por
+    ejemplo, para simular diez segundos de juego:
+
+        >>> pilas.iniciar(usar_motor='headless')
+        >>> pilas.mundo.motor.avanzar(600)
+
+    Si ``dibujar`` es False (el modo por omision) los actores no se
+    dibujan y las imagenes no se decodifican, asi que no hace
+    falta una pantalla. Si ``dibujar`` es True cada cuadro se dibuja
+    sobre una QImage (en el atributo ``imagen``), y en ese caso
+    Qt necesita poder crear una QApplication.
+    """
+
+    def __init__(self, dibujar=False, rendimiento=60):
+        self.dibujar = dibujar
+        QtBase.__init__(self, rendimiento)
+        self.imagen = None
+        self.cuadros_ejecutados = 0
+        self.cuadros_por_ejecutar = None
+        self.detenido = False
+        self._inicio = None
+
+        if dibujar and not QtGui.QApplication.instance():
+            self._aplicacion = QtGui.QApplication([])
+
+    def _crear_pintor(self):
+        # Sin dibujo no hace falta un painter.
+        if self.dibujar:
+            return QtGui.QPainter()
+
+    def _crear_planificador(self, rendimiento):
+        # Los cuadros se ejecutan con ``avanzar``, sin temporizadores de Qt.
+        return fps.FPS(rendimiento, reloj=reloj.monotonico)
+
+    def _crear_mezclador(self):
+        return mezclador.Mezclador(habilitado=False)
+
+    def iniciar_ventana(self, ancho, alto, titulo, pantalla_completa):
+        self.ancho = ancho
+        self.alto = alto
+        self.ancho_original = ancho
+        self.alto_original = alto
+        self.titulo = titulo
+
+        if self.dibujar:
+            self.imagen = QtGui.QImage(ancho, alto, QtGui.QImage.Format_ARGB32_Premultiplied)
+
+    def ejecutar_bucle_principal(self, mundo, ignorar_errores):
+        """Avanza la simulacion hasta que se invoque a ``detener``.
+
+        Si el atributo ``cuadros_por_ejecutar`` tiene un numero, el bucle
+        termina luego de ejecutar esa cantidad de cuadros.
+        """
+        self.detenido = False
+
+        while not self.detenido:
+            if self.cuadros_por_ejecutar is not None and self.cuadros_ejecutados >= self.cuadros_por_ejecutar:
+                break
+
+            try:
+                self.avanzar()
+            except Exception as e:
+                if not ignorar_errores:
+                    raise
+
+                print e
+
+    def avanzar(self, cuadros=1):
+        "Ejecuta la cantidad de cuadros indicada, sin esperar entre uno y otro."
+        if self._inicio is None:
+            self._inicio = time.time()
+
+        for x in range(cuadros):
+            self.perfilador.comenzar_cuadro()
+            self.fps.actualizar()
+
+            # Cada cuadro simula exactamente un paso del reloj.
+            for paso in range(self.reloj.avanzar(self.reloj.paso)):
+                if not self.pausa_habilitada:
+                    self._actualizar_un_paso()
+
+            if self.dibujar:
+                self.dibujar_cuadro()
+
+            self.cuadros_ejecutados += 1
+
+    def detener(self):
+        self.detenido = True
+
+    def dibujar_cuadro(self):
+        "Dibuja todos los actores sobre la imagen del motor."
+        desde = self.perfilador.ahora()
+        self.imagen.fill(0)
+        self.canvas.begin(self.imagen)
+        self._dibujar_escena()
+        self.canvas.end()
+        self.perfilador.registrar('dibujado', desde)
+
+    def guardar_cuadro(self, ruta):
+        "Guarda el ultimo cuadro dibujado en un archivo de imagen."
+        self.imagen.save(ruta)
+
+    def obtener_cuadros_por_segundo(self):
+        "Retorna la cantidad de cuadros por segundo que se ejecutaron desde el inicio."
+        if self._inicio is None:
+            return 0
+
+        return self.cuadros_ejecutados / max(time.time() - self._inicio, 0.000001)
+
+    def cargar_imagen(self, ruta):
+        if self.dibujar:
+            return QtBase.cargar_imagen(self, ruta)
+
+        return ImagenSinDibujo(ruta)
+
+    def obtener_grilla(self, ruta, columnas, filas):
+        if self.dibujar:
+            return QtBase.obtener_grilla(self, ruta, columnas, filas)
+
+        return GrillaSinDibujo(ruta, columnas, filas)
+
+    def decodificar_imagen(self, ruta):
+        if self.dibujar:
+            return QtBase.decodificar_imagen(self, ruta)
+
+    def crear_imagen_decodificada(self, ruta, imagen, columnas=None, filas=1):
+        if self.dibujar:
+            return QtBase.crear_imagen_decodificada(self, ruta, imagen, columnas, filas)
+
+        if columnas is None:
+            return ImagenSinDibujo(ruta)
+        else:
+            return GrillaSinDibujo(ruta, columnas, filas)
+
+    def obtener_superficie(self, ancho, alto):
+        if self.dibujar:
+            return QtBase.obtener_superficie(self, ancho, alto)
+
+        return SuperficieSinDibujo(ancho, alto)
+
+    def cargar_sonido(self, ruta):
+        return SonidoSinAudio(ruta)
+
+    def obtener_area_de_texto(self, texto, magnitud=10):
+        if self.dibujar:
+            return QtBase.obtener_area_de_texto(self, texto, magnitud)
+
+        # Sin fuentes disponibles se usa una aproximacion.
+        lineas = texto.split('\n')
+        ancho = max([len(linea) for linea in lineas]) * magnitud * 0.6
+        return int(ancho), int(len(lineas) * magnitud * 1.5)
+
+    def escala(self):
+        return 1.0
+
+    def update(self, *k):
+        pass
+
+    def pantalla_completa(self):
+        pass
+
+    def pantalla_modo_ventana(self):
+        pass
+
+    def esta_en_pantalla_completa(self):
+        return False
+
+    def ocultar_puntero_del_mouse(self):
+        pass
+
+    def mostrar_puntero_del_mouse(self):
+        pass
+
+    def alternar_pausa(self):
+        self.pausa_habilitada = not self.pausa_habilitada
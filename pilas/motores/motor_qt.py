@@ -9,6 +9,8 @@
 import os
 import sys
 import copy
+import math
+import contextlib
 from PyQt4 import QtGui, QtCore
 from PyQt4.QtGui import QWidget
 
@@ -21,6 +23,8 @@ except ImportError:
 
 
 import motor
+import atlas
+import mezclador
 from pilas import imagenes
 from pilas import actores
 from pilas import eventos
@@ -30,6 +34,73 @@ from pilas import depurador
 from pilas import fps
 from pilas import simbolos
 from pilas import colores
+from pilas import cache
+from pilas import paquete
+from pilas import reloj
+from pilas import perfilador
+from pilas import trazas
+
+
+def leer_imagen(ruta):
+    "Lee un archivo como QImage, aunque este dentro de un paquete de recursos."
+    if isinstance(ruta, paquete.RutaEnPaquete):
+        return QtGui.QImage.fromData(ruta.leer())
+
+    return QtGui.QImage(ruta)
+
+def leer_pixmap(ruta):
+    "Lee un archivo como QPixmap, aunque este dentro de un paquete de recursos."
+    if isinstance(ruta, paquete.RutaEnPaquete):
+        pixmap = QtGui.QPixmap()
+        pixmap.loadFromData(ruta.leer())
+        return pixmap
+
+    return QtGui.QPixmap(ruta)
+
+def medir_pixmap(pixmap):
+    "Retorna la cantidad de bytes que ocupa un pixmap de 32 bits."
+    return pixmap.width() * pixmap.height() * 4
+
+# Textos ya dibujados, indexados por (texto, magnitud, fuente, color).
+cache_de_textos = cache.Cache(maximo_de_elementos=256, maximo_de_bytes=4 * 1024 * 1024,
+                              medir=lambda (pixmap, ascendente): medir_pixmap(pixmap))
+
+# Los textos del depurador cambian en cada cuadro (los cuadros por
+# segundo, la posicion del mouse...), asi que usan una cache aparte
+# para no desplazar a los textos del juego.
+cache_de_textos_del_depurador = cache.Cache(maximo_de_elementos=32,
+                              medir=lambda (pixmap, ascendente): medir_pixmap(pixmap))
+
+def obtener_pixmap_de_texto(texto, magnitud, fuente, color, cache_de_pixmaps=cache_de_textos):
+    """Retorna un pixmap con el texto dibujado y la distancia a la primer linea base.
+
+    Los pixmaps se guardan en ``cache_de_pixmaps``, asi que un texto que
+    no cambia se dibuja en pantalla simplemente copiando el pixmap.
+    """
+    r, g, b, a = color.obtener_componentes()
+    clave = (texto, magnitud, fuente, (r, g, b))
+    resultado = cache_de_pixmaps.obtener(clave)
+
+    if not resultado:
+        fuente = QtGui.QFont(fuente, magnitud)
+        metrica = QtGui.QFontMetrics(fuente)
+        lineas = texto.split('\n')
+        ancho = max([metrica.width(linea) for linea in lineas])
+
+        pixmap = QtGui.QPixmap(max(ancho, 1), metrica.height() * len(lineas))
+        pixmap.fill(QtGui.QColor(0, 0, 0, 0))
+
+        pintor = QtGui.QPainter(pixmap)
+        pintor.setPen(QtGui.QColor(r, g, b))
+        pintor.setFont(fuente)
+
+        for (i, linea) in enumerate(lineas):
+            pintor.drawText(0, metrica.ascent() + i * metrica.height(), linea)
+
+        pintor.end()
+        resultado = cache_de_pixmaps.agregar(clave, (pixmap, metrica.ascent()))
+
+    return resultado
 
 
 class BaseActor(object):
@@ -84,15 +155,35 @@ class BaseActor(object):
         
 class QtImagen(object):
 
-    def __init__(self, ruta):
+    # Indica si la imagen es una region de un pixmap, y por lo tanto se
+    # puede dibujar en lotes o guardar transformada en una cache.
+    usa_un_pixmap = True
+
+    def __init__(self, ruta, region=None):
+        """Carga la imagen desde un archivo.
+
+        Si se indica una ``region`` (pagina, x, y, ancho, alto) la imagen
+        no se lee del disco, y pasa a ser esa parte de un pixmap
+        compartido (por ejemplo la pagina de un atlas).
+        """
         self.ruta_original = ruta
-        self._imagen = QtGui.QPixmap(ruta)
+
+        if region:
+            self._imagen, self._origen_x, self._origen_y, self._ancho, self._alto = region
+        else:
+            self._imagen = self._cargar(ruta)
+            self._origen_x, self._origen_y = 0, 0
+            self._ancho = self._imagen.size().width()
+            self._alto = self._imagen.size().height()
+
+    def _cargar(self, ruta):
+        return leer_pixmap(ruta)
 
     def ancho(self):
-        return self._imagen.size().width()
+        return self._ancho
 
     def alto(self):
-        return self._imagen.size().height()
+        return self._alto
 
     def centro(self):
         "Retorna una tupla con la coordenada del punto medio del la imagen."
@@ -110,6 +201,10 @@ class QtImagen(object):
            rotacion: angulo de inclinacion en sentido de las agujas del reloj.
         """
 
+        if self._se_puede_usar_la_cache(motor, escala_x, escala_y, rotacion):
+            self._dibujar_desde_la_cache(motor, x, y, dx, dy, escala_x, escala_y, rotacion, transparencia)
+            return
+
         motor.canvas.save()
         centro_x, centro_y = motor.centro_fisico()
         motor.canvas.translate(x + centro_x, centro_y - y)
@@ -123,7 +218,87 @@ class QtImagen(object):
         motor.canvas.restore()
 
     def _dibujar_pixmap(self, motor, x, y):
-        motor.canvas.drawPixmap(x, y, self._imagen)
+        motor.canvas.drawPixmap(x, y, self._imagen, self._origen_x, self._origen_y,
+                self._ancho, self._alto)
+
+    def _se_puede_usar_la_cache(self, motor, escala_x, escala_y, rotacion):
+        "Indica si la imagen se tiene que dibujar usando la cache de transformaciones."
+        return (motor.usar_cache_de_transformaciones and self.usa_un_pixmap and
+                (rotacion or escala_x != 1 or escala_y != 1))
+
+    def _dibujar_desde_la_cache(self, motor, x, y, dx, dy, escala_x, escala_y, rotacion, transparencia):
+        "Dibuja la imagen copiando una version ya rotada y escalada."
+        pixmap, transformacion = self._obtener_pixmap_transformado(motor, escala_x, escala_y, rotacion)
+        centro_x, centro_y = motor.centro_fisico()
+
+        # Busca donde quedo el centro de la imagen luego de transformarla.
+        centro = transformacion.map(QtCore.QPointF(dx, dy))
+        x = x + centro_x - centro.x()
+        y = centro_y - y - centro.y()
+
+        if transparencia:
+            motor.canvas.save()
+            motor.canvas.setOpacity(1 - transparencia/100.0)
+            motor.canvas.drawPixmap(QtCore.QPointF(x, y), pixmap)
+            motor.canvas.restore()
+        else:
+            motor.canvas.drawPixmap(QtCore.QPointF(x, y), pixmap)
+
+    def _obtener_pixmap_transformado(self, motor, escala_x, escala_y, rotacion):
+        """Retorna la imagen rotada y escalada junto con la transformacion aplicada.
+
+        El angulo y la escala se redondean para que actores con valores
+        muy parecidos compartan el mismo pixmap.
+        """
+        paso = motor.paso_de_angulo_de_la_cache
+        rotacion = round(rotacion / paso) * paso
+        escala_x, escala_y = round(escala_x, 2), round(escala_y, 2)
+        espejado = escala_x < 0
+        rectangulo = self._obtener_rectangulo_de_origen()
+        clave = (self.obtener_firma(), rectangulo, rotacion, abs(escala_x), escala_y, espejado)
+        resultado = motor.cache_de_transformaciones.obtener(clave)
+
+        if not resultado:
+            origen_x, origen_y, ancho, alto = rectangulo
+            transformacion = QtGui.QTransform()
+            transformacion.rotate(rotacion)
+            transformacion.scale(escala_x, escala_y)
+
+            recorte = self._imagen.copy(origen_x, origen_y, ancho, alto)
+            pixmap = recorte.transformed(transformacion, QtCore.Qt.SmoothTransformation)
+            transformacion = QtGui.QPixmap.trueMatrix(transformacion, ancho, alto)
+            resultado = motor.cache_de_transformaciones.agregar(clave, (pixmap, transformacion))
+
+        return resultado
+
+    def obtener_firma(self):
+        "Retorna un valor que cambia cada vez que cambia lo que muestra la imagen."
+        return self._imagen.cacheKey(), self._origen_x, self._origen_y
+
+    def _obtener_rectangulo_de_origen(self):
+        "Retorna el area (x, y, ancho, alto) del pixmap que ocupa la imagen."
+        return self._origen_x, self._origen_y, self._ancho, self._alto
+
+    def obtener_fragmento(self, motor, x, y, dx=0, dy=0, escala_x=1, escala_y=1, rotacion=0, transparencia=0):
+        """Retorna un fragmento equivalente a invocar a ``dibujar`` con los mismos argumentos.
+
+        Los fragmentos se dibujan en grupo con ``QPainter.drawPixmapFragments``,
+        y a diferencia de ``dibujar`` no alteran el estado del painter.
+        """
+        origen_x, origen_y, ancho, alto = self._obtener_rectangulo_de_origen()
+        centro_x, centro_y = motor.centro_fisico()
+
+        # El fragmento se posiciona a partir del punto medio de la imagen.
+        medio_x = (ancho / 2.0 - dx) * escala_x
+        medio_y = (alto / 2.0 - dy) * escala_y
+        angulo = math.radians(rotacion)
+        coseno, seno = math.cos(angulo), math.sin(angulo)
+        posicion = QtCore.QPointF(x + centro_x + medio_x * coseno - medio_y * seno,
+                                  centro_y - y + medio_x * seno + medio_y * coseno)
+
+        return QtGui.QPainter.PixmapFragment.create(posicion,
+                QtCore.QRectF(origen_x, origen_y, ancho, alto),
+                escala_x, escala_y, rotacion, 1 - transparencia/100.0)
 
     def __str__(self):
         nombre_imagen = os.path.basename(self.ruta_original)
@@ -140,8 +315,8 @@ class QtGrilla(QtImagen):
        para ``definir_cuadro`` y ``avanzar`` el cuadro actual.
     """
 
-    def __init__(self, ruta, columnas=1, filas=1):
-        QtImagen.__init__(self, ruta)
+    def __init__(self, ruta, columnas=1, filas=1, region=None):
+        QtImagen.__init__(self, ruta, region)
         self.cantidad_de_cuadros = columnas * filas
         self.columnas = columnas
         self.filas = filas
@@ -156,9 +331,16 @@ class QtGrilla(QtImagen):
         return self.cuadro_alto
 
     def _dibujar_pixmap(self, motor, x, y):
-        motor.canvas.drawPixmap(x, y, self._imagen, self.dx, self.dy, 
+        motor.canvas.drawPixmap(x, y, self._imagen, self._origen_x + self.dx,
+                self._origen_y + self.dy, self.cuadro_ancho, self.cuadro_alto)
+
+    def _obtener_rectangulo_de_origen(self):
+        return (self._origen_x + self.dx, self._origen_y + self.dy,
                 self.cuadro_ancho, self.cuadro_alto)
 
+    def obtener_firma(self):
+        return self._imagen.cacheKey(), self._origen_x, self._origen_y, self._cuadro
+
     def definir_cuadro(self, cuadro):
         self._cuadro = cuadro
 
@@ -187,22 +369,18 @@ class QtGrilla(QtImagen):
 
 class QtTexto(QtImagen):
 
+    usa_un_pixmap = False
+
     def __init__(self, texto, magnitud, motor):
         self._ancho, self._alto = motor.obtener_area_de_texto(texto, magnitud)
 
     def _dibujar_pixmap(self, motor, dx, dy):
         nombre_de_fuente = motor.canvas.font().family()
-        fuente = QtGui.QFont(nombre_de_fuente, self.magnitud)
-        metrica = QtGui.QFontMetrics(fuente)
+        pixmap, ascendente = obtener_pixmap_de_texto(self.texto, self.magnitud,
+                nombre_de_fuente, self.color)
 
-        r, g, b, a = self.color.obtener_componentes()
-        motor.canvas.setPen(QtGui.QColor(r, g, b))
-        motor.canvas.setFont(fuente)
-        lines = self.texto.split('\n')
-
-        for line in lines:
-            motor.canvas.drawText(dx, dy + self._alto, line)
-            dy += metrica.height()
+        # La primer linea base del texto queda a la altura 'dy + self._alto'.
+        motor.canvas.drawPixmap(dx, dy + self._alto - ascendente, pixmap)
 
     def ancho(self):
         return self._ancho
@@ -210,11 +388,16 @@ class QtTexto(QtImagen):
     def alto(self):
         return self._alto
 
+    def obtener_firma(self):
+        return self.texto, self.magnitud, self.color.obtener_componentes()
+
 
 class QtLienzo(QtImagen):
 
-    def __init__(self):
-        pass
+    usa_un_pixmap = False
+
+    def __init__(self, cache_de_textos=cache_de_textos):
+        self.cache_de_textos = cache_de_textos
 
     def texto(self, motor, cadena, x=0, y=0, magnitud=10, fuente=None, color=colores.negro):
         "Imprime un texto respespetando el desplazamiento de la camara."
@@ -224,19 +407,21 @@ class QtLienzo(QtImagen):
         "Imprime un texto sin respetar al camara."
         x, y = utils.hacer_coordenada_pantalla_absoluta(x, y)
 
-        r, g, b, a = color.obtener_componentes()
-        motor.canvas.setPen(QtGui.QColor(r, g, b))
-
         if not fuente:
             fuente = motor.canvas.font().family()
 
-        motor.canvas.setFont(QtGui.QFont(fuente, magnitud))
-        motor.canvas.drawText(x, y, cadena)
+        pixmap, ascendente = obtener_pixmap_de_texto(cadena, magnitud, fuente, color,
+                self.cache_de_textos)
+        motor.canvas.drawPixmap(x, y - ascendente, pixmap)
 
     def pintar(self, motor, color):
         r, g, b, a = color.obtener_componentes()
-        ancho, alto = motor.obtener_area()
-        motor.canvas.fillRect(0, 0, ancho, alto, QtGui.QColor(r, g, b))
+        # Pinta todo el dispositivo, asi tambien se cubre el margen
+        # de la capa estatica.
+        motor.canvas.save()
+        motor.canvas.resetTransform()
+        motor.canvas.fillRect(motor.canvas.window(), QtGui.QColor(r, g, b))
+        motor.canvas.restore()
 
     def linea(self, motor, x0, y0, x1, y1, color=colores.negro, grosor=1):
         x0, y0 = utils.hacer_coordenada_pantalla_absoluta(x0, y0)
@@ -273,36 +458,142 @@ class QtLienzo(QtImagen):
         motor.canvas.setPen(pen)
         motor.canvas.drawEllipse(x -radio, y-radio, radio*2, radio*2)
 
-    def rectangulo(self, motor, x, y, ancho, alto, color=colores.negro, grosor=1):
+    def rectangulo(self, motor, x, y, ancho, alto, color=colores.negro, grosor=1, relleno=False):
         x, y = utils.hacer_coordenada_pantalla_absoluta(x, y)
 
         r, g, b, a = color.obtener_componentes()
         color = QtGui.QColor(r, g, b)
+
+        if relleno:
+            motor.canvas.fillRect(x, y, ancho, alto, color)
+            return
+
         pen = QtGui.QPen(color, grosor)
         motor.canvas.setPen(pen)
         motor.canvas.drawRect(x, y, ancho, alto)
 
 class QtSuperficie(QtImagen):
+    """Imagen sobre la que se puede dibujar con primitivas.
+
+    Cada primitiva abre y cierra un painter sobre el pixmap. Para
+    dibujar muchas primitivas seguidas conviene agruparlas en un
+    lote, asi el painter se abre una sola vez:
+
+        >>> with superficie.lote():
+        ...     superficie.linea(0, 0, 100, 100)
+        ...     superficie.circulo(50, 50, 10)
+    """
 
     def __init__(self, ancho, alto):
         self._imagen = QtGui.QPixmap(ancho, alto)
         self._imagen.fill(QtGui.QColor(255, 255, 255, 0))
+        self._origen_x, self._origen_y = 0, 0
+        self._ancho, self._alto = ancho, alto
         self.canvas = QtGui.QPainter()
+        self._version = 0
+        self._lotes_abiertos = 0
+        self.primitivas_en_el_lote = 0
+        self.primitivas_del_ultimo_lote = 0
+
+    def obtener_firma(self):
+        return self._imagen.cacheKey(), self._version
+
+    def iniciar_lote(self):
+        "Mantiene el painter abierto hasta que se llame a ``terminar_lote``."
+        self._lotes_abiertos += 1
+
+    def terminar_lote(self):
+        """Cierra el lote abierto con ``iniciar_lote``.
+
+        Retorna la cantidad de primitivas que se dibujaron en el lote.
+        """
+        self._lotes_abiertos = max(self._lotes_abiertos - 1, 0)
+
+        if self._lotes_abiertos:
+            return self.primitivas_en_el_lote
+
+        return self._cerrar_painter()
+
+    @contextlib.contextmanager
+    def lote(self):
+        "Agrupa las primitivas de un bloque ``with`` en un solo lote."
+        self.iniciar_lote()
+
+        try:
+            yield self
+        finally:
+            self.terminar_lote()
+
+    def _comenzar(self):
+        "Prepara el painter para dibujar una primitiva."
+        self._version += 1
+
+        if not self.canvas.isActive():
+            self.canvas.begin(self._imagen)
+
+        if self._lotes_abiertos:
+            self.primitivas_en_el_lote += 1
+
+        # Cada primitiva comienza con el estado inicial del painter.
+        self.canvas.save()
+
+    def _terminar(self):
+        self.canvas.restore()
+
+        if not self._lotes_abiertos:
+            self.canvas.end()
+
+    def _cerrar_painter(self):
+        """Termina de dibujar las primitivas pendientes sobre el pixmap.
+
+        Retorna la cantidad de primitivas que se dibujaron desde
+        que se abrio el painter.
+        """
+        if self.canvas.isActive():
+            self.canvas.end()
+
+        if self.primitivas_en_el_lote:
+            self.primitivas_del_ultimo_lote = self.primitivas_en_el_lote
+            self.primitivas_en_el_lote = 0
+
+        return self.primitivas_del_ultimo_lote
+
+    def _rellenar(self, color):
+        if self.canvas.isActive():
+            self._comenzar()
+            self.canvas.setCompositionMode(QtGui.QPainter.CompositionMode_Source)
+            self.canvas.fillRect(self._imagen.rect(), color)
+            self._terminar()
+        else:
+            self._imagen.fill(color)
+            self._version += 1
+
+    def dibujar(self, *k, **kv):
+        self._cerrar_painter()
+        QtImagen.dibujar(self, *k, **kv)
+
+    def obtener_fragmento(self, *k, **kv):
+        self._cerrar_painter()
+        return QtImagen.obtener_fragmento(self, *k, **kv)
 
     def pintar(self, color):
         r, g, b, a = color.obtener_componentes()
-        self._imagen.fill(QtGui.QColor(r, g, b, a))
+        self._rellenar(QtGui.QColor(r, g, b, a))
 
     def pintar_parte_de_imagen(self, imagen, origen_x, origen_y, ancho, alto, x, y):
-        self.canvas.begin(self._imagen)
-        self.canvas.drawPixmap(x, y, imagen._imagen, origen_x, origen_y, ancho, alto)
-        self.canvas.end()
+        if isinstance(imagen, QtSuperficie) and imagen is not self:
+            imagen._cerrar_painter()
+
+        self._comenzar()
+        self.canvas.drawPixmap(x, y, imagen._imagen, imagen._origen_x + origen_x,
+                imagen._origen_y + origen_y, ancho, alto)
+        self._terminar()
 
     def pintar_imagen(self, imagen, x=0, y=0):
         self.pintar_parte_de_imagen(imagen, 0, 0, imagen.ancho(), imagen.alto(), x, y)
 
     def texto(self, cadena, x=0, y=0, magnitud=10, fuente=None, color=colores.negro):
-        self.canvas.begin(self._imagen)
+        self._comenzar()
         r, g, b, a = color.obtener_componentes()
         self.canvas.setPen(QtGui.QColor(r, g, b))
         dx = x
@@ -319,10 +610,10 @@ class QtSuperficie(QtImagen):
             self.canvas.drawText(dx, dy, line)
             dy += metrica.height()
 
-        self.canvas.end()
+        self._terminar()
 
     def circulo(self, x, y, radio, color=colores.negro, relleno=False, grosor=1):
-        self.canvas.begin(self._imagen)
+        self._comenzar()
 
         r, g, b, a = color.obtener_componentes()
         color = QtGui.QColor(r, g, b)
@@ -333,10 +624,10 @@ class QtSuperficie(QtImagen):
             self.canvas.setBrush(color)
 
         self.canvas.drawEllipse(x -radio, y-radio, radio*2, radio*2)
-        self.canvas.end()
+        self._terminar()
 
     def rectangulo(self, x, y, ancho, alto, color=colores.negro, relleno=False, grosor=1):
-        self.canvas.begin(self._imagen)
+        self._comenzar()
 
         r, g, b, a = color.obtener_componentes()
         color = QtGui.QColor(r, g, b)
@@ -347,10 +638,10 @@ class QtSuperficie(QtImagen):
             self.canvas.setBrush(color)
 
         self.canvas.drawRect(x, y, ancho, alto)
-        self.canvas.end()
+        self._terminar()
 
     def linea(self, x, y, x2, y2, color=colores.negro, grosor=1):
-        self.canvas.begin(self._imagen)
+        self._comenzar()
 
         r, g, b, a = color.obtener_componentes()
         color = QtGui.QColor(r, g, b)
@@ -358,7 +649,7 @@ class QtSuperficie(QtImagen):
         self.canvas.setPen(pen)
 
         self.canvas.drawLine(x, y, x2, y2)
-        self.canvas.end()
+        self._terminar()
 
     def poligono(self, puntos, color, grosor, cerrado=False):
         x, y = puntos[0]
@@ -366,16 +657,17 @@ class QtSuperficie(QtImagen):
         if cerrado:
             puntos.append((x, y))
 
-        for p in puntos[1:]:
-            nuevo_x, nuevo_y = p
-            self.linea(x, y, nuevo_x, nuevo_y, color, grosor)
-            x, y = nuevo_x, nuevo_y
+        with self.lote():
+            for p in puntos[1:]:
+                nuevo_x, nuevo_y = p
+                self.linea(x, y, nuevo_x, nuevo_y, color, grosor)
+                x, y = nuevo_x, nuevo_y
 
     def dibujar_punto(self, x, y, color=colores.negro):
         self.circulo(x, y, 3, color=color, relleno=True)
 
     def limpiar(self):
-        self._imagen.fill(QtGui.QColor(0, 0, 0, 0))
+        self._rellenar(QtGui.QColor(0, 0, 0, 0))
 
 class QtActor(BaseActor):
 
@@ -388,8 +680,13 @@ class QtActor(BaseActor):
 
         self.x = x
         self.y = y
+        self._posicion_anterior = None
         BaseActor.__init__(self)
 
+    def recordar_posicion(self):
+        "Guarda la posicion actual, para dibujar entre esta y la del paso siguiente."
+        self._posicion_anterior = (self.x, self.y)
+
     def definir_imagen(self, imagen):
         # permite que varios actores usen la misma grilla.
         if isinstance(imagen, QtGrilla):
@@ -400,51 +697,152 @@ class QtActor(BaseActor):
     def obtener_imagen(self):
         return self.imagen
 
-    def dibujar(self, motor):
+    def _obtener_transformacion(self, motor):
+        "Retorna la posicion relativa a la camara y la escala a utilizar para dibujar."
         escala_x, escala_y = self._escala_x, self._escala_y
+        x, y = self.x, self.y
 
         if self._espejado:
             escala_x *= -1
 
+        if motor.interpolar and self._posicion_anterior:
+            alfa = motor.reloj.alfa
+            anterior_x, anterior_y = self._posicion_anterior
+            x = anterior_x + (x - anterior_x) * alfa
+            y = anterior_y + (y - anterior_y) * alfa
+
         if not self.fijo:
-            x = self.x - motor.camara_x
-            y = self.y - motor.camara_y
-        else:
-            x = self.x
-            y = self.y
+            x -= motor.camara_x
+            y -= motor.camara_y
 
+        return x, y, escala_x, escala_y
+
+    def dibujar(self, motor):
+        x, y, escala_x, escala_y = self._obtener_transformacion(motor)
         self.imagen.dibujar(motor, x, y,
                 self.centro_x, self.centro_y,
                 escala_x, escala_y, self._rotacion, self._transparencia)
 
+    def obtener_firma(self):
+        "Retorna una tupla que cambia cada vez que el actor se tiene que volver a dibujar."
+        return (self.x, self.y, self._escala_x, self._escala_y, self._rotacion,
+                self._transparencia, self._espejado, self.fijo,
+                self.centro_x, self.centro_y, self.imagen.obtener_firma())
+
+    def obtener_fragmento(self, motor):
+        """Retorna una tupla (pixmap, fragmento) para dibujar al actor en un lote.
+
+        Si la imagen del actor no admite dibujarse en lotes retorna None.
+        """
+        if not self.imagen.usa_un_pixmap:
+            return None
+
+        x, y, escala_x, escala_y = self._obtener_transformacion(motor)
+
+        if self.imagen._se_puede_usar_la_cache(motor, escala_x, escala_y, self._rotacion):
+            return None
+
+        fragmento = self.imagen.obtener_fragmento(motor, x, y,
+                self.centro_x, self.centro_y,
+                escala_x, escala_y, self._rotacion, self._transparencia)
+        return self.imagen._imagen, fragmento
+
+    def obtener_bordes_en_pantalla(self, motor):
+        """Retorna el rectangulo (izquierda, arriba, derecha, abajo) que ocupa el actor.
+
+        El rectangulo esta en coordenadas de pantalla (sin escalar), y
+        contempla el desplazamiento de la camara, el centro, la escala
+        y la rotacion del actor.
+        """
+        ancho, alto = self.imagen.ancho(), self.imagen.alto()
+        x, y, escala_x, escala_y = self._obtener_transformacion(motor)
+
+        centro_x, centro_y = motor.centro_fisico()
+        x, y = x + centro_x, centro_y - y
+
+        angulo = math.radians(self._rotacion)
+        coseno, seno = math.cos(angulo), math.sin(angulo)
+        xs, ys = [], []
+
+        for (px, py) in ((0, 0), (ancho, 0), (0, alto), (ancho, alto)):
+            px = (px - self.centro_x) * escala_x
+            py = (py - self.centro_y) * escala_y
+            xs.append(x + px * coseno - py * seno)
+            ys.append(y + px * seno + py * coseno)
+
+        return min(xs), min(ys), max(xs), max(ys)
+
 class QtSonido:
 
-    def __init__(self, ruta):
-        import pygame
-        pygame.mixer.init()
-        pygame.mixer.init()
-        self.sonido = pygame.mixer.Sound(ruta)
+    def __init__(self, ruta, mezclador):
+        self.ruta = ruta
+        self.mezclador = mezclador
+        self.sonido = mezclador.cargar(ruta)
 
     def reproducir(self):
-        # TODO: quitar esta nota...
-        # print "Usando pygame para reproducir sonido"
-        self.sonido.play()
+        return self.mezclador.reproducir(self.sonido)
+
+    def detener(self):
+        self.mezclador.detener(self.sonido)
         
 class QtBase(motor.Motor):
     
     #app = QtGui.QApplication([])
     
-    def __init__(self):
+    def __init__(self, rendimiento=60):
         motor.Motor.__init__(self)
-        self.canvas = QtGui.QPainter()
-        self.setMouseTracking(True)
-        self.fps = fps.FPS(60, True)
+        self.canvas = self._crear_pintor()
+        # Planifica los cuadros a dibujar por segundo, la logica siempre avanza en pasos de 1/60.
+        self.fps = self._crear_planificador(rendimiento)
+        # La logica avanza en pasos fijos de 1/60, segun el tiempo real transcurrido.
+        self.reloj = reloj.AcumuladorDePasoFijo(1/60.0, maximo_de_pasos=5)
+        # Si esta habilitado, los actores se dibujan entre su posicion
+        # del paso anterior y la actual (ver ``reloj.alfa``).
+        self.interpolar = False
         self.pausa_habilitada = False
-        self.depurador = depurador.Depurador(self.obtener_lienzo(), self.fps)
+        # Mide cuanto tarda cada fase de los ultimos cuadros (ver la tecla F6).
+        self.perfilador = perfilador.Perfilador()
+        self.depurador = depurador.Depurador(QtLienzo(cache_de_textos_del_depurador), self.fps)
         self.mouse_x = 0
         self.mouse_y = 0
         self.camara_x = 0
         self.camara_y = 0
+        self.descartar_actores_fuera_de_camara = True
+        self.actores_descartados = 0
+        self.agrupar_dibujado = hasattr(QtGui.QPainter, 'drawPixmapFragments')
+        self.lotes_dibujados = 0
+        # Si esta habilitado, solo se redibuja el area de los actores que
+        # cambiaron desde el cuadro anterior.
+        self.dibujado_parcial = False
+        # Guarda versiones rotadas y escaladas de las imagenes para evitar
+        # transformarlas en cada cuadro.
+        self.usar_cache_de_transformaciones = False
+        self.paso_de_angulo_de_la_cache = 1
+        self.atlas = None
+        # El mixer de audio y los sonidos decodificados.
+        self.mezclador = self._crear_mezclador()
+        # Si esta habilitado, los actores estaticos que se dibujan primero
+        # (como los fondos) se componen una sola vez sobre un pixmap con
+        # algo de margen.
+        self.usar_capa_estatica = False
+        self.margen_de_la_capa_estatica = 128
+        self.capas_estaticas_generadas = 0
+        self._capa_estatica = None
+        self.cache_de_transformaciones = cache.Cache(maximo_de_bytes=8 * 1024 * 1024,
+                medir=lambda (pixmap, transformacion): medir_pixmap(pixmap))
+        self._estado_de_actores = {}
+        self._orden_de_actores = []
+        self._camara_anterior = None
+        self._area_a_dibujar = None
+
+    def _crear_pintor(self):
+        return QtGui.QPainter()
+
+    def _crear_planificador(self, rendimiento):
+        return fps.FPS(rendimiento)
+
+    def _crear_mezclador(self):
+        return mezclador.Mezclador()
 
     def iniciar_ventana(self, ancho, alto, titulo, pantalla_completa):
         self.ancho = ancho
@@ -460,8 +858,8 @@ class QtBase(motor.Motor):
         else:
             self.show()
 
-        # Activa la invocacion al evento timerEvent.
-        self.startTimer(1000/60.0)
+        # Comienza a ejecutar los cuadros del juego.
+        self.fps.iniciar(self._ejecutar_cuadro)
 
     def pantalla_completa(self):
         self.showFullScreen()
@@ -489,6 +887,14 @@ class QtBase(motor.Motor):
     def obtener_area(self):
         return (self.ancho_original, self.alto_original)
 
+    def obtener_area_visible(self):
+        """Retorna el area (x0, y0, x1, y1) de la pantalla que se esta dibujando.
+
+        Normalmente es toda la ventana, pero puede ser mas chica (si solo
+        se redibuja una parte) o mas grande (al generar la capa estatica).
+        """
+        return self._area_a_dibujar or (0, 0, self.ancho_original, self.alto_original)
+
     def centrar_ventana(self):
         escritorio = QtGui.QDesktopWidget().screenGeometry()
         self.setGeometry(
@@ -502,7 +908,7 @@ class QtBase(motor.Motor):
         return QtTexto(texto, magnitud, self)
 
     def obtener_grilla(self, ruta, columnas, filas):
-        return QtGrilla(ruta, columnas, filas)
+        return QtGrilla(ruta, columnas, filas, self._obtener_region_del_atlas(ruta))
 
     def actualizar_pantalla(self):
         self.ventana.update()
@@ -515,10 +921,49 @@ class QtBase(motor.Motor):
         return (self.camara_x, self.camara_y)
 
     def cargar_sonido(self, ruta):
-        return QtSonido(ruta)
+        return QtSonido(ruta, self.mezclador)
 
     def cargar_imagen(self, ruta):
-        return QtImagen(ruta)
+        return QtImagen(ruta, self._obtener_region_del_atlas(ruta))
+
+    def decodificar_imagen(self, ruta):
+        """Lee una imagen como QImage.
+
+        A diferencia de ``cargar_imagen`` se puede llamar desde
+        cualquier hilo, por eso se usa para precargar imagenes.
+        """
+        imagen = leer_imagen(ruta)
+
+        if imagen.isNull():
+            raise IOError("No se puede leer la imagen '%s'." %(ruta))
+
+        return imagen
+
+    def crear_imagen_decodificada(self, ruta, imagen, columnas=None, filas=1):
+        "Convierte una QImage leida con ``decodificar_imagen`` en una imagen (o grilla)."
+        pixmap = QtGui.QPixmap.fromImage(imagen)
+        region = self.atlas and self.atlas.agregar(ruta, pixmap)
+
+        if not region:
+            region = (pixmap, 0, 0, pixmap.width(), pixmap.height())
+
+        if columnas is None:
+            return QtImagen(ruta, region)
+        else:
+            return QtGrilla(ruta, columnas, filas, region)
+
+    def habilitar_atlas(self, tamano_de_pagina=512, tamano_maximo=128):
+        """Hace que las imagenes pequeñas que se carguen se agrupen en un atlas.
+
+        Retorna el atlas, que tambien se puede completar con imagenes
+        armadas por adelantado (ver ``pilas.motores.atlas``).
+        """
+        self.atlas = atlas.Atlas(tamano_de_pagina, tamano_maximo)
+        return self.atlas
+
+    def _obtener_region_del_atlas(self, ruta):
+        if self.atlas:
+            return self.atlas.obtener_region(ruta) or self.atlas.agregar(ruta, leer_pixmap(ruta))
 
     def obtener_lienzo(self):
         return QtLienzo()
@@ -531,6 +976,8 @@ class QtBase(motor.Motor):
         pass
 
     def paintEvent(self, event):
+        desde = self.perfilador.ahora()
+        self._area_a_dibujar = self._convertir_a_coordenadas_logicas(event.rect())
         self.canvas.begin(self)
 
         self.canvas.setClipping(True)
@@ -539,26 +986,288 @@ class QtBase(motor.Motor):
         alto = self.alto / float(self.alto_original)
         self.canvas.scale(alto, alto)
 
+        self._dibujar_escena()
+        self.canvas.end()
+        self.perfilador.registrar('dibujado', desde)
 
+    def _dibujar_escena(self):
+        "Dibuja los actores y la informacion de depuracion sobre el painter actual."
         self.canvas.setRenderHint(QtGui.QPainter.HighQualityAntialiasing, False)
         self.canvas.setRenderHint(QtGui.QPainter.SmoothPixmapTransform, True)
         self.canvas.setRenderHint(QtGui.QPainter.Antialiasing, False)
 
         self.depurador.comienza_dibujado(self)
+        self._dibujar_actores()
+        self.depurador.termina_dibujado(self)
+
+    def _dibujar_actores(self):
+        """Dibuja a todos los actores que se pueden ver desde la camara.
+
+        Los actores consecutivos que comparten el mismo pixmap (por ejemplo
+        varios disparos o monedas) se acumulan en un lote y se dibujan
+        con una sola llamada a ``drawPixmapFragments``, respetando el
+        orden de los valores 'z'.
+        """
+        self.actores_descartados = 0
+        self.lotes_dibujados = 0
+        medir = self.perfilador.medir_actores
+        agrupar = self.agrupar_dibujado and not self.depurador.modos and not medir
+        self._lote = []
+        self._pixmap_del_lote = None
+
+        miembros = self._dibujar_capa_estatica()
+
+        for actor in miembros:
+            self.depurador.dibuja_al_actor(self, actor)
+
+        for actor in actores.todos[len(miembros):]:
+            if not self._esta_dentro_de_la_camara(actor):
+                self.actores_descartados += 1
+                continue
 
-        for actor in actores.todos:
             try:
-                actor.dibujar(self)
+                if not (agrupar and self._agregar_al_lote(actor)):
+                    self._dibujar_lote()
+                    self._dibujar_actor(actor)
             except Exception as e:
                 print e
                 actor.eliminar()
 
             self.depurador.dibuja_al_actor(self, actor)
 
-        self.depurador.termina_dibujado(self)
-        self.canvas.end()
+        self._dibujar_lote()
+
+    def _dibujar_actor(self, actor):
+        "Dibuja un actor, registrando cuanto tarda si el perfilador mide a los actores."
+        if self.perfilador.medir_actores:
+            desde = self.perfilador.ahora()
+            actor.dibujar(self)
+            self.perfilador.registrar_actor(actor, 'dibujar', desde)
+        else:
+            actor.dibujar(self)
+
+    def _dibujar_capa_estatica(self):
+        """Dibuja la capa que agrupa a los primeros actores estaticos.
+
+        La capa se vuelve a generar solo si alguno de sus actores cambia,
+        o si la camara se mueve mas alla del margen de la capa. Retorna
+        la lista de actores que se dibujaron como parte de la capa.
+        """
+        if not self.usar_capa_estatica:
+            self._capa_estatica = None
+            return []
+
+        miembros, firmas = self._obtener_miembros_de_la_capa_estatica()
+
+        if not miembros:
+            self._capa_estatica = None
+            return []
+
+        camara = (self.camara_x, self.camara_y)
+
+        if not self._la_capa_estatica_es_valida(miembros, firmas, camara):
+            self._generar_capa_estatica(miembros, firmas, camara)
+
+        pixmap, (camara_x, camara_y), firmas = self._capa_estatica
+        margen = self.margen_de_la_capa_estatica
+        self.canvas.drawPixmap(QtCore.QPointF(-margen - (self.camara_x - camara_x),
+                -margen + (self.camara_y - camara_y)), pixmap)
+        return miembros
+
+    def _obtener_miembros_de_la_capa_estatica(self):
+        "Retorna los actores estaticos del comienzo de la lista de actores y sus firmas."
+        miembros, firmas = [], []
+
+        for actor in actores.todos:
+            if not getattr(actor, 'estatico', False):
+                break
+
+            try:
+                firma = actor.obtener_firma()
+            except Exception:
+                firma = None
+
+            if firma is None:
+                break
+
+            miembros.append(actor)
+            firmas.append((id(actor), firma))
+
+        return miembros, firmas
+
+    def _la_capa_estatica_es_valida(self, miembros, firmas, camara):
+        if not self._capa_estatica:
+            return False
+
+        pixmap, camara_anterior, firmas_anteriores = self._capa_estatica
+
+        if firmas != firmas_anteriores:
+            return False
+
+        if camara == camara_anterior:
+            return True
+
+        # Los actores fijos no acompañan el desplazamiento de la camara.
+        if [x for x in miembros if x.fijo]:
+            return False
+
+        margen = self.margen_de_la_capa_estatica
+        return (abs(camara[0] - camara_anterior[0]) <= margen and
+                abs(camara[1] - camara_anterior[1]) <= margen)
+
+    def _generar_capa_estatica(self, miembros, firmas, camara):
+        """Dibuja a los actores de la capa estatica sobre un pixmap nuevo.
+
+        Si el perfilador mide a los actores, el costo de dibujarlos se
+        registra solo en los cuadros que regeneran la capa.
+        """
+        margen = self.margen_de_la_capa_estatica
+        ancho, alto = self.obtener_area()
+        pixmap = QtGui.QPixmap(ancho + margen * 2, alto + margen * 2)
+        pixmap.fill(QtGui.QColor(0, 0, 0, 0))
+
+        # Los actores se dibujan sobre el motor, asi que se reemplaza
+        # temporalmente el painter y el area a dibujar.
+        canvas, area = self.canvas, self._area_a_dibujar
+        self.canvas = QtGui.QPainter(pixmap)
+        self.canvas.setRenderHint(QtGui.QPainter.SmoothPixmapTransform, True)
+        self.canvas.translate(margen, margen)
+        self._area_a_dibujar = (-margen, -margen, ancho + margen, alto + margen)
+
+        try:
+            for actor in miembros:
+                if self._esta_dentro_de_la_camara(actor):
+                    try:
+                        self._dibujar_actor(actor)
+                    except Exception as e:
+                        print e
+                        actor.eliminar()
+        finally:
+            self.canvas.end()
+            self.canvas, self._area_a_dibujar = canvas, area
+
+        self._capa_estatica = (pixmap, camara, firmas)
+        self.capas_estaticas_generadas += 1
+
+    def _agregar_al_lote(self, actor):
+        "Intenta sumar el actor al lote actual, retorna False si se tiene que dibujar solo."
+        resultado = actor.obtener_fragmento(self)
+
+        if not resultado:
+            return False
+
+        pixmap, fragmento = resultado
+
+        if self._lote and pixmap.cacheKey() != self._pixmap_del_lote.cacheKey():
+            self._dibujar_lote()
+
+        self._pixmap_del_lote = pixmap
+        self._lote.append(fragmento)
+        return True
+
+    def _dibujar_lote(self):
+        """Dibuja los fragmentos acumulados y vacia el lote.
+
+        Los errores se atienden aqui, porque el lote pertenece a actores
+        anteriores y no al que se esta dibujando cuando se vacia.
+        """
+        if self._lote:
+            try:
+                self.canvas.drawPixmapFragments(self._lote, self._pixmap_del_lote)
+                self.lotes_dibujados += 1
+            except Exception as e:
+                print e
+            finally:
+                self._lote = []
+                self._pixmap_del_lote = None
+
+    def _esta_dentro_de_la_camara(self, actor):
+        """Indica si el actor se tiene que dibujar en el cuadro actual.
+
+        Los actores que no informan su area (por ejemplo, los que redefinen
+        el metodo ``dibujar``) se dibujan siempre.
+        """
+        if not self.descartar_actores_fuera_de_camara:
+            return True
+
+        try:
+            bordes = actor.obtener_bordes_en_pantalla(self)
+        except Exception:
+            return True
+
+        if bordes is None:
+            return True
+
+        izquierda, arriba, derecha, abajo = bordes
+        x0, y0, x1, y1 = self.obtener_area_visible()
+        return derecha >= x0 and izquierda <= x1 and abajo >= y0 and arriba <= y1
+
+    def _convertir_a_coordenadas_logicas(self, rectangulo):
+        "Convierte un QRect del widget en el area (x0, y0, x1, y1) que usan los actores."
+        escala = self.escala()
+        return (rectangulo.left() / escala, rectangulo.top() / escala,
+                (rectangulo.right() + 1) / escala, (rectangulo.bottom() + 1) / escala)
+
+    def _obtener_region_a_actualizar(self):
+        """Retorna la region de la ventana que cambio desde el ultimo dibujado.
+
+        Compara la firma y el area de cada actor con los valores que tenian
+        en la actualizacion anterior, y acumula el area vieja y nueva
+        de los actores que cambiaron. Retorna None si se tiene que
+        actualizar la ventana completa.
+        """
+        estado_anterior = self._estado_de_actores
+        orden_anterior = self._orden_de_actores
+        camara_anterior = self._camara_anterior
+        self._estado_de_actores = estado = {}
+        self._orden_de_actores = orden = []
+        self._camara_anterior = camara = (self.camara_x, self.camara_y)
+        completa = self.depurador.modos or camara != camara_anterior or self.interpolar
+
+        for actor in actores.todos:
+            try:
+                firma = actor.obtener_firma()
+                bordes = actor.obtener_bordes_en_pantalla(self)
+            except Exception:
+                firma = bordes = None
+
+            if firma is None or bordes is None:
+                completa = True
+
+            estado[id(actor)] = (firma, bordes)
+            orden.append(id(actor))
+
+        if completa or orden != orden_anterior:
+            return None
+
+        region = QtGui.QRegion()
+        escala = self.escala()
+
+        for (clave, (firma, bordes)) in estado.iteritems():
+            anterior = estado_anterior.get(clave)
+
+            if anterior and anterior[0] == firma and anterior[1] == bordes:
+                continue
+
+            areas = [bordes]
+
+            if anterior and anterior[1]:
+                areas.append(anterior[1])
+
+            for (izquierda, arriba, derecha, abajo) in areas:
+                # Se agrega un pixel de margen por el redondeo y el suavizado.
+                region += QtCore.QRect(int(izquierda * escala) - 1, int(arriba * escala) - 1,
+                        int((derecha - izquierda) * escala) + 3, int((abajo - arriba) * escala) + 3)
+
+        return region
 
     def timerEvent(self, event):
+        self._ejecutar_cuadro()
+
+    def _ejecutar_cuadro(self):
+        "Actualiza la logica y solicita que se dibuje la pantalla."
+        self.perfilador.comenzar_cuadro()
+        desde = trazas.trazador.comenzar()
 
         if not self.pausa_habilitada:
             try:
@@ -566,18 +1275,57 @@ class QtBase(motor.Motor):
             except Exception as e:
                 print e
 
+        if desde is not None:
+            trazas.trazador.terminar('logica', 'cuadros', desde)
+
         # Invoca el dibujado de la pantalla.
-        self.update()
+        if self.dibujado_parcial:
+            region = self._obtener_region_a_actualizar()
+
+            if region is None:
+                self.update()
+            elif not region.isEmpty():
+                self.update(region)
+        else:
+            self.update()
 
 
     def realizar_actualizacion_logica(self):
-        for x in range(self.fps.actualizar()):
+        "Simula los pasos que corresponden al tiempo real transcurrido desde el cuadro anterior."
+        for x in range(self.reloj.avanzar()):
             if not self.pausa_habilitada:
-                eventos.actualizar.send("Qt::timerEvent")
+                self._actualizar_un_paso()
+
+    def _actualizar_un_paso(self):
+        "Avanza un paso la simulacion: los simuladores del mundo y luego los actores."
+        if self.interpolar:
+            for actor in actores.todos:
+                actor._actor.recordar_posicion()
+
+        eventos.actualizar.send("Qt::timerEvent", dt=self.reloj.paso)
+        desde = self.perfilador.ahora()
+
+        if self.perfilador.medir_actores:
+            self._actualizar_actores_midiendo()
+        else:
+            for actor in actores.todos:
+                actor.pre_actualizar()
+                actor.actualizar()
+
+        self.perfilador.registrar('actores', desde)
 
-                for actor in actores.todos:
-                    actor.pre_actualizar()
-                    actor.actualizar()
+    def _actualizar_actores_midiendo(self):
+        "Actualiza a los actores registrando cuanto tarda cada uno en el perfilador."
+        perfilador = self.perfilador
+
+        for actor in actores.todos:
+            desde = perfilador.ahora()
+            actor.pre_actualizar()
+            desde = perfilador.registrar_actor(actor, 'pre_actualizar', desde)
+            actor.actualizar()
+            perfilador.registrar_actor(actor, 'actualizar', desde)
+
+        perfilador.terminar_paso_de_actores()
 
     def resizeEvent(self, event):
         self.ancho = event.size().width()
@@ -671,6 +1419,8 @@ class QtBase(motor.Motor):
         if self.pausa_habilitada:
             self.pausa_habilitada = False
             self.actor_pausa.eliminar()
+            # El tiempo que estuvo en pausa no se simula.
+            self.reloj.reiniciar()
         else:
             self.pausa_habilitada = True
             self.actor_pausa = actores.Pausa()
@@ -682,18 +1432,20 @@ class QtBase(motor.Motor):
 
 class Qt(QtBase, QWidget):
 
-    def __init__(self):
+    def __init__(self, rendimiento=60):
         QWidget.__init__(self)
-        QtBase.__init__(self)
+        QtBase.__init__(self, rendimiento)
+        self.setMouseTracking(True)
 
 class QtGL(QtBase, QGLWidget):
 
-    def __init__(self):
+    def __init__(self, rendimiento=60):
         if not QGLWidget:
             print "Lo siento, OpenGL no esta disponible..."
 
         QGLWidget.__init__(self)
-        QtBase.__init__(self)
+        QtBase.__init__(self, rendimiento)
+        self.setMouseTracking(True)
         self._pintar_fondo_negro()
 
     def _pintar_fondo_negro(self):
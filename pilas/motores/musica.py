@@ -0,0 +1,302 @@
+# -*- encoding: utf-8 -*-
+# pilas engine - a video game framework.
+#
+# copyright 2010 - hugo ruscitti
+# license: lgplv3 (see http://www.gnu.org/licenses/lgpl.html)
+#
+# website - http://www.pilas-engine.com.ar
+
+import time
+import wave
+import audioop
+import threading
+import collections
+
+from pilas import paquete
+
+# Canales del mixer reservados para la musica, dos para poder
+# hacer fundidos cruzados entre una musica y la siguiente.
+CANALES_DE_MUSICA = 2
+
+
+def convertir(datos, ancho, canales, frecuencia, formato, estado=None):
+    """Convierte muestras de un archivo wav al formato del mixer.
+
+    ``formato`` es la tupla (frecuencia, bits, canales) que retorna
+    ``pygame.mixer.get_init()``, y el mixer tiene que usar muestras
+    de 16 bits. Retorna los datos convertidos y el estado del cambio
+    de frecuencia, que se usa al convertir el trozo siguiente.
+    """
+    frecuencia_del_mixer, bits, canales_del_mixer = formato
+
+    if ancho == 1:
+        # Las muestras de 8 bits de los wav no tienen signo.
+        datos = audioop.bias(datos, 1, -128)
+
+    if ancho != 2:
+        datos = audioop.lin2lin(datos, ancho, 2)
+
+    if canales == 2 and canales_del_mixer == 1:
+        datos = audioop.tomono(datos, 2, 0.5, 0.5)
+    elif canales == 1 and canales_del_mixer == 2:
+        datos = audioop.tostereo(datos, 2, 1, 1)
+
+    if frecuencia != frecuencia_del_mixer:
+        datos, estado = audioop.ratecv(datos, 2, canales_del_mixer, frecuencia,
+                frecuencia_del_mixer, estado)
+
+    return datos, estado
+
+def leer_wav(archivo, formato, segundos_por_trozo=0.25):
+    "Genera los datos de un archivo wav de a trozos, convertidos al formato del mixer."
+    wav = wave.open(archivo)
+
+    try:
+        ancho, canales, frecuencia = wav.getsampwidth(), wav.getnchannels(), wav.getframerate()
+        cuadros_por_trozo = max(int(frecuencia * segundos_por_trozo), 1)
+        estado = None
+
+        while True:
+            datos = wav.readframes(cuadros_por_trozo)
+
+            if not datos:
+                break
+
+            datos, estado = convertir(datos, ancho, canales, frecuencia, formato, estado)
+            yield datos
+    finally:
+        wav.close()
+
+def es_un_wav(ruta):
+    "Indica si el archivo es un wav que se puede leer con el modulo ``wave``."
+    archivo = paquete.abrir(ruta)
+
+    try:
+        wave.open(archivo).close()
+        return True
+    except (wave.Error, EOFError):
+        return False
+    finally:
+        archivo.close()
+
+
+class Pista(object):
+    "Una musica en reproduccion, con su volumen y su fundido."
+
+    def __init__(self, volumen, fundido):
+        self.volumen = volumen
+        self.terminada = False
+        self._fundido = (0.0, 1.0, time.time(), fundido)
+
+    def fundir(self, final, duracion):
+        "Lleva el volumen gradualmente hasta ``final`` (entre 0 y 1) en ``duracion`` segundos."
+        self._fundido = (self._obtener_factor_de_fundido(), final, time.time(), duracion)
+
+    def _obtener_factor_de_fundido(self):
+        inicial, final, comienzo, duracion = self._fundido
+
+        if duracion <= 0:
+            return final
+
+        avance = min((time.time() - comienzo) / float(duracion), 1.0)
+        return inicial + (final - inicial) * avance
+
+    def _termino_de_desvanecerse(self):
+        inicial, final, comienzo, duracion = self._fundido
+        return final == 0 and self._obtener_factor_de_fundido() == 0
+
+    def definir_volumen(self, volumen):
+        self.volumen = volumen
+
+
+class PistaWav(Pista):
+    """Reproduce un archivo wav leyendolo de a trozos en un hilo auxiliar.
+
+    El hilo mantiene como maximo ``trozos_en_memoria`` trozos ya
+    decodificados, y los va encolando en el canal a medida que el
+    mixer termina de reproducir los anteriores.
+    """
+
+    def __init__(self, ruta, mixer, canal, repetir=True, volumen=1.0, fundido=0,
+            trozos_en_memoria=4):
+        Pista.__init__(self, volumen, fundido)
+        self.ruta = ruta
+        self.repetir = repetir
+        self.trozos_en_memoria = trozos_en_memoria
+        self._mixer = mixer
+        self._formato = mixer.get_init()
+        self.canal = canal
+        self._detener = False
+        self._hilo = threading.Thread(target=self._reproducir)
+        self._hilo.daemon = True
+        self._hilo.start()
+
+    def _leer_trozos(self):
+        while True:
+            archivo = paquete.abrir(self.ruta)
+
+            try:
+                for datos in leer_wav(archivo, self._formato):
+                    yield datos
+            finally:
+                archivo.close()
+
+            if not self.repetir:
+                return
+
+    def _reproducir(self):
+        pendientes = collections.deque()
+        trozos = self._leer_trozos()
+        fin_del_archivo = False
+
+        try:
+            while not self._detener and not self._termino_de_desvanecerse():
+                self.canal.set_volume(self.volumen * self._obtener_factor_de_fundido())
+
+                if not fin_del_archivo and len(pendientes) < self.trozos_en_memoria:
+                    try:
+                        pendientes.append(self._mixer.Sound(buffer=next(trozos)))
+                    except StopIteration:
+                        fin_del_archivo = True
+
+                    continue
+
+                if pendientes and self.canal.get_queue() is None:
+                    sonido = pendientes.popleft()
+
+                    if self.canal.get_busy():
+                        self.canal.queue(sonido)
+                    else:
+                        self.canal.play(sonido)
+
+                    continue
+
+                if fin_del_archivo and not pendientes and not self.canal.get_busy():
+                    break
+
+                time.sleep(0.02)
+        finally:
+            self.canal.stop()
+            self.terminada = True
+
+    def pausar(self):
+        self.canal.pause()
+
+    def continuar(self):
+        self.canal.unpause()
+
+    def detener(self, fundido=0):
+        "Detiene la musica, inmediatamente o desvaneciendola durante ``fundido`` segundos."
+        if fundido:
+            self.fundir(0, fundido)
+        else:
+            self._detener = True
+
+            if threading.current_thread() is not self._hilo:
+                self._hilo.join(1)
+
+
+class PistaDePygame(Pista):
+    """Reproduce un archivo con ``pygame.mixer.music``, que tambien lee de a trozos.
+
+    Se usa para los formatos que no son wav (como ogg). Solo puede
+    sonar una musica de este tipo a la vez, asi que no admite
+    fundidos cruzados, y no tiene fundido de entrada.
+    """
+
+    def __init__(self, ruta, musica, repetir=True, volumen=1.0):
+        Pista.__init__(self, volumen, 0)
+        self._musica = musica
+
+        if isinstance(ruta, paquete.RutaEnPaquete):
+            musica.load(paquete.abrir(ruta))
+        else:
+            musica.load(ruta)
+
+        musica.set_volume(volumen)
+        musica.play(-1 if repetir else 0)
+
+    def pausar(self):
+        self._musica.pause()
+
+    def continuar(self):
+        self._musica.unpause()
+
+    def detener(self, fundido=0):
+        if fundido:
+            self._musica.fadeout(int(fundido * 1000))
+        else:
+            self._musica.stop()
+
+        self.terminada = True
+
+    def definir_volumen(self, volumen):
+        Pista.definir_volumen(self, volumen)
+        self._musica.set_volume(volumen)
+
+
+class Reproductor(object):
+    """Reproduce la musica de fondo, sin decodificar los archivos completos.
+
+    Usa los canales reservados del mixer (ver ``CANALES_DE_MUSICA``),
+    asi la musica no compite con los efectos de sonido ni se guarda
+    en su cache.
+    """
+
+    def __init__(self, mixer):
+        self._mixer = mixer
+        self._canales = [mixer.Channel(x) for x in range(CANALES_DE_MUSICA)]
+        self._pistas = [None] * CANALES_DE_MUSICA
+        self._actual = None
+        self.volumen = 1.0
+
+    def reproducir(self, ruta, repetir=True, fundido=0):
+        """Comienza a reproducir una musica.
+
+        Si ya habia otra musica sonando y se indica ``fundido`` (en
+        segundos), una se desvanece mientras la otra aparece.
+        """
+        self.detener(fundido)
+
+        if self._mixer.get_init()[1] != -16 or not es_un_wav(ruta):
+            self._actual = PistaDePygame(ruta, self._mixer.music, repetir, self.volumen)
+            return self._actual
+
+        # Usa el canal que no se uso la ultima vez, porque el
+        # anterior puede estar desvaneciendose.
+        numero = 0
+
+        for (x, pista) in enumerate(self._pistas):
+            if pista is None or pista.terminada:
+                numero = x
+                break
+        else:
+            self._pistas[0].detener()
+
+        self._actual = PistaWav(ruta, self._mixer, self._canales[numero], repetir,
+                self.volumen, fundido)
+        self._pistas[numero] = self._actual
+        return self._actual
+
+    def pausar(self):
+        if self._actual:
+            self._actual.pausar()
+
+    def continuar(self):
+        if self._actual:
+            self._actual.continuar()
+
+    def detener(self, fundido=0):
+        if self._actual:
+            self._actual.detener(fundido)
+            self._actual = None
+
+    def definir_volumen(self, volumen):
+        "Define el volumen de la musica, entre 0 y 1."
+        self.volumen = volumen
+
+        if self._actual:
+            self._actual.definir_volumen(volumen)
+
+    def esta_sonando(self):
+        return bool(self._actual and not self._actual.terminada)
@@ -42,10 +42,19 @@ class Mundo(object):
         self.fisica.reiniciar()
 
     def actualizar_simuladores(self, evento):
-        self.tweener.update(16)
-        self.tareas.actualizar(1/60.0)
-        self.fisica.actualizar()
+        "Avanza los simuladores un paso de ``evento.dt`` segundos."
+        dt = evento.dt or 1/60.0
+        perfilador = self.motor.perfilador
+        desde = perfilador.ahora()
+
+        self.tweener.update(dt * 1000)
+        desde = perfilador.registrar('interpolaciones', desde)
+        self.tareas.actualizar(dt)
+        desde = perfilador.registrar('tareas', desde)
+        self.fisica.actualizar(dt)
+        desde = perfilador.registrar('fisica', desde)
         self.colisiones.verificar_colisiones()
+        perfilador.registrar('colisiones', desde)
 
     def terminar(self):
         import sys
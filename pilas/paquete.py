@@ -0,0 +1,172 @@
+# -*- encoding: utf-8 -*-
+# Pilas engine - A video game framework.
+#
+# Copyright 2010 - Hugo Ruscitti
+# License: LGPLv3 (see http://www.gnu.org/licenses/lgpl.html)
+#
+# Website - http://www.pilas-engine.com.ar
+
+import os
+import mmap
+import json
+import struct
+import StringIO
+
+FIRMA = 'PILASPAQ'
+CABECERA = '<8sI'
+EXTENSION = '.paquete'
+# Archivos de los programas de edicion, que no se usan al ejecutar.
+EXCLUIR = ('.xcf', '.pyc')
+
+
+class Paquete(object):
+    """Un archivo que agrupa todos los recursos de un directorio.
+
+    El archivo comienza con una cabecera (la firma y el tamaño del
+    indice), luego un indice en formato json con la posicion y el
+    tamaño de cada archivo, y por ultimo el contenido de los archivos.
+
+    El paquete se mapea en memoria, asi que leer un archivo solo
+    copia sus bytes, sin abrir nada en el disco.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        # Directorio que se usa para armar las rutas de los archivos.
+        self.directorio = os.path.splitext(ruta)[0]
+        archivo = open(ruta, 'rb')
+
+        try:
+            self._datos = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        finally:
+            archivo.close()
+
+        firma, tamano_del_indice = struct.unpack_from(CABECERA, self._datos)
+
+        if firma != FIRMA:
+            raise IOError("El archivo '%s' no es un paquete de recursos." %(ruta))
+
+        inicio = struct.calcsize(CABECERA)
+        self._indice = json.loads(self._datos[inicio:inicio + tamano_del_indice])
+        self._inicio_de_los_datos = inicio + tamano_del_indice
+
+    def contiene(self, nombre):
+        return self._normalizar(nombre) in self._indice
+
+    def buscar(self, nombre):
+        "Retorna una RutaEnPaquete para el archivo, o None si no esta en el paquete."
+        nombre = self._normalizar(nombre)
+
+        if nombre in self._indice:
+            return RutaEnPaquete(self, nombre)
+
+        return None
+
+    def leer(self, nombre):
+        "Retorna el contenido de un archivo del paquete."
+        posicion, tamano = self._indice[self._normalizar(nombre)]
+        posicion += self._inicio_de_los_datos
+        return self._datos[posicion:posicion + tamano]
+
+    def nombres(self):
+        return self._indice.keys()
+
+    def _normalizar(self, nombre):
+        return os.path.normpath(nombre).replace(os.sep, '/')
+
+    def __str__(self):
+        return "<Paquete '%s' con %d archivos>" %(self.ruta, len(self._indice))
+
+
+class RutaEnPaquete(str):
+    """La ruta a un archivo que esta dentro de un paquete.
+
+    Se comporta como la ruta que tendria el archivo si no estuviera
+    empaquetado, pero su contenido se lee desde el paquete.
+    """
+
+    def __new__(cls, paquete, nombre):
+        ruta = str.__new__(cls, os.path.join(paquete.directorio, nombre))
+        ruta.paquete = paquete
+        ruta.nombre = nombre
+        return ruta
+
+    def leer(self):
+        return self.paquete.leer(self.nombre)
+
+
+def abrir(ruta):
+    "Abre un archivo de recursos para leer, este o no dentro de un paquete."
+    if isinstance(ruta, RutaEnPaquete):
+        return StringIO.StringIO(ruta.leer())
+
+    return open(ruta, 'rb')
+
+def leer(ruta):
+    "Retorna el contenido de un archivo de recursos, este o no dentro de un paquete."
+    archivo = abrir(ruta)
+
+    try:
+        return archivo.read()
+    finally:
+        archivo.close()
+
+
+_paquetes = {}
+
+def obtener_paquete(ruta):
+    """Retorna el paquete guardado en ``ruta``, o None si no existe.
+
+    Cada paquete se abre una sola vez, y tambien se recuerda
+    si el archivo no existe.
+    """
+    if ruta not in _paquetes:
+        if os.path.exists(ruta):
+            _paquetes[ruta] = Paquete(ruta)
+        else:
+            _paquetes[ruta] = None
+
+    return _paquetes[ruta]
+
+
+def construir(directorio, ruta=None):
+    """Agrupa todos los archivos de un directorio en un paquete.
+
+    Si no se indica ``ruta`` el paquete se guarda junto al directorio,
+    por ejemplo 'data' genera el archivo 'data.paquete'.
+    """
+    directorio = os.path.normpath(directorio)
+    ruta = ruta or directorio + EXTENSION
+    nombres = []
+
+    for (raiz, directorios, archivos) in os.walk(directorio):
+        directorios.sort()
+
+        for archivo in sorted(archivos):
+            if os.path.splitext(archivo)[1].lower() in EXCLUIR:
+                continue
+
+            completa = os.path.join(raiz, archivo)
+            nombres.append(os.path.relpath(completa, directorio).replace(os.sep, '/'))
+
+    indice = {}
+    posicion = 0
+
+    for nombre in nombres:
+        tamano = os.path.getsize(os.path.join(directorio, nombre))
+        indice[nombre] = [posicion, tamano]
+        posicion += tamano
+
+    datos_del_indice = json.dumps(indice)
+    salida = open(ruta, 'wb')
+
+    try:
+        salida.write(struct.pack(CABECERA, FIRMA, len(datos_del_indice)))
+        salida.write(datos_del_indice)
+
+        for nombre in nombres:
+            salida.write(leer(os.path.join(directorio, nombre)))
+    finally:
+        salida.close()
+
+    return Paquete(ruta)
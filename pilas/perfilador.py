@@ -0,0 +1,207 @@
+# -*- encoding: utf-8 -*-
+# Pilas engine - A video game framework.
+#
+# Copyright 2010 - Hugo Ruscitti
+# License: LGPLv3 (see http://www.gnu.org/licenses/lgpl.html)
+#
+# Website - http://www.pilas-engine.com.ar
+
+import math
+from array import array
+
+from pilas import reloj
+from pilas import trazas
+
+# Fases de cada cuadro, en el orden en que se ejecutan.
+FASES = ('interpolaciones', 'tareas', 'fisica', 'colisiones', 'actores', 'dibujado')
+
+# Metodos de los actores que se miden cuando ``medir_actores`` esta habilitado.
+METODOS_DE_ACTORES = ('pre_actualizar', 'actualizar', 'dibujar')
+
+
+class Perfilador(object):
+    """Mide cuanto tiempo lleva cada fase de los ultimos cuadros.
+
+    Los tiempos se guardan en un buffer circular de
+    ``cantidad_de_cuadros`` posiciones por fase, que se reserva una
+    sola vez, asi medir no genera basura en cada cuadro.
+
+    Cada fase se mide con ``registrar``, que recibe el instante en que
+    comenzo la fase y retorna el instante actual, para encadenar una
+    fase tras otra:
+
+        >>> desde = perfilador.ahora()
+        >>> desde = perfilador.registrar('tareas', desde)
+        >>> desde = perfilador.registrar('fisica', desde)
+
+    Si una fase se ejecuta varias veces en el mismo cuadro (por ejemplo
+    cuando se simulan varios pasos) sus tiempos se suman.
+
+    Si se habilita ``medir_actores`` tambien se mide cuanto tarda cada
+    actor en ``pre_actualizar``, ``actualizar`` y ``dibujar``, sumando
+    los tiempos por clase de actor (ver ``imprimir_costos_por_clase``).
+    Esta medicion no se hace por omision porque agrega dos lecturas
+    del reloj por cada actor.
+    """
+
+    def __init__(self, fases=FASES, cantidad_de_cuadros=240, reloj=reloj.monotonico):
+        self.fases = list(fases)
+        self.cantidad_de_cuadros = cantidad_de_cuadros
+        self.habilitado = True
+        self.ahora = reloj
+        self.cuadros = 0
+        self._tiempos = dict((fase, array('d', [0.0]) * cantidad_de_cuadros) for fase in self.fases)
+        self._posicion = 0
+        self.medir_actores = False
+        self.cuadros_con_actores = 0
+        self._costos_por_clase = {}
+        self._contar_actores = True
+
+    def comenzar_cuadro(self):
+        "Pasa a la siguiente posicion del buffer circular, descartando el cuadro mas viejo."
+        if not self.habilitado:
+            return
+
+        self._posicion = self.cuadros % self.cantidad_de_cuadros
+        self.cuadros += 1
+
+        if self.medir_actores:
+            self.cuadros_con_actores += 1
+            self._contar_actores = True
+
+        for tiempos in self._tiempos.itervalues():
+            tiempos[self._posicion] = 0.0
+
+    def registrar(self, fase, desde):
+        "Suma a ``fase`` el tiempo transcurrido desde ``desde``, y retorna el instante actual."
+        if not self.habilitado:
+            return 0
+
+        ahora = self.ahora()
+        self._tiempos[fase][self._posicion] += ahora - desde
+        trazas.trazador.agregar(fase, 'fases', desde, ahora)
+        return ahora
+
+    def registrar_actor(self, actor, metodo, desde):
+        "Suma a la clase de ``actor`` el tiempo que tardo en ``metodo``, y retorna el instante actual."
+        ahora = self.ahora()
+        clase = actor.__class__.__name__
+
+        try:
+            costos = self._costos_por_clase[clase]
+        except KeyError:
+            costos = self._costos_por_clase[clase] = [0.0] * len(METODOS_DE_ACTORES) + [0]
+
+        costos[METODOS_DE_ACTORES.index(metodo)] += ahora - desde
+
+        if metodo == 'actualizar' and self._contar_actores:
+            costos[-1] += 1
+
+        return ahora
+
+    def terminar_paso_de_actores(self):
+        """Indica que termino un paso de actualizacion de los actores.
+
+        Si en un cuadro se simulan varios pasos los actores se cuentan
+        solo en el primero, asi ``actores`` es la cantidad por cuadro.
+        """
+        self._contar_actores = False
+
+    def obtener_costos_por_clase(self):
+        """Retorna el costo de cada clase de actor, de la mas costosa a la menos costosa.
+
+        Cada elemento es un diccionario con el nombre de la clase, los
+        segundos por cuadro que llevo cada metodo, el total y la cantidad
+        promedio de actores que se actualizaron en cada cuadro.
+        """
+        cuadros = float(max(self.cuadros_con_actores, 1))
+        resultado = []
+
+        for (clase, costos) in self._costos_por_clase.iteritems():
+            costo = {'clase': clase, 'actores': costos[-1] / cuadros}
+
+            for (i, metodo) in enumerate(METODOS_DE_ACTORES):
+                costo[metodo] = costos[i] / cuadros
+
+            costo['total'] = sum(costos[:-1]) / cuadros
+            resultado.append(costo)
+
+        resultado.sort(key=lambda x: x['total'], reverse=True)
+        return resultado
+
+    def imprimir_costos_por_clase(self, cantidad=None):
+        "Muestra en la consola cuanto tarda cada clase de actor por cuadro, de la mas costosa a la menos costosa."
+        if not self._costos_por_clase:
+            print "No hay costos medidos, habilite 'medir_actores' o pulse F5."
+            return
+
+        print "%d cuadros medidos" %(self.cuadros_con_actores)
+        print "%-24s %8s %12s %12s %12s %12s" %("clase", "actores", "pre_actualizar",
+                "actualizar", "dibujar", "total")
+
+        for costo in self.obtener_costos_por_clase()[:cantidad]:
+            print "%-24s %8.1f %9.3f ms %9.3f ms %9.3f ms %9.3f ms" %(costo['clase'], costo['actores'],
+                    costo['pre_actualizar'] * 1000, costo['actualizar'] * 1000,
+                    costo['dibujar'] * 1000, costo['total'] * 1000)
+
+    def reiniciar_costos_por_clase(self):
+        "Olvida los costos medidos de cada clase de actor."
+        self.cuadros_con_actores = 0
+        self._costos_por_clase = {}
+
+    def obtener_tiempos(self, fase):
+        "Retorna los tiempos (en segundos) de una fase, del cuadro mas viejo al mas reciente."
+        cantidad = min(self.cuadros, self.cantidad_de_cuadros)
+        primero = self.cuadros - cantidad
+        tiempos = self._tiempos[fase]
+        return [tiempos[(primero + x) % self.cantidad_de_cuadros] for x in range(cantidad)]
+
+    def obtener_estadisticas(self):
+        """Retorna un diccionario con el promedio, maximo y percentil 99 de cada fase.
+
+        Los tiempos estan en segundos, y ``porcentaje`` indica que parte
+        del tiempo medido corresponde a esa fase.
+        """
+        estadisticas = {}
+        total = 0.0
+
+        for fase in self.fases:
+            tiempos = sorted(self.obtener_tiempos(fase))
+            suma = sum(tiempos)
+            total += suma
+
+            if tiempos:
+                posicion = int(math.ceil(0.99 * len(tiempos))) - 1
+                estadisticas[fase] = {
+                    'promedio': suma / len(tiempos),
+                    'maximo': tiempos[-1],
+                    'percentil_99': tiempos[max(posicion, 0)],
+                    'total': suma,
+                }
+            else:
+                estadisticas[fase] = {'promedio': 0, 'maximo': 0, 'percentil_99': 0, 'total': 0}
+
+        for fase in self.fases:
+            estadisticas[fase]['porcentaje'] = estadisticas[fase]['total'] / total * 100 if total else 0
+
+        return estadisticas
+
+    def imprimir_estadisticas(self):
+        "Muestra en la consola los tiempos de cada fase en los ultimos cuadros."
+        estadisticas = self.obtener_estadisticas()
+        print "%d cuadros medidos" %(min(self.cuadros, self.cantidad_de_cuadros))
+        print "%-16s %10s %10s %10s %6s" %("fase", "promedio", "99%", "maximo", "%")
+
+        for fase in self.fases:
+            datos = estadisticas[fase]
+            print "%-16s %7.2f ms %7.2f ms %7.2f ms %5.1f%%" %(fase, datos['promedio'] * 1000,
+                    datos['percentil_99'] * 1000, datos['maximo'] * 1000, datos['porcentaje'])
+
+    def reiniciar(self):
+        "Olvida todos los cuadros medidos."
+        self.cuadros = 0
+        self._posicion = 0
+
+        for tiempos in self._tiempos.itervalues():
+            for x in range(self.cantidad_de_cuadros):
+                tiempos[x] = 0.0
@@ -0,0 +1,211 @@
+# -*- encoding: utf-8 -*-
+# Pilas engine - A video game framework.
+#
+# Copyright 2010 - Hugo Ruscitti
+# License: LGPLv3 (see http://www.gnu.org/licenses/lgpl.html)
+#
+# Website - http://www.pilas-engine.com.ar
+
+import time
+import Queue
+import threading
+import collections
+
+from pilas import eventos
+
+
+class Carga(object):
+    """Representa un archivo que se lee en segundo plano.
+
+    La funcion ``decodificar`` se ejecuta en un hilo auxiliar y
+    recibe la ruta del archivo. Luego, ``finalizar`` se ejecuta
+    en el hilo principal (el que dibuja) con el resultado de
+    ``decodificar``, y retorna el objeto que queda listo para usar.
+    """
+
+    def __init__(self, ruta, decodificar, finalizar):
+        self.ruta = ruta
+        self.decodificar = decodificar
+        self.finalizar = finalizar
+        self.datos = None
+        self.resultado = None
+        self.error = None
+        self._decodificada = threading.Event()
+        self._lista = False
+        self._precargador = None
+
+    def esta_lista(self):
+        "Indica si el archivo se termino de cargar (o fallo)."
+        return self._lista
+
+    def marcar_como_lista(self, resultado):
+        "Indica que el archivo ya estaba cargado, asi no se vuelve a leer."
+        self.resultado = resultado
+        self._decodificada.set()
+        self._lista = True
+
+    def esperar(self, tiempo=None):
+        "Espera a que el archivo se termine de cargar, retorna True si esta listo."
+        self._decodificada.wait(tiempo)
+
+        if self._decodificada.is_set() and self._precargador:
+            self._precargador.convertir()
+
+        return self._lista
+
+    def obtener(self):
+        "Espera a que el archivo este listo y lo retorna."
+        self.esperar()
+
+        if self.error:
+            raise self.error
+
+        return self.resultado
+
+    def __str__(self):
+        return "<Carga de '%s' (lista: %s)>" %(self.ruta, self._lista)
+
+
+class Precarga(object):
+    """Agrupa varias cargas, por ejemplo para mostrar una pantalla de carga.
+
+    La funcion ``cuando_avanza`` se invoca desde el hilo principal cada
+    vez que termina de cargarse un archivo, con el progreso como
+    argumento (un numero entre 0 y 1).
+    """
+
+    def __init__(self, precargador, cargas, cuando_avanza=None):
+        self.precargador = precargador
+        self.cargas = cargas
+        self.cuando_avanza = cuando_avanza
+        self._listas = 0
+
+    def progreso(self):
+        "Retorna la proporcion de archivos que ya se cargaron, entre 0 y 1."
+        if not self.cargas:
+            return 1.0
+
+        return len([x for x in self.cargas if x.esta_lista()]) / float(len(self.cargas))
+
+    def esta_lista(self):
+        return self.progreso() == 1.0
+
+    def esperar(self, tiempo=None):
+        "Espera a que todos los archivos esten listos, retorna True si lo estan."
+        if tiempo is not None:
+            limite = time.time() + tiempo
+
+        for carga in self.cargas:
+            if tiempo is None:
+                carga._decodificada.wait()
+            else:
+                carga._decodificada.wait(max(limite - time.time(), 0))
+
+        self.precargador.convertir()
+        return self.esta_lista()
+
+    def obtener_errores(self):
+        "Retorna una lista de tuplas (ruta, error) con los archivos que no se pudieron cargar."
+        return [(x.ruta, x.error) for x in self.cargas if x.error]
+
+    def _notificar(self):
+        listas = len([x for x in self.cargas if x.esta_lista()])
+
+        if listas != self._listas:
+            self._listas = listas
+
+            if self.cuando_avanza:
+                self.cuando_avanza(self.progreso())
+
+    def __str__(self):
+        return "<Precarga de %d archivos (%d%% completo)>" %(len(self.cargas), self.progreso() * 100)
+
+
+class Precargador(object):
+    """Lee archivos usando varios hilos auxiliares.
+
+    Los resultados se terminan de preparar en el hilo principal, de a
+    ``conversiones_por_cuadro`` archivos en cada actualizacion, para
+    no demorar el dibujado de ningun cuadro.
+    """
+
+    def __init__(self, cantidad_de_hilos=2, conversiones_por_cuadro=2):
+        self.cantidad_de_hilos = cantidad_de_hilos
+        self.conversiones_por_cuadro = conversiones_por_cuadro
+        self._pendientes = Queue.Queue()
+        self._decodificadas = collections.deque()
+        self._precargas = []
+        self._hilos = []
+
+    def cargar(self, cargas, cuando_avanza=None):
+        "Comienza a leer las cargas indicadas y retorna un objeto Precarga."
+        self._iniciar()
+        precarga = Precarga(self, cargas, cuando_avanza)
+
+        if not precarga.esta_lista():
+            self._precargas.append(precarga)
+
+        for carga in cargas:
+            if carga.esta_lista():
+                continue
+
+            carga._precargador = self
+            self._pendientes.put(carga)
+
+        return precarga
+
+    def _iniciar(self):
+        if self._hilos:
+            return
+
+        eventos.actualizar.conectar(self._al_actualizar)
+
+        for x in range(self.cantidad_de_hilos):
+            hilo = threading.Thread(target=self._trabajar)
+            hilo.daemon = True
+            hilo.start()
+            self._hilos.append(hilo)
+
+    def _trabajar(self):
+        while True:
+            carga = self._pendientes.get()
+
+            try:
+                carga.datos = carga.decodificar(carga.ruta)
+            except Exception as e:
+                carga.error = e
+
+            self._decodificadas.append(carga)
+            carga._decodificada.set()
+
+    def _al_actualizar(self, evento):
+        self.convertir(self.conversiones_por_cuadro)
+
+    def convertir(self, maximo=None):
+        "Termina de preparar las cargas leidas, como mucho ``maximo`` de ellas."
+        cantidad = 0
+
+        while self._decodificadas and (maximo is None or cantidad < maximo):
+            carga = self._decodificadas.popleft()
+
+            if carga.error is None:
+                try:
+                    carga.resultado = carga.finalizar(carga.datos)
+                except Exception as e:
+                    carga.error = e
+
+            carga.datos = None
+            carga._lista = True
+            cantidad += 1
+
+        if cantidad:
+            for precarga in self._precargas[:]:
+                precarga._notificar()
+
+                if precarga.esta_lista():
+                    self._precargas.remove(precarga)
+
+        return cantidad
+
+
+precargador = Precargador()
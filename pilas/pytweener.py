@@ -7,6 +7,7 @@
 # Released under M.I.T License - see above url
 # Python version by Ben Harling 2009 
 import math
+from pilas import trazas
 
 class Tweener(object):
     def __init__(self, duration = 0.5, tween = None):
@@ -306,8 +307,11 @@ class Tween(object):
  
         if self.delta == self.duration:
             self.complete = True
+            desde = trazas.trazador.comenzar()
             if self.completeFunction:
                 self.completeFunction()
+            if desde is not None:
+                trazas.trazador.terminar(self.target.__class__.__name__, 'interpolaciones', desde)
  
         if self.updateFunction:
             self.updateFunction()
@@ -0,0 +1,164 @@
+# -*- encoding: utf-8 -*-
+# Pilas engine - A video game framework.
+#
+# Copyright 2010 - Hugo Ruscitti
+# License: LGPLv3 (see http://www.gnu.org/licenses/lgpl.html)
+#
+# Website - http://www.pilas-engine.com.ar
+
+import os
+import sys
+import time
+
+from pilas import paquete
+
+PATH = os.path.dirname(os.path.abspath(__file__))
+
+
+def obtener_directorios_de_busqueda():
+    """Retorna los directorios en donde se buscan los recursos, en orden de prioridad.
+
+    Los paquetes de recursos (ver ``pilas.paquete``) se consultan luego
+    de los directorios del juego y antes que los archivos sueltos de
+    la biblioteca. Los paquetes que no existen aparecen como None.
+    """
+    return ['./', os.path.dirname(sys.argv[0]), 'data',
+            paquete.obtener_paquete('data' + paquete.EXTENSION),
+            paquete.obtener_paquete(PATH + '/data' + paquete.EXTENSION),
+            PATH, PATH + '/data']
+
+
+class Indice(object):
+    """Recuerda el contenido de los directorios de recursos.
+
+    Cada directorio se lista la primera vez que se busca un archivo
+    dentro de él, y a partir de ahí las búsquedas se responden
+    desde la memoria. Si un archivo no se encuentra se vuelven
+    a listar los directorios que cambiaron, así se detectan los
+    archivos agregados mientras el juego está en ejecución.
+    """
+
+    def __init__(self, directorios=None):
+        self._directorios = directorios or obtener_directorios_de_busqueda
+        self._contenidos = {}
+        self._encontrados = {}
+        self.tiempo_de_indexado = 0
+        self.consultas = 0
+        self.fallos = 0
+        self.relecturas = 0
+
+    def buscar(self, ruta):
+        "Retorna la ruta completa a un recurso, o None si no existe."
+        self.consultas += 1
+
+        if ruta in self._encontrados:
+            return self._encontrados[ruta]
+
+        if os.path.isabs(ruta):
+            if os.path.exists(ruta):
+                return ruta
+            return None
+
+        completa = self._buscar_en_los_directorios(ruta)
+
+        if completa is None and self._releer_directorios_modificados():
+            completa = self._buscar_en_los_directorios(ruta)
+
+        if completa is None:
+            self.fallos += 1
+        else:
+            self._encontrados[ruta] = completa
+
+        return completa
+
+    def _buscar_en_los_directorios(self, ruta):
+        for directorio in self._directorios():
+            if directorio is None:
+                continue
+
+            if isinstance(directorio, paquete.Paquete):
+                completa = directorio.buscar(ruta)
+
+                if completa:
+                    return completa
+
+                continue
+
+            completa = os.path.join(directorio, ruta)
+            padre, nombre = os.path.split(completa)
+
+            if nombre in self._listar(padre):
+                return completa
+
+        return None
+
+    def _listar(self, directorio):
+        "Retorna los nombres de archivo de un directorio, listandolo solo la primera vez."
+        clave = os.path.abspath(directorio or '.')
+
+        if clave not in self._contenidos:
+            inicio = time.time()
+            self._contenidos[clave] = (self._obtener_modificacion(clave), self._leer(clave))
+            self.tiempo_de_indexado += time.time() - inicio
+
+        return self._contenidos[clave][1]
+
+    def _leer(self, directorio):
+        try:
+            return set(os.listdir(directorio))
+        except OSError:
+            return set()
+
+    def _obtener_modificacion(self, directorio):
+        try:
+            return os.stat(directorio).st_mtime
+        except OSError:
+            return None
+
+    def _releer_directorios_modificados(self):
+        "Vuelve a listar los directorios que cambiaron, retorna True si alguno cambio."
+        inicio = time.time()
+        modificados = False
+
+        for (directorio, (modificacion, nombres)) in self._contenidos.items():
+            actual = self._obtener_modificacion(directorio)
+
+            if actual != modificacion:
+                self._contenidos[directorio] = (actual, self._leer(directorio))
+                modificados = True
+
+        if modificados:
+            self._encontrados.clear()
+            self.relecturas += 1
+
+        self.tiempo_de_indexado += time.time() - inicio
+        return modificados
+
+    def actualizar(self):
+        "Olvida el contenido de todos los directorios."
+        self._contenidos.clear()
+        self._encontrados.clear()
+
+    def obtener_estadisticas(self):
+        "Retorna un diccionario con los directorios indexados, consultas y tiempo de indexado."
+        return {
+            'directorios': len(self._contenidos),
+            'consultas': self.consultas,
+            'fallos': self.fallos,
+            'relecturas': self.relecturas,
+            'tiempo_de_indexado': self.tiempo_de_indexado,
+        }
+
+    def __str__(self):
+        return "<Indice de recursos con %(directorios)d directorios, %(consultas)d consultas y %(fallos)d fallos>" %(self.obtener_estadisticas())
+
+
+indice = Indice()
+
+
+def buscar(ruta):
+    "Retorna la ruta completa a un recurso, o None si no existe."
+    return indice.buscar(ruta)
+
+def obtener_estadisticas():
+    return indice.obtener_estadisticas()
@@ -0,0 +1,119 @@
+# -*- encoding: utf-8 -*-
+# Pilas engine - A video game framework.
+#
+# Copyright 2010 - Hugo Ruscitti
+# License: LGPLv3 (see http://www.gnu.org/licenses/lgpl.html)
+#
+# Website - http://www.pilas-engine.com.ar
+
+import os
+import time
+import ctypes
+import ctypes.util
+
+CLOCK_MONOTONIC = 1
+
+
+class _Timespec(ctypes.Structure):
+    _fields_ = [('tv_sec', ctypes.c_long), ('tv_nsec', ctypes.c_long)]
+
+
+def _obtener_clock_gettime():
+    "Retorna la funcion clock_gettime de la biblioteca de C, o None si no esta disponible."
+    if os.name != 'posix':
+        return None
+
+    for nombre in ('rt', 'c'):
+        ruta = ctypes.util.find_library(nombre)
+
+        if not ruta:
+            continue
+
+        try:
+            funcion = ctypes.CDLL(ruta, use_errno=True).clock_gettime
+        except (OSError, AttributeError):
+            continue
+
+        funcion.argtypes = [ctypes.c_int, ctypes.POINTER(_Timespec)]
+        return funcion
+
+    return None
+
+_clock_gettime = _obtener_clock_gettime()
+_timespec = _Timespec()
+
+
+def monotonico():
+    """Retorna un tiempo en segundos que nunca retrocede.
+
+    A diferencia de ``time.time()`` no cambia si se modifica la hora
+    del sistema (algo comun en las XO al sincronizar el reloj), asi
+    que sirve para medir cuanto tiempo paso entre dos cuadros.
+    """
+    if _clock_gettime and _clock_gettime(CLOCK_MONOTONIC, ctypes.byref(_timespec)) == 0:
+        return _timespec.tv_sec + _timespec.tv_nsec * 1e-9
+
+    return time.time()
+
+
+class AcumuladorDePasoFijo(object):
+    """Convierte el tiempo real transcurrido en pasos de simulacion de duracion fija.
+
+    En cada cuadro se llama a ``avanzar``, que acumula el tiempo que
+    paso desde el cuadro anterior y retorna cuantos pasos de ``paso``
+    segundos hay que simular. Asi el juego avanza a la misma velocidad
+    aunque la maquina no llegue a dibujar todos los cuadros.
+
+    Si la maquina esta muy atrasada se simulan como maximo
+    ``maximo_de_pasos`` por cuadro, y el resto del tiempo se descarta
+    (el juego se ve mas lento en lugar de trabarse por completo).
+
+    El atributo ``alfa`` (entre 0 y 1) indica cuanto tiempo quedo
+    acumulado respecto de un paso completo, y sirve para dibujar
+    a los actores entre su posicion anterior y la actual.
+    """
+
+    def __init__(self, paso=1/60.0, maximo_de_pasos=5, reloj=monotonico):
+        self.paso = paso
+        self.maximo_de_pasos = maximo_de_pasos
+        self._reloj = reloj
+        self._anterior = None
+        self.acumulado = 0.0
+        self.alfa = 0.0
+        self.pasos = 0
+        self.tiempo_descartado = 0.0
+
+    def avanzar(self, transcurrido=None):
+        """Retorna la cantidad de pasos a simular en este cuadro.
+
+        Si no se indica ``transcurrido`` (en segundos) se mide con el
+        reloj desde la llamada anterior.
+        """
+        if transcurrido is None:
+            ahora = self._reloj()
+
+            if self._anterior is None:
+                self._anterior = ahora
+
+            transcurrido = ahora - self._anterior
+            self._anterior = ahora
+
+        self.acumulado += max(transcurrido, 0)
+        # El margen evita perder un paso por errores de redondeo.
+        pasos = int(self.acumulado / self.paso + 1e-9)
+
+        if pasos > self.maximo_de_pasos:
+            self.tiempo_descartado += (pasos - self.maximo_de_pasos) * self.paso
+            self.acumulado -= (pasos - self.maximo_de_pasos) * self.paso
+            pasos = self.maximo_de_pasos
+
+        self.acumulado = max(self.acumulado - pasos * self.paso, 0.0)
+        self.alfa = self.acumulado / self.paso
+        self.pasos += pasos
+        return pasos
+
+    def reiniciar(self):
+        "Olvida el tiempo acumulado, por ejemplo al salir de una pausa."
+        self._anterior = None
+        self.acumulado = 0.0
+        self.alfa = 0.0
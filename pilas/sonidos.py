@@ -9,7 +9,6 @@
 import pilas
 import os
 
-
 def cargar(ruta):
     """Carga un sonido para reproducir, donde el argumento ``ruta`` indica cual es el archivo.
 
@@ -34,3 +33,83 @@ def cargar(ruta):
     """
     ruta = pilas.utils.obtener_ruta_al_recurso(ruta)
     return pilas.mundo.motor.cargar_sonido(ruta)
+
+def obtener_estadisticas():
+    """Retorna un diccionario con las voces que estan sonando y las reproducciones descartadas.
+
+    Ver ``pilas.motores.mezclador.Mezclador``.
+    """
+    return pilas.mundo.motor.mezclador.obtener_estadisticas()
+
+def reproducir_musica(ruta, repetir=True, fundido=0):
+    """Reproduce una musica de fondo, leyendo el archivo de a poco.
+
+    A diferencia de los sonidos, la musica no se decodifica completa
+    en memoria. Si ya habia una musica sonando se reemplaza, y si se
+    indica ``fundido`` (en segundos) las dos se mezclan gradualmente::
+
+        pilas.sonidos.reproducir_musica("nivel_1.wav")
+        pilas.sonidos.reproducir_musica("nivel_2.wav", fundido=2)
+    """
+    musica = pilas.mundo.motor.mezclador.obtener_musica()
+
+    if musica:
+        musica.reproducir(pilas.utils.obtener_ruta_al_recurso(ruta), repetir, fundido)
+
+def pausar_musica():
+    musica = pilas.mundo.motor.mezclador.obtener_musica()
+
+    if musica:
+        musica.pausar()
+
+def continuar_musica():
+    musica = pilas.mundo.motor.mezclador.obtener_musica()
+
+    if musica:
+        musica.continuar()
+
+def detener_musica(fundido=0):
+    "Detiene la musica, inmediatamente o desvaneciendola durante ``fundido`` segundos."
+    musica = pilas.mundo.motor.mezclador.obtener_musica()
+
+    if musica:
+        musica.detener(fundido)
+
+def definir_volumen_de_musica(volumen):
+    "Define el volumen de la musica, entre 0 y 1."
+    musica = pilas.mundo.motor.mezclador.obtener_musica()
+
+    if musica:
+        musica.definir_volumen(volumen)
+
+def precargar_en_segundo_plano(*rutas, **kv):
+    """Lee varios sonidos usando hilos auxiliares, sin detener el juego.
+
+    Retorna un objeto que permite consultar el progreso o esperar a
+    que todo este listo (ver ``pilas.imagenes.precargar_en_segundo_plano``).
+
+    Los hilos auxiliares solo leen los archivos, el mixer y los sonidos
+    se crean en el hilo principal. Los sonidos quedan en la cache del
+    mezclador, asi que luego ``cargar`` los obtiene sin leerlos otra vez.
+    """
+    from pilas import paquete
+    from pilas import precarga
+
+    motor = pilas.mundo.motor
+    cargas = []
+
+    def finalizar(datos, ruta):
+        motor.mezclador.cargar_desde_datos(ruta, datos)
+        return motor.cargar_sonido(ruta)
+
+    for ruta in rutas:
+        ruta = pilas.utils.obtener_ruta_al_recurso(ruta)
+        carga = precarga.Carga(ruta, paquete.leer,
+                lambda datos, ruta=ruta: finalizar(datos, ruta))
+
+        if motor.mezclador.esta_cargado(ruta):
+            carga.marcar_como_lista(motor.cargar_sonido(ruta))
+
+        cargas.append(carga)
+
+    return precarga.precargador.cargar(cargas, kv.get('cuando_avanza'))
@@ -6,6 +6,8 @@
 #
 # Website - http://www.pilas-engine.com.ar
 
+from pilas import trazas
+
 class Tarea(object):
 
     def __init__(self, time_out, dt, funcion, parametros, una_vez):
@@ -28,7 +30,13 @@ class Tarea(object):
         self.activa = True
 
     def ejecutar(self):
-        return self.funcion(*self.parametros)
+        desde = trazas.trazador.comenzar()
+
+        try:
+            return self.funcion(*self.parametros)
+        finally:
+            if desde is not None:
+                trazas.trazador.terminar(getattr(self.funcion, '__name__', 'tarea'), 'tareas', desde)
 
     def eliminar(self):
         self.activa = False
@@ -0,0 +1,23 @@
+def test_empaquetador_ubica_rectangulos_sin_superponerlos():
+    from pilas.motores import atlas
+
+    empaquetador = atlas.Empaquetador(64, 64, margen=1)
+
+    a = empaquetador.ubicar(30, 20)
+    b = empaquetador.ubicar(30, 10)
+    c = empaquetador.ubicar(30, 20)
+
+    assert a == (1, 1)
+    assert b == (33, 1)
+
+    # El tercer rectangulo no entra en el primer estante.
+    assert c == (1, 23)
+
+def test_empaquetador_sin_lugar():
+    from pilas.motores import atlas
+
+    empaquetador = atlas.Empaquetador(32, 32, margen=0)
+
+    assert empaquetador.ubicar(64, 8) is None
+    assert empaquetador.ubicar(32, 32) == (0, 0)
+    assert empaquetador.ubicar(1, 1) is None
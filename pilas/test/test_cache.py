@@ -0,0 +1,40 @@
+from pilas import cache
+
+def test_cache_descarta_los_menos_usados():
+    textos = cache.Cache(maximo_de_elementos=2)
+    textos.agregar('a', 1)
+    textos.agregar('b', 2)
+
+    # Consultar 'a' lo convierte en el elemento mas reciente.
+    assert textos.obtener('a') == 1
+
+    textos.agregar('c', 3)
+    assert 'a' in textos
+    assert 'b' not in textos
+    assert 'c' in textos
+    assert textos.descartados == 1
+
+def test_cache_limitada_por_bytes():
+    datos = cache.Cache(maximo_de_bytes=10, medir=len)
+    datos.agregar('uno', 'xxxx')
+    datos.agregar('dos', 'xxxx')
+    assert datos.bytes == 8
+
+    datos.agregar('tres', 'xxxx')
+    assert datos.bytes == 8
+    assert 'uno' not in datos
+
+    datos.quitar('dos')
+    assert datos.bytes == 4
+
+def test_cache_cuenta_aciertos_y_fallos():
+    textos = cache.Cache()
+    textos.agregar('hola', 'pixmap')
+
+    assert textos.obtener('hola') == 'pixmap'
+    assert textos.obtener('chau') is None
+
+    estadisticas = textos.obtener_estadisticas()
+    assert estadisticas['aciertos'] == 1
+    assert estadisticas['fallos'] == 1
+    assert estadisticas['tasa_de_aciertos'] == 0.5
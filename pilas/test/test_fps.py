@@ -0,0 +1,41 @@
+import pytest
+
+fps = pytest.importorskip('pilas.fps')
+
+def test_las_estadisticas_de_los_cuadros():
+    planificador = fps.FPS(50)
+
+    # 99 cuadros a tiempo y uno atrasado (de 100 ms).
+    ahora = 0
+    planificador.actualizar(ahora)
+
+    for x in range(99):
+        ahora += 0.02
+        planificador.actualizar(ahora)
+
+    planificador.actualizar(ahora + 0.1)
+
+    estadisticas = planificador.obtener_estadisticas()
+    assert estadisticas['cuadros_atrasados'] == 1
+    assert abs(estadisticas['percentil_99'] - 0.02) < 0.0001
+    assert abs(estadisticas['cuadros_por_segundo'] - 100 / 2.08) < 0.01
+
+def test_los_modos_de_planificacion():
+    planificador = fps.FPS(60)
+    assert planificador.modo == 'periodo'
+    planificador.definir_modo('presupuesto', 0.05)
+    assert planificador.presupuesto == 0.05
+
+    try:
+        planificador.definir_modo('turbo')
+        assert False
+    except Exception as e:
+        assert 'turbo' in str(e)
+
+def test_el_planificador_mide_con_el_reloj_indicado():
+    tiempos = [0.0, 1.0, 1.5]
+    planificador = fps.FPS(60, reloj=lambda: tiempos.pop(0))
+
+    planificador.actualizar()
+    planificador.actualizar()
+    assert list(planificador.tiempos) == [0.5]
@@ -0,0 +1,25 @@
+import pytest
+
+pytest.importorskip('PyQt4')
+import pilas
+
+def test_el_motor_headless_avanza_cuadros_sin_ventana():
+    pilas.iniciar(usar_motor='headless')
+    motor = pilas.mundo.motor
+    actualizaciones = []
+
+    def contar(evento):
+        actualizaciones.append(evento.dt)
+
+    pilas.eventos.actualizar.conectar(contar)
+
+    motor.avanzar(30)
+
+    assert motor.cuadros_ejecutados == 30
+    assert motor.reloj.pasos == 30
+    assert len(actualizaciones) == 30
+    assert motor.obtener_cuadros_por_segundo() > 0
+
+    # Cada cuadro ocupa su propia posicion en el perfilador.
+    assert motor.perfilador.cuadros == 30
+    assert len(motor.perfilador.obtener_tiempos('actores')) == 30
@@ -0,0 +1,27 @@
+import pilas
+
+def test_las_imagenes_se_leen_una_sola_vez():
+    pilas.iniciar(usar_motor='headless')
+    pilas.imagenes.liberar()
+    aciertos = pilas.imagenes.obtener_estadisticas()['aciertos']
+
+    una = pilas.imagenes.cargar('disparo.png')
+    otra = pilas.imagenes.cargar('disparo.png')
+    assert una is not otra
+    assert una._imagen is otra._imagen
+
+    estadisticas = pilas.imagenes.obtener_estadisticas()
+    assert estadisticas['elementos'] == 1
+    assert estadisticas['aciertos'] == aciertos + 1
+
+def test_las_grillas_no_comparten_el_cuadro_actual():
+    pilas.iniciar(usar_motor='headless')
+
+    una = pilas.imagenes.cargar_grilla('disparo.png', 2)
+    otra = pilas.imagenes.cargar_grilla('disparo.png', 2)
+    una.avanzar()
+    assert una.obtener_cuadro() == 1
+    assert otra.obtener_cuadro() == 0
+
+    pilas.imagenes.liberar('disparo.png')
+    assert pilas.imagenes.obtener_estadisticas()['elementos'] == 0
@@ -0,0 +1,40 @@
+import sys
+from pilas import importador
+
+def test_los_submodulos_se_importan_al_usarlos(tmpdir, monkeypatch):
+    paquete = tmpdir.mkdir('paquete_perezoso')
+    paquete.join('__init__.py').write(
+        "from pilas import importador\n"
+        "valor = 1\n"
+        "importador.hacer_perezoso(__name__, {'Clase': 'modulo'})\n")
+    paquete.join('modulo.py').write("class Clase(object):\n    pass\n")
+    monkeypatch.syspath_prepend(str(tmpdir))
+
+    import paquete_perezoso
+    assert 'paquete_perezoso.modulo' not in sys.modules
+    assert paquete_perezoso.valor == 1
+
+    assert paquete_perezoso.Clase.__name__ == 'Clase'
+    assert 'paquete_perezoso.modulo' in sys.modules
+    assert 'Clase' in dir(paquete_perezoso)
+
+    # Los atributos se siguen guardando en el modulo original.
+    paquete_perezoso.valor = 2
+    assert paquete_perezoso._modulo_original.valor == 2
+
+def test_el_medidor_se_puede_instalar_dos_veces():
+    import __builtin__
+    original = __builtin__.__import__
+    medidor = importador.MedidorDeImportaciones()
+
+    medidor.instalar('primero')
+    medidor.instalar('segundo')
+    import json
+    assert medidor.motivo == 'segundo'
+
+    medidor.desinstalar()
+    assert medidor.motivo == 'primero'
+    assert __builtin__.__import__ is not original
+
+    medidor.desinstalar()
+    assert __builtin__.__import__ is original
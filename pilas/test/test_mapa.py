@@ -0,0 +1,35 @@
+import pilas
+
+def test_los_bloques_del_mapa_no_son_actores():
+    pilas.iniciar(usar_motor='headless')
+    cantidad_de_actores = len(pilas.actores.todos)
+
+    mapa = pilas.actores.Mapa()
+    mapa.pintar_bloque(0, 0, 3)
+    mapa.pintar_bloque(40, 50, 5)
+
+    assert len(pilas.actores.todos) == cantidad_de_actores + 1
+    assert (mapa.filas, mapa.columnas) == (41, 51)
+    assert mapa.obtener_bloque(0, 0) == 3
+    assert mapa.obtener_bloque(40, 50) == 5
+    assert mapa.obtener_bloque(1, 1) is None
+
+def test_solo_se_regeneran_los_trozos_modificados_y_visibles():
+    pilas.iniciar(usar_motor='headless')
+    motor = pilas.mundo.motor
+
+    mapa = pilas.actores.Mapa()
+    mapa.pintar_bloque(0, 0, 1)
+    mapa.pintar_bloque(0, 17, 1)
+    # Este bloque queda fuera de la camara.
+    mapa.pintar_bloque(40, 40, 1)
+
+    mapa.dibujar(motor)
+    assert mapa.trozos_generados == 2
+
+    mapa.dibujar(motor)
+    assert mapa.trozos_generados == 2
+
+    mapa.pintar_bloque(1, 1, 2)
+    mapa.dibujar(motor)
+    assert mapa.trozos_generados == 3
@@ -0,0 +1,125 @@
+from pilas.motores import mezclador
+
+class Canal(object):
+
+    def __init__(self, mixer):
+        self.mixer = mixer
+        self.sonido = None
+
+    def play(self, sonido):
+        if self in self.mixer.orden:
+            self.mixer.orden.remove(self)
+
+        self.sonido = sonido
+        self.mixer.orden.append(self)
+
+    def stop(self):
+        self.sonido = None
+        self.mixer.orden.remove(self)
+
+    def get_busy(self):
+        return self.sonido is not None
+
+    def get_sound(self):
+        return self.sonido
+
+
+class Mixer(object):
+    "Imita a pygame.mixer, sin reproducir nada."
+
+    def __init__(self):
+        self.inicios = 0
+        self.orden = []
+
+    def get_init(self):
+        if self.inicios:
+            return (22050, -16, 2)
+
+    def init(self):
+        self.inicios += 1
+
+    def set_num_channels(self, cantidad):
+        self.canales = [Canal(self) for x in range(cantidad)]
+
+    def set_reserved(self, cantidad):
+        self.reservados = cantidad
+
+    def get_num_channels(self):
+        return len(self.canales)
+
+    def Channel(self, numero):
+        return self.canales[numero]
+
+    def find_channel(self, forzar=False):
+        # Como en pygame, los canales reservados no se excluyen.
+        for canal in self.canales:
+            if not canal.get_busy():
+                return canal
+
+        if forzar:
+            return self.orden[0]
+
+    def Sound(self, archivo):
+        archivo.close()
+        return Sonido()
+
+
+class Sonido(object):
+
+    def get_length(self):
+        return 1.0
+
+
+def test_los_sonidos_se_decodifican_una_sola_vez(tmpdir):
+    archivo = tmpdir.join('tick.wav')
+    archivo.write('datos')
+    mixer = Mixer()
+    m = mezclador.Mezclador(mixer=mixer)
+
+    assert m.cargar(str(archivo)) is m.cargar(str(archivo))
+    assert mixer.inicios == 1
+    assert m.obtener_estadisticas()['bytes'] == 22050 * 2 * 2
+
+def test_las_repeticiones_interrumpen_la_voz_mas_vieja():
+    m = mezclador.Mezclador(cantidad_de_canales=4, voces_por_sonido=2, mixer=Mixer())
+    explosion = Sonido()
+
+    primera = m.reproducir(explosion)
+    segunda = m.reproducir(explosion)
+    tercera = m.reproducir(explosion)
+    assert tercera is primera
+    assert m.obtener_estadisticas()['voces_activas'] == 2
+    assert m.voces_interrumpidas == 1
+
+    # Sin canales libres se usa el que suena hace mas tiempo.
+    otros = [m.reproducir(Sonido()) for x in range(3)]
+    assert otros[-1] is segunda
+    assert m.obtener_estadisticas()['voces_activas'] == 4
+    assert m.reproducir(None) is None
+    assert m.reproducciones_descartadas == 1
+
+def test_los_sonidos_leidos_en_otro_hilo_quedan_en_la_cache(tmpdir):
+    ruta = str(tmpdir.join('tick.wav'))
+    m = mezclador.Mezclador(mixer=Mixer())
+
+    assert not m.esta_cargado(ruta)
+    sonido = m.cargar_desde_datos(ruta, 'datos')
+    assert m.esta_cargado(ruta)
+
+    # El archivo no existe, asi que tiene que salir de la cache.
+    assert m.cargar(ruta) is sonido
+
+def test_los_efectos_no_usan_los_canales_de_la_musica():
+    mixer = Mixer()
+    m = mezclador.Mezclador(cantidad_de_canales=2, mixer=mixer)
+    m.obtener_musica()
+    musica = mixer.canales[:2]
+
+    # La musica suena hace mas tiempo, pero no se interrumpe.
+    musica[0].play(Sonido())
+    efectos = [m.reproducir(Sonido()) for x in range(3)]
+
+    assert efectos[0] not in musica and efectos[1] not in musica
+    assert efectos[2] is efectos[0]
+    assert musica[0].get_busy() and not musica[1].get_busy()
+    assert m.voces_interrumpidas == 1
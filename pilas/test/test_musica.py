@@ -0,0 +1,35 @@
+import wave
+import struct
+from pilas.motores import musica
+
+def crear_wav(ruta, frecuencia, canales, ancho, cuadros):
+    wav = wave.open(ruta, 'wb')
+    wav.setnchannels(canales)
+    wav.setsampwidth(ancho)
+    wav.setframerate(frecuencia)
+    wav.writeframes('\x80' * (cuadros * canales * ancho))
+    wav.close()
+
+def test_los_wav_se_convierten_al_formato_del_mixer():
+    # Un cuadro mono de 8 bits (sin signo) con el valor del silencio.
+    datos, estado = musica.convertir('\x80', 1, 1, 22050, (22050, -16, 2))
+    assert struct.unpack('<2h', datos) == (0, 0)
+
+    datos, estado = musica.convertir('\x00\x00' * 100, 2, 1, 11025, (22050, -16, 1))
+    assert len(datos) in (398, 400)
+
+def test_los_wav_se_leen_de_a_trozos(tmpdir):
+    ruta = str(tmpdir.join('musica.wav'))
+    crear_wav(ruta, 22050, 1, 1, 5512 * 4)
+    assert musica.es_un_wav(ruta)
+
+    archivo = open(ruta, 'rb')
+    trozos = list(musica.leer_wav(archivo, (22050, -16, 2), segundos_por_trozo=0.25))
+    archivo.close()
+
+    assert len(trozos) == 4
+    assert sum(len(x) for x in trozos) == 5512 * 4 * 2 * 2
+
+    otro = tmpdir.join('musica.ogg')
+    otro.write('OggS')
+    assert not musica.es_un_wav(str(otro))
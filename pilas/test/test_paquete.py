@@ -0,0 +1,30 @@
+import os
+from pilas import paquete, recursos
+
+def test_los_archivos_se_leen_desde_el_paquete(tmpdir):
+    datos = tmpdir.mkdir('data')
+    datos.join('a.png').write('imagen')
+    datos.mkdir('fondos').join('b.jpg').write('fondo')
+    datos.join('fuente.xcf').write('no se empaqueta')
+
+    resultado = paquete.construir(str(datos))
+    assert resultado.ruta == str(datos) + '.paquete'
+    assert sorted(resultado.nombres()) == ['a.png', 'fondos/b.jpg']
+    assert resultado.leer('fondos/b.jpg') == 'fondo'
+
+    ruta = resultado.buscar('a.png')
+    assert ruta == os.path.join(str(datos), 'a.png')
+    assert paquete.leer(ruta) == 'imagen'
+
+def test_los_directorios_tienen_prioridad_sobre_el_paquete(tmpdir):
+    datos = tmpdir.mkdir('data')
+    datos.join('a.png').write('empaquetado')
+    datos.join('b.png').write('empaquetado')
+    empaquetado = paquete.construir(str(datos))
+
+    juego = tmpdir.mkdir('juego')
+    juego.join('a.png').write('suelto')
+
+    indice = recursos.Indice(lambda: [str(juego), empaquetado])
+    assert paquete.leer(indice.buscar('a.png')) == 'suelto'
+    assert isinstance(indice.buscar('b.png'), paquete.RutaEnPaquete)
@@ -0,0 +1,81 @@
+from pilas import perfilador
+
+def crear_perfilador(tiempos, cantidad_de_cuadros=3):
+    return perfilador.Perfilador(('logica', 'dibujado'), cantidad_de_cuadros,
+            reloj=lambda: tiempos.pop(0))
+
+def test_suma_los_tiempos_de_cada_fase():
+    p = crear_perfilador([0.0, 0.01, 0.03, 0.04, 0.045])
+
+    p.comenzar_cuadro()
+    desde = p.ahora()
+    desde = p.registrar('logica', desde)
+    p.registrar('dibujado', desde)
+    # Un segundo paso de logica en el mismo cuadro.
+    p.registrar('logica', p.ahora())
+
+    assert [round(x, 6) for x in p.obtener_tiempos('logica')] == [0.015]
+    assert [round(x, 6) for x in p.obtener_tiempos('dibujado')] == [0.02]
+
+def test_guarda_solo_los_ultimos_cuadros():
+    tiempos = []
+    p = crear_perfilador(tiempos)
+
+    for duracion in [1, 2, 3, 4, 5]:
+        p.comenzar_cuadro()
+        tiempos.extend([0, duracion])
+        p.registrar('logica', p.ahora())
+
+    assert p.obtener_tiempos('logica') == [3, 4, 5]
+
+    estadisticas = p.obtener_estadisticas()
+    assert estadisticas['logica']['promedio'] == 4
+    assert estadisticas['logica']['maximo'] == 5
+    assert estadisticas['logica']['porcentaje'] == 100
+    assert estadisticas['dibujado']['promedio'] == 0
+
+def test_no_mide_si_esta_deshabilitado():
+    p = crear_perfilador([])
+    p.habilitado = False
+
+    p.comenzar_cuadro()
+    p.registrar('logica', 0)
+
+    assert p.cuadros == 0
+
+class Globo(object):
+    pass
+
+class Nave(object):
+    pass
+
+def test_suma_los_costos_por_clase_de_actor():
+    p = crear_perfilador([0.003, 0.004, 0.005, 0.02], cantidad_de_cuadros=10)
+    p.medir_actores = True
+    p.comenzar_cuadro()
+    p.comenzar_cuadro()
+
+    p.registrar_actor(Globo(), 'actualizar', 0.002)
+    p.registrar_actor(Globo(), 'actualizar', 0.002)
+    p.registrar_actor(Globo(), 'dibujar', 0.004)
+    p.registrar_actor(Nave(), 'pre_actualizar', 0.0)
+
+    costos = p.obtener_costos_por_clase()
+
+    assert [x['clase'] for x in costos] == ['Nave', 'Globo']
+    assert costos[1]['actores'] == 1
+    assert round(costos[1]['actualizar'], 6) == 0.0015
+    assert round(costos[1]['total'], 6) == 0.002
+
+def test_cuenta_los_actores_una_vez_por_cuadro():
+    p = crear_perfilador([0.001] * 4, cantidad_de_cuadros=10)
+    p.medir_actores = True
+    p.comenzar_cuadro()
+
+    # Dos pasos de actualizacion en el mismo cuadro.
+    for paso in range(2):
+        p.registrar_actor(Globo(), 'actualizar', 0.0)
+        p.registrar_actor(Globo(), 'actualizar', 0.0)
+        p.terminar_paso_de_actores()
+
+    assert p.obtener_costos_por_clase()[0]['actores'] == 2
@@ -0,0 +1,30 @@
+from pilas import precarga
+
+def test_las_cargas_se_terminan_en_el_hilo_principal():
+    precargador = precarga.Precargador(cantidad_de_hilos=1)
+    progresos = []
+    cargas = [precarga.Carga(x, lambda ruta: ruta.upper(), lambda datos: datos + '!') for x in ('a', 'b')]
+
+    grupo = precargador.cargar(cargas, progresos.append)
+    assert cargas[0]._decodificada.wait(5)
+    assert cargas[1]._decodificada.wait(5)
+
+    # Hasta que el hilo principal no las convierte, no estan listas.
+    assert grupo.progreso() == 0
+    assert precargador.convertir(maximo=1) == 1
+    assert grupo.progreso() == 0.5
+
+    assert grupo.esperar()
+    assert [x.obtener() for x in cargas] == ['A!', 'B!']
+    assert progresos == [0.5, 1.0]
+
+def test_los_errores_se_informan_al_obtener():
+    precargador = precarga.Precargador(cantidad_de_hilos=1)
+
+    def fallar(ruta):
+        raise IOError(ruta)
+
+    carga = precarga.Carga('inexistente.png', fallar, None)
+    grupo = precargador.cargar([carga])
+    assert grupo.esperar(5)
+    assert grupo.obtener_errores()[0][0] == 'inexistente.png'
@@ -0,0 +1,25 @@
+import os
+from pilas import recursos
+
+def test_busca_en_los_directorios_por_orden(tmpdir):
+    primero = tmpdir.mkdir('primero')
+    segundo = tmpdir.mkdir('segundo')
+    primero.join('a.png').write('')
+    segundo.join('a.png').write('')
+    segundo.join('b.png').write('')
+
+    indice = recursos.Indice(lambda: [str(primero), str(segundo)])
+    assert indice.buscar('a.png') == os.path.join(str(primero), 'a.png')
+    assert indice.buscar('b.png') == os.path.join(str(segundo), 'b.png')
+    assert indice.buscar('c.png') is None
+    assert indice.obtener_estadisticas()['fallos'] == 1
+
+def test_detecta_archivos_nuevos(tmpdir):
+    indice = recursos.Indice(lambda: [str(tmpdir)])
+    assert indice.buscar('nuevo.png') is None
+
+    tmpdir.join('nuevo.png').write('')
+    # Fuerza un cambio en la fecha de modificacion del directorio.
+    os.utime(str(tmpdir), (0, 0))
+
+    assert indice.buscar('nuevo.png') == os.path.join(str(tmpdir), 'nuevo.png')
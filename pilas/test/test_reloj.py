@@ -0,0 +1,28 @@
+from pilas import reloj
+
+def test_el_reloj_monotonico_no_retrocede():
+    antes = reloj.monotonico()
+    assert reloj.monotonico() >= antes
+
+def test_el_acumulador_simula_el_tiempo_real():
+    acumulador = reloj.AcumuladorDePasoFijo(paso=0.1, maximo_de_pasos=3)
+
+    assert acumulador.avanzar(0.05) == 0
+    assert abs(acumulador.alfa - 0.5) < 0.0001
+
+    # Un cuadro lento simula mas de un paso.
+    assert acumulador.avanzar(0.2) == 2
+    assert abs(acumulador.alfa - 0.5) < 0.0001
+
+    # Si esta muy atrasado se descarta el tiempo que sobra.
+    assert acumulador.avanzar(1.0) == 3
+    assert abs(acumulador.tiempo_descartado - 0.7) < 0.0001
+    assert acumulador.pasos == 5
+
+def test_el_acumulador_mide_con_el_reloj():
+    tiempos = [10.0, 10.02, 10.05]
+    acumulador = reloj.AcumuladorDePasoFijo(paso=0.01, reloj=lambda: tiempos.pop(0))
+
+    assert acumulador.avanzar() == 0
+    assert acumulador.avanzar() == 2
+    assert acumulador.avanzar() == 3
@@ -0,0 +1,106 @@
+import os
+import zlib
+import base64
+import struct
+from pilas import tiled
+
+MAPA = '''<?xml version="1.0" encoding="UTF-8"?>
+<map version="1.0" orientation="orthogonal" width="3" height="2" tilewidth="32" tileheight="32">
+ <tileset firstgid="1" name="bloques" tilewidth="32" tileheight="32">
+  <image source="bloques.png" width="64" height="32"/>
+ </tileset>
+ <layer name="suelo" width="3" height="2">
+  <data encoding="csv">
+1,0,2,
+0,2,1
+</data>
+ </layer>
+ <layer name="obstaculos" width="3" height="2">
+  <data encoding="base64" compression="%s">%s</data>
+ </layer>
+</map>
+'''
+
+def crear_mapa(tmpdir, compresion):
+    # El bit mas alto indica un bloque espejado, y se ignora.
+    crudos = struct.pack('<6I', 0, 0, 2 | 0x80000000, 1, 1, 0)
+
+    if compresion == 'zlib':
+        crudos = zlib.compress(crudos)
+    else:
+        comprimido = zlib.compressobj(9, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        crudos = comprimido.compress(crudos) + comprimido.flush()
+
+    archivo = tmpdir.join('mapa.tmx')
+    archivo.write(MAPA %(compresion, base64.b64encode(crudos)))
+    return str(archivo)
+
+def test_se_leen_las_capas_comprimidas(tmpdir):
+    for compresion in ('zlib', 'gzip'):
+        mapa = tiled.cargar(crear_mapa(tmpdir, compresion), usar_cache=False)
+
+        assert (mapa.columnas, mapa.filas) == (3, 2)
+        assert (mapa.imagen, mapa.ancho_imagen, mapa.ancho_cuadro) == ('bloques.png', 64, 32)
+        assert [nombre for (nombre, bloques) in mapa.capas] == ['suelo', 'obstaculos']
+        assert mapa.capas[0][1].typecode == 'H'
+        assert list(mapa.capas[0][1]) == [1, 0, 2, 0, 2, 1]
+        assert list(mapa.capas[1][1]) == [0, 0, 2, 1, 1, 0]
+
+def test_la_cache_binaria_se_usa_si_el_mapa_no_cambio(tmpdir):
+    ruta = crear_mapa(tmpdir, 'zlib')
+    original = tiled.cargar(ruta)
+    assert os.path.exists(ruta + '.cache')
+
+    assert os.stat(ruta + '.cache').st_mode & 0777 == 0666 & ~tiled._obtener_umask()
+
+    desde_la_cache = tiled.cargar(ruta)
+    assert desde_la_cache.imagen == original.imagen
+    assert desde_la_cache.capas == original.capas
+
+    # Si el mapa cambia la cache ya no sirve.
+    estado = os.stat(ruta)
+    os.utime(ruta, (estado.st_atime, estado.st_mtime + 10))
+    assert tiled.leer_cache(ruta + '.cache', estado.st_mtime + 10, estado.st_size) is None
+
+def test_una_cache_incompleta_no_se_usa(tmpdir):
+    ruta = crear_mapa(tmpdir, 'zlib')
+    tiled.cargar(ruta)
+    estado = os.stat(ruta)
+
+    # Como si el programa se hubiera cortado mientras escribia la cache.
+    cache = tmpdir.join('mapa.tmx.cache')
+    cache.write(cache.read('rb')[:-3], 'wb')
+
+    assert tiled.leer_cache(str(cache), estado.st_mtime, estado.st_size) is None
+    assert tiled.cargar(ruta).capas[0][1].tolist() == [1, 0, 2, 0, 2, 1]
+    assert sorted(x.basename for x in tmpdir.listdir()) == ['mapa.tmx', 'mapa.tmx.cache']
+
+def test_los_bloques_solidos_se_agrupan_en_rectangulos():
+    solidos = [1, 1, 1, 0,
+               1, 1, 1, 0,
+               0, 0, 0, 1]
+    assert tiled.agrupar_en_rectangulos(solidos, 4, 3) == [(0, 0, 3, 2), (2, 3, 1, 1)]
+
+    # Un piso largo queda formado por una sola figura.
+    piso = [0] * 20 + [1] * 20
+    assert tiled.agrupar_en_rectangulos(piso, 20, 2) == [(1, 0, 20, 1)]
+
+def test_los_mapas_con_bloques_de_otro_tileset_se_rechazan(tmpdir):
+    dos_tilesets = MAPA.replace(' <layer name="suelo"', ''' <tileset firstgid="3" name="otros" tilewidth="32" tileheight="32">
+  <image source="otros.png" width="32" height="32"/>
+ </tileset>
+ <layer name="suelo"''', 1)
+    fuera_del_tileset = MAPA.replace('0,2,1\n', '0,7,1\n')
+    tileset_externo = MAPA.replace('''<tileset firstgid="1" name="bloques" tilewidth="32" tileheight="32">
+  <image source="bloques.png" width="64" height="32"/>
+ </tileset>''', '<tileset firstgid="1" source="bloques.tsx"/>')
+
+    for contenido in (dos_tilesets, fuera_del_tileset, tileset_externo):
+        archivo = tmpdir.join('mapa.tmx')
+        archivo.write(contenido %('zlib', base64.b64encode(zlib.compress(struct.pack('<6I', *[0] * 6)))))
+
+        try:
+            tiled.cargar(str(archivo), usar_cache=False)
+            assert False
+        except IOError as e:
+            assert 'tileset' in str(e)
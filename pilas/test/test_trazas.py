@@ -0,0 +1,73 @@
+import json
+
+from pilas import trazas
+from pilas import tareas
+from pilas.dispatch import Signal
+
+def test_el_trazador_detenido_no_registra():
+    trazador = trazas.Trazador()
+
+    assert trazador.comenzar() is None
+    trazador.agregar('nada', 'pruebas', 0, 1)
+    assert trazador.obtener_eventos() == []
+
+def test_guarda_las_ultimas_trazas_como_eventos_de_chrome(tmpdir):
+    tiempos = [10.0, 10.5, 11.0, 11.25]
+    trazador = trazas.Trazador()
+    trazador.iniciar(capacidad=2, reloj=lambda: tiempos.pop(0))
+
+    trazador.agregar('primera', 'pruebas', 10.0, 10.1)
+    desde = trazador.comenzar()
+    trazador.terminar('segunda', 'pruebas', desde)
+    trazador.agregar('tercera', 'pruebas', 11.1, 11.2)
+
+    assert trazador.obtener_descartadas() == 1
+
+    ruta = str(tmpdir.join('trazas.json'))
+    trazador.guardar(ruta)
+    eventos = json.load(open(ruta))['traceEvents']
+
+    assert [x['name'] for x in eventos] == ['segunda', 'tercera']
+    assert eventos[0]['ph'] == 'X'
+    assert abs(eventos[0]['ts'] - 500000) < 0.001
+    assert abs(eventos[0]['dur'] - 500000) < 0.001
+
+def test_registra_eventos_y_tareas(monkeypatch):
+    trazador = trazas.Trazador()
+    trazador.iniciar()
+    monkeypatch.setattr(trazas, 'trazador', trazador)
+
+    def saludar(evento):
+        pass
+
+    evento = Signal()
+    evento.nombre = 'saludo'
+    evento.connect(saludar)
+    evento.send('prueba')
+
+    planificador = tareas.Tareas()
+    planificador.una_vez(1, lambda: None)
+    planificador.actualizar(2)
+
+    assert [(x['name'], x['cat']) for x in trazador.obtener_eventos()] == [
+            ('saludo', 'eventos'), ('<lambda>', 'tareas')]
+
+def test_registra_los_eventos_que_fallan(monkeypatch):
+    trazador = trazas.Trazador()
+    trazador.iniciar()
+    monkeypatch.setattr(trazas, 'trazador', trazador)
+
+    def fallar(evento):
+        raise ValueError()
+
+    evento = Signal()
+    evento.nombre = 'fallido'
+    evento.connect(fallar)
+
+    try:
+        evento.send('prueba')
+        assert False
+    except ValueError:
+        pass
+
+    assert [x['name'] for x in trazador.obtener_eventos()] == ['fallido']
@@ -0,0 +1,365 @@
+# -*- encoding: utf-8 -*-
+# Pilas engine - A video game framework.
+#
+# Copyright 2010 - Hugo Ruscitti
+# License: LGPLv3 (see http://www.gnu.org/licenses/lgpl.html)
+#
+# Website - http://www.pilas-engine.com.ar
+
+import os
+import sys
+import zlib
+import tempfile
+import base64
+import struct
+from array import array
+from xml.etree import cElementTree
+
+from pilas import paquete
+
+# Los bits mas altos de cada bloque indican si esta espejado o rotado.
+MASCARA_DE_BLOQUE = 0x1FFFFFFF
+
+FIRMA_DE_LA_CACHE = 'PILASMAP'
+VERSION_DE_LA_CACHE = 1
+CABECERA_DE_LA_CACHE = '<8sHdqIIIIIIII'
+EXTENSION_DE_LA_CACHE = '.cache'
+
+# Tipo de array con enteros sin signo de 4 bytes, como los bloques en base64.
+TIPO_DE_32_BITS = 'I' if array('I').itemsize == 4 else 'L'
+
+
+class MapaTiled(object):
+    """Los datos de un mapa creado con el programa tiled.
+
+    Cada capa se guarda como una tupla (nombre, bloques), donde
+    ``bloques`` es un array('H') con el numero de bloque de cada
+    celda, fila por fila. El numero 0 indica una celda vacia.
+    """
+
+    def __init__(self):
+        self.columnas = 0
+        self.filas = 0
+        self.ancho_cuadro = 0
+        self.alto_cuadro = 0
+        self.imagen = None
+        self.ancho_imagen = 0
+        self.alto_imagen = 0
+        self.primer_gid = 1
+        self.capas = []
+
+    def __str__(self):
+        return "<MapaTiled de %dx%d bloques con %d capas>" %(self.columnas, self.filas, len(self.capas))
+
+
+def cargar(ruta, usar_cache=True):
+    """Carga un archivo .tmx, usando la cache binaria si esta actualizada.
+
+    La cache se guarda junto al archivo (con extension '.cache'),
+    y si no se puede escribir simplemente no se usa.
+    """
+    # Los archivos dentro de un paquete no tienen un lugar para la cache.
+    if isinstance(ruta, paquete.RutaEnPaquete):
+        usar_cache = False
+
+    if usar_cache:
+        estado = os.stat(ruta)
+        ruta_de_la_cache = ruta + EXTENSION_DE_LA_CACHE
+        mapa = leer_cache(ruta_de_la_cache, estado.st_mtime, estado.st_size)
+
+        if mapa:
+            return mapa
+
+    archivo = paquete.abrir(ruta)
+
+    try:
+        mapa = leer_tmx(archivo)
+    finally:
+        archivo.close()
+
+    if usar_cache:
+        try:
+            guardar_cache(mapa, ruta_de_la_cache, estado.st_mtime, estado.st_size)
+        except (IOError, OSError):
+            pass
+
+    return mapa
+
+def leer_tmx(archivo):
+    """Lee un mapa desde un archivo .tmx abierto.
+
+    El archivo se procesa de a un elemento por vez, asi que nunca se
+    arma el documento completo en memoria.
+
+    Los mapas de pilas usan una sola imagen de bloques, asi que si el
+    mapa tiene mas de un tileset, un tileset en un archivo .tsx externo
+    o bloques que no pertenecen al tileset, se genera un IOError.
+    """
+    mapa = MapaTiled()
+    tileset = None
+
+    for (evento, elemento) in cElementTree.iterparse(archivo, events=('start', 'end')):
+        if evento == 'start':
+            if elemento.tag == 'map':
+                mapa.columnas = int(elemento.get('width'))
+                mapa.filas = int(elemento.get('height'))
+                mapa.ancho_cuadro = int(elemento.get('tilewidth'))
+                mapa.alto_cuadro = int(elemento.get('tileheight'))
+            continue
+
+        if elemento.tag == 'tileset':
+            if tileset is not None:
+                raise IOError("El mapa tiene mas de un tileset, y pilas solo admite uno.")
+
+            tileset = elemento
+            mapa.primer_gid = int(elemento.get('firstgid', 1))
+            mapa.ancho_cuadro = int(elemento.get('tilewidth', mapa.ancho_cuadro))
+            mapa.alto_cuadro = int(elemento.get('tileheight', mapa.alto_cuadro))
+            imagen = elemento.find('image')
+
+            if elemento.get('source'):
+                raise IOError("El tileset esta en el archivo externo '%s', y pilas solo admite "
+                        "tilesets incluidos en el mapa." %(elemento.get('source')))
+
+            if imagen is None:
+                raise IOError("El tileset no tiene una imagen de bloques.")
+
+            mapa.imagen = imagen.get('source')
+            mapa.ancho_imagen = int(imagen.get('width'))
+            mapa.alto_imagen = int(imagen.get('height'))
+        elif elemento.tag == 'layer':
+            datos = elemento.find('data')
+            bloques = decodificar_capa(datos, mapa.columnas * mapa.filas)
+            mapa.capas.append((elemento.get('name', ''), bloques))
+            elemento.clear()
+
+    _verificar_bloques(mapa)
+    return mapa
+
+def _verificar_bloques(mapa):
+    "Verifica que todos los bloques de las capas pertenezcan al tileset del mapa."
+    ultimo_gid = None
+
+    if mapa.ancho_cuadro and mapa.alto_cuadro and mapa.ancho_imagen:
+        cantidad = (mapa.ancho_imagen / mapa.ancho_cuadro) * (mapa.alto_imagen / mapa.alto_cuadro)
+        ultimo_gid = mapa.primer_gid + cantidad - 1
+
+    for (nombre, bloques) in mapa.capas:
+        usados = [x for x in set(bloques) if x]
+
+        if not usados:
+            continue
+
+        if min(usados) < mapa.primer_gid or (ultimo_gid is not None and max(usados) > ultimo_gid):
+            raise IOError("La capa '%s' usa bloques que no pertenecen al tileset (de %d a %s)." %(
+                    nombre, mapa.primer_gid, ultimo_gid))
+
+def decodificar_capa(datos, cantidad):
+    "Convierte el elemento 'data' de una capa en un array('H') de numeros de bloque."
+    codificacion = datos.get('encoding')
+    compresion = datos.get('compression')
+
+    if codificacion == 'csv':
+        numeros = [int(x) & MASCARA_DE_BLOQUE for x in datos.text.replace('\n', '').split(',') if x.strip()]
+    elif codificacion == 'base64':
+        crudos = base64.b64decode(datos.text.strip())
+
+        if compresion == 'zlib':
+            crudos = zlib.decompress(crudos)
+        elif compresion == 'gzip':
+            crudos = zlib.decompress(crudos, 16 + zlib.MAX_WBITS)
+        elif compresion:
+            raise IOError("La compresion '%s' no esta soportada." %(compresion))
+
+        if len(crudos) % 4:
+            raise IOError("La capa tiene datos incompletos.")
+
+        numeros = array(TIPO_DE_32_BITS)
+        numeros.fromstring(crudos)
+
+        if sys.byteorder == 'big':
+            numeros.byteswap()
+
+        for x in xrange(len(numeros)):
+            numeros[x] &= MASCARA_DE_BLOQUE
+    elif codificacion is None:
+        numeros = [int(x.get('gid', 0)) & MASCARA_DE_BLOQUE for x in datos.findall('tile')]
+    else:
+        raise IOError("La codificacion '%s' no esta soportada." %(codificacion))
+
+    if len(numeros) != cantidad:
+        raise IOError("La capa tiene %d bloques, y se esperaban %d." %(len(numeros), cantidad))
+
+    try:
+        return array('H', numeros)
+    except OverflowError:
+        raise IOError("El mapa usa numeros de bloque mayores a 65535.")
+
+
+def guardar_cache(mapa, ruta, modificacion, tamano):
+    """Guarda el mapa en formato binario, recordando la fecha y tamaño del archivo original.
+
+    Se escribe un archivo temporal que luego se renombra, asi un corte a
+    mitad de camino nunca deja una cache incompleta.
+    """
+    textos = [mapa.imagen or ''] + [nombre for (nombre, bloques) in mapa.capas]
+    partes = [struct.pack(CABECERA_DE_LA_CACHE, FIRMA_DE_LA_CACHE, VERSION_DE_LA_CACHE,
+            modificacion, tamano, mapa.columnas, mapa.filas, mapa.ancho_cuadro, mapa.alto_cuadro,
+            mapa.ancho_imagen, mapa.alto_imagen, mapa.primer_gid, len(mapa.capas))]
+
+    for texto in textos:
+        texto = texto.encode('utf-8')
+        partes.append(struct.pack('<I', len(texto)) + texto)
+
+    for (nombre, bloques) in mapa.capas:
+        partes.append(_a_little_endian(bloques).tostring())
+
+    descriptor, temporal = tempfile.mkstemp(prefix='.', suffix=EXTENSION_DE_LA_CACHE,
+            dir=os.path.dirname(os.path.abspath(ruta)))
+
+    try:
+        archivo = os.fdopen(descriptor, 'wb')
+
+        try:
+            archivo.write(''.join(partes))
+        finally:
+            archivo.close()
+
+        # mkstemp crea el archivo solo para el usuario, pero la cache
+        # tiene que quedar con los permisos de cualquier otro archivo.
+        os.chmod(temporal, 0666 & ~_obtener_umask())
+
+        try:
+            os.rename(temporal, ruta)
+        except OSError:
+            # En windows no se puede renombrar sobre un archivo existente.
+            os.remove(ruta)
+            os.rename(temporal, ruta)
+    except:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+        raise
+
+def _obtener_umask():
+    "Retorna la mascara de permisos del proceso (solo se puede leer cambiandola)."
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+def leer_cache(ruta, modificacion, tamano):
+    """Lee un mapa guardado con ``guardar_cache``.
+
+    Retorna None si la cache no existe, si no corresponde a la
+    version actual del archivo original o si esta incompleta.
+    """
+    try:
+        archivo = open(ruta, 'rb')
+    except IOError:
+        return None
+
+    try:
+        datos = archivo.read()
+    finally:
+        archivo.close()
+
+    try:
+        cabecera = struct.unpack_from(CABECERA_DE_LA_CACHE, datos)
+    except struct.error:
+        return None
+
+    (firma, version, modificacion_guardada, tamano_guardado, columnas, filas, ancho_cuadro,
+            alto_cuadro, ancho_imagen, alto_imagen, primer_gid, cantidad_de_capas) = cabecera
+
+    if (firma, version, modificacion_guardada, tamano_guardado) != (FIRMA_DE_LA_CACHE,
+            VERSION_DE_LA_CACHE, modificacion, tamano):
+        return None
+
+    mapa = MapaTiled()
+    mapa.columnas, mapa.filas = columnas, filas
+    mapa.ancho_cuadro, mapa.alto_cuadro = ancho_cuadro, alto_cuadro
+    mapa.ancho_imagen, mapa.alto_imagen = ancho_imagen, alto_imagen
+    mapa.primer_gid = primer_gid
+
+    posicion = struct.calcsize(CABECERA_DE_LA_CACHE)
+    textos = []
+
+    try:
+        for x in range(cantidad_de_capas + 1):
+            (largo,) = struct.unpack_from('<I', datos, posicion)
+            posicion += 4
+            textos.append(datos[posicion:posicion + largo].decode('utf-8'))
+            posicion += largo
+    except (struct.error, UnicodeDecodeError):
+        return None
+
+    mapa.imagen = textos[0] or None
+    largo = columnas * filas * 2
+
+    # Cada capa tiene que tener un bloque por celda.
+    if len(datos) != posicion + largo * cantidad_de_capas:
+        return None
+
+    for nombre in textos[1:]:
+        bloques = array('H')
+        bloques.fromstring(datos[posicion:posicion + largo])
+        mapa.capas.append((nombre, _a_little_endian(bloques)))
+        posicion += largo
+
+    return mapa
+
+def _a_little_endian(bloques):
+    "La cache siempre se guarda en little endian (intercambiar bytes es su propia inversa)."
+    if sys.byteorder == 'big':
+        bloques = array('H', bloques)
+        bloques.byteswap()
+
+    return bloques
+
+
+def agrupar_en_rectangulos(solidos, columnas, filas):
+    """Agrupa las celdas solidas de una grilla en rectangulos.
+
+    ``solidos`` tiene un valor por celda (fila por fila), y cualquier
+    valor verdadero indica una celda solida. Retorna una lista de
+    tuplas (fila, columna, ancho, alto), medidas en celdas, que cubren
+    todas las celdas solidas sin superponerse.
+
+    Cada rectangulo se extiende primero a lo ancho y luego hacia abajo,
+    asi los pisos quedan formados por una sola figura.
+    """
+    pendientes = bytearray(1 if x else 0 for x in solidos)
+    rectangulos = []
+
+    for fila in range(filas):
+        inicio = fila * columnas
+        columna = 0
+
+        while columna < columnas:
+            if not pendientes[inicio + columna]:
+                columna += 1
+                continue
+
+            ancho = 1
+
+            while columna + ancho < columnas and pendientes[inicio + columna + ancho]:
+                ancho += 1
+
+            alto = 1
+
+            while fila + alto < filas:
+                siguiente = (fila + alto) * columnas + columna
+
+                if not all(pendientes[siguiente:siguiente + ancho]):
+                    break
+
+                alto += 1
+
+            for f in range(fila, fila + alto):
+                posicion = f * columnas + columna
+                pendientes[posicion:posicion + ancho] = bytearray(ancho)
+
+            rectangulos.append((fila, columna, ancho, alto))
+            columna += ancho
+
+    return rectangulos
@@ -0,0 +1,170 @@
+# -*- encoding: utf-8 -*-
+# Pilas engine - A video game framework.
+#
+# Copyright 2010 - Hugo Ruscitti
+# License: LGPLv3 (see http://www.gnu.org/licenses/lgpl.html)
+#
+# Website - http://www.pilas-engine.com.ar
+
+import os
+import json
+import atexit
+import thread
+from array import array
+
+
+class Trazador(object):
+    """Registra cuanto dura cada fase, evento, tarea y paso de fisica.
+
+    Cada traza es un intervalo con nombre y categoria que se guarda en
+    un buffer circular de ``capacidad`` posiciones, reservado al
+    iniciar. Si el buffer se llena se pisan las trazas mas viejas.
+
+    Las trazas se guardan en el formato de eventos de Chrome, que se
+    puede abrir en ``chrome://tracing`` o en https://ui.perfetto.dev
+    para ver la sesion de juego como una linea de tiempo.
+
+    Los puntos de medicion usan ``comenzar`` y ``terminar``, que no
+    hacen nada mientras el trazador esta detenido:
+
+        >>> desde = trazador.comenzar()
+        >>> ...
+        >>> if desde is not None:
+        ...     trazador.terminar('nombre', 'categoria', desde)
+    """
+
+    def __init__(self, capacidad=100000):
+        self.capacidad = capacidad
+        self.habilitado = False
+        self.cantidad = 0
+        self.ahora = None
+        self._origen = 0
+        self._nombres = None
+
+    def iniciar(self, capacidad=None, reloj=None):
+        "Reserva el buffer y comienza a registrar trazas."
+        if reloj is None:
+            from pilas import reloj as modulo_reloj
+            reloj = modulo_reloj.monotonico
+
+        self.capacidad = capacidad or self.capacidad
+        self.ahora = reloj
+        self._origen = reloj()
+        self.cantidad = 0
+        self._nombres = [None] * self.capacidad
+        self._categorias = [None] * self.capacidad
+        self._hilos = array('l', [0]) * self.capacidad
+        self._inicios = array('d', [0.0]) * self.capacidad
+        self._duraciones = array('d', [0.0]) * self.capacidad
+        self.habilitado = True
+
+    def detener(self):
+        "Deja de registrar trazas, pero conserva las que ya se registraron."
+        self.habilitado = False
+
+    def comenzar(self):
+        "Retorna el instante actual, o None si el trazador esta detenido."
+        if self.habilitado:
+            return self.ahora()
+
+        return None
+
+    def terminar(self, nombre, categoria, desde):
+        "Registra una traza que comenzo en ``desde`` y termina ahora. Retorna el instante actual."
+        ahora = self.ahora()
+        self.agregar(nombre, categoria, desde, ahora)
+        return ahora
+
+    def agregar(self, nombre, categoria, inicio, fin):
+        "Registra una traza entre los instantes ``inicio`` y ``fin`` (en segundos)."
+        if not self.habilitado:
+            return
+
+        posicion = self.cantidad % self.capacidad
+        self._nombres[posicion] = nombre
+        self._categorias[posicion] = categoria
+        self._hilos[posicion] = thread.get_ident()
+        self._inicios[posicion] = inicio - self._origen
+        self._duraciones[posicion] = fin - inicio
+        self.cantidad += 1
+
+    def obtener_descartadas(self):
+        "Retorna cuantas trazas se pisaron por falta de lugar en el buffer."
+        return max(self.cantidad - self.capacidad, 0)
+
+    def obtener_eventos(self):
+        "Retorna las trazas registradas como eventos de Chrome, de la mas vieja a la mas nueva."
+        if not self._nombres:
+            return []
+
+        cantidad = min(self.cantidad, self.capacidad)
+        primero = self.cantidad - cantidad
+        proceso = os.getpid()
+        eventos = []
+
+        for x in range(primero, self.cantidad):
+            posicion = x % self.capacidad
+            eventos.append({
+                'name': self._nombres[posicion],
+                'cat': self._categorias[posicion],
+                'ph': 'X',
+                'ts': self._inicios[posicion] * 1e6,
+                'dur': self._duraciones[posicion] * 1e6,
+                'pid': proceso,
+                'tid': self._hilos[posicion],
+            })
+
+        return eventos
+
+    def guardar(self, ruta):
+        "Escribe las trazas en ``ruta`` con el formato JSON de eventos de Chrome."
+        datos = {
+            'traceEvents': self.obtener_eventos(),
+            'displayTimeUnit': 'ms',
+            'otherData': {'trazas_descartadas': self.obtener_descartadas()},
+        }
+
+        archivo = open(ruta, 'w')
+
+        try:
+            json.dump(datos, archivo)
+        finally:
+            archivo.close()
+
+
+trazador = Trazador()
+_ruta_al_salir = []
+
+def iniciar(ruta=None, capacidad=None):
+    """Comienza a registrar trazas.
+
+    Si se indica ``ruta`` las trazas se guardan en ese archivo al
+    cerrar el programa. Tambien se puede llamar a ``guardar`` en
+    cualquier momento.
+
+    Los juegos que inicia ``pilas_host`` terminan con ``os._exit``, que
+    no ejecuta las funciones de ``atexit``, asi que el host llama a
+    ``_guardar_al_salir`` antes de terminar cada juego.
+    """
+    trazador.iniciar(capacidad)
+
+    if ruta:
+        if not _ruta_al_salir:
+            atexit.register(_guardar_al_salir)
+
+        _ruta_al_salir[:] = [ruta]
+
+def detener():
+    "Deja de registrar trazas."
+    trazador.detener()
+
+def guardar(ruta):
+    "Escribe las trazas registradas hasta el momento en ``ruta``."
+    trazador.guardar(ruta)
+
+def _guardar_al_salir():
+    if _ruta_al_salir:
+        try:
+            guardar(_ruta_al_salir[0])
+        except (IOError, OSError) as e:
+            print "No se pudieron guardar las trazas:", e
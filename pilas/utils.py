@@ -14,6 +14,7 @@ import math
 
 import pilas
 import xmlreader
+import recursos
 
 
 PATH = os.path.dirname(os.path.abspath(__file__))
@@ -48,17 +49,16 @@ def obtener_ruta_al_recurso(ruta):
     Los archivos de recursos (como las imagenes) se buscan en varios
     directorios (ver docstring de image.load), así que esta
     función intentará dar con el archivo en cuestión.
-    """
-
-    dirs = ['./', os.path.dirname(sys.argv[0]), 'data', PATH, PATH + '/data']
 
+    Los directorios se consultan a través de un índice (ver el
+    módulo ``pilas.recursos``), así que el disco solo se lee la
+    primera vez que se busca en cada directorio.
+    """
 
-    for x in dirs:
-        full_path = os.path.join(x, ruta)
-        #DEBUG: print "buscando en: '%s'" %(full_path)
+    full_path = recursos.buscar(ruta)
 
-        if os.path.exists(full_path):
-            return full_path
+    if full_path:
+        return full_path
 
     # Si no ha encontrado el archivo lo reporta.
     raise IOError("El archivo '%s' no existe." %(ruta))
@@ -103,6 +103,28 @@ def crear_juego():
     print "Ingresa en el directorio y econtrarás los archivos iniciales del juego."
 
 
+def crear_atlas(directorio):
+    "Agrupa las imagenes de un directorio en un atlas (ver pilas.motores.atlas)."
+    from PyQt4 import QtGui
+    from pilas.motores import atlas
+
+    app = QtGui.QApplication(sys.argv)
+    ruta_base = os.path.join(directorio, 'atlas')
+    resultado = atlas.construir(directorio, ruta_base)
+
+    print "Se ha creado el archivo '%s.atlas':" %(ruta_base)
+    print resultado
+
+
+def crear_paquete(directorio):
+    "Agrupa los archivos de un directorio en un paquete (ver pilas.paquete)."
+    from pilas import paquete
+
+    resultado = paquete.construir(directorio)
+    print "Se ha creado el archivo '%s':" %(resultado.ruta)
+    print resultado
+
+
 def interpolable(f):
     "Decorador que se aplica a un metodo para que permita animaciones de interpolaciones."
 
@@ -0,0 +1,208 @@
+"""
+
+A resident process that keeps PyQt, pilas and pygame imported.
+
+The activity connects to it over a local socket and asks for a pilas
+window embedded into an X11 window. The host forks a child for every
+request, so the child starts with all the modules already imported
+and only has to create the QApplication and the window.
+
+Protocol (one line per connection):
+
+    embed <version> <window id> <screen width> <screen height>  ->  ok <pid>
+    ping <version>                                              ->  pong
+
+'version' identifies the installed bundle (see bundle_version). If it
+does not match the code the host imported, the host answers 'restart'
+and exits, so an updated bundle never runs with stale modules. The
+host also exits after IDLE_TIMEOUT seconds without requests.
+
+"""
+
+import os
+import sys
+import signal
+import socket
+import logging
+import tempfile
+
+SOCKET_PATH = os.path.join(tempfile.gettempdir(), 'pilas-host-%d.sock' % os.getuid())
+BUNDLE_PATH = os.path.dirname(os.path.abspath(__file__))
+
+# Files that change whenever the bundle is installed or updated.
+VERSION_FILES = ['activity/activity.info', 'pilas_plug.py', 'pilas/__init__.py',
+                 'pilas/pilasversion.py']
+
+# Seconds a client has to send its request line.
+REQUEST_TIMEOUT = 2.0
+
+# Seconds without requests before the host exits.
+IDLE_TIMEOUT = 30 * 60
+
+
+def bundle_version():
+    """Return a string that changes when the bundle files are updated."""
+    mtimes = []
+
+    for name in VERSION_FILES:
+        try:
+            mtimes.append(int(os.path.getmtime(os.path.join(BUNDLE_PATH, name))))
+        except OSError:
+            mtimes.append(0)
+
+    return '-'.join([str(x) for x in mtimes])
+
+
+def _send(line, timeout):
+    """Send a request to the host and return its answer, or None."""
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.settimeout(timeout)
+
+    try:
+        client.connect(SOCKET_PATH)
+        client.sendall(line + '\n')
+        return client.makefile().readline().strip()
+    except (socket.error, socket.timeout):
+        return None
+    finally:
+        client.close()
+
+
+def is_running(timeout=0.5):
+    return _send('ping %s' % bundle_version(), timeout) == 'pong'
+
+
+def request_embed(window_id, screen_width, screen_height, timeout=1.0):
+    """Ask the host for a pilas window embedded into 'window_id'.
+
+    Returns the pid of the process that shows the window, or None if
+    the host is not running (or was running an older bundle).
+    """
+    answer = _send('embed %s %d %d %d' % (bundle_version(), window_id,
+                                          screen_width, screen_height), timeout)
+
+    if answer and answer.startswith('ok '):
+        return int(answer.split()[1])
+
+    return None
+
+
+def preload():
+    """Import everything a pilas window needs, before any fork."""
+    import pilas_plug
+    import pilas
+    from pilas.motores import motor_qt
+
+    # Touch the lazy modules so they are imported now.
+    pilas.Mundo, pilas.actores.Actor, pilas.fondos, pilas.interfaz
+
+    try:
+        import pygame
+    except ImportError:
+        pass
+
+    return pilas_plug
+
+
+def serve():
+    if is_running():
+        logging.info("A pilas host is already running")
+        return
+
+    if os.path.exists(SOCKET_PATH):
+        os.unlink(SOCKET_PATH)
+
+    version = bundle_version()
+    pilas_plug = preload()
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(SOCKET_PATH)
+    server.listen(5)
+    server.settimeout(IDLE_TIMEOUT)
+
+    # Children are reaped automatically.
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    logging.info("pilas host listening on %s", SOCKET_PATH)
+
+    try:
+        while _serve_one(server, version, pilas_plug):
+            pass
+    finally:
+        server.close()
+
+        if os.path.exists(SOCKET_PATH):
+            os.unlink(SOCKET_PATH)
+
+
+def _serve_one(server, version, pilas_plug):
+    """Answer one request. Returns False when the host has to exit."""
+    try:
+        connection, address = server.accept()
+    except socket.timeout:
+        logging.info("pilas host idle for %d seconds, exiting", IDLE_TIMEOUT)
+        return False
+
+    # A client that never sends its line must not block the others.
+    connection.settimeout(REQUEST_TIMEOUT)
+
+    try:
+        request = connection.makefile().readline().split()
+
+        if len(request) < 2 or request[0] not in ('ping', 'embed'):
+            return True
+
+        if request[1] != version:
+            logging.info("The bundle was updated, restarting the pilas host")
+            connection.sendall('restart\n')
+            return False
+
+        if request[0] == 'ping':
+            connection.sendall('pong\n')
+        elif len(request) == 5:
+            pid = os.fork()
+
+            if pid == 0:
+                _run_child(server, connection, pilas_plug, request[2:])
+    except (socket.error, socket.timeout) as e:
+        logging.warning("pilas host request failed: %s", e)
+    finally:
+        connection.close()
+
+    return True
+
+
+def _run_child(server, connection, pilas_plug, arguments):
+    """Run a game in the forked child. Never returns to the host loop."""
+    code = 1
+
+    try:
+        # Games may wait on their own subprocesses, which fails with
+        # ECHILD under the SIG_IGN disposition inherited from the host.
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        server.close()
+        connection.sendall('ok %d\n' % os.getpid())
+        connection.close()
+        code = pilas_plug.run(*[int(x) for x in arguments]) or 0
+    except SystemExit as e:
+        code = e.code or 0
+
+        if not isinstance(code, int):
+            logging.error("The pilas game exited: %s", code)
+            code = 1
+    except BaseException:
+        logging.exception("The pilas game failed")
+        code = 1
+    finally:
+        # os._exit skips atexit, so save the pending traces here.
+        try:
+            from pilas import trazas
+            trazas._guardar_al_salir()
+        except BaseException:
+            logging.exception("Could not save the pilas traces")
+
+        os._exit(code)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    serve()
@@ -2,7 +2,9 @@
 
 This command provides a plug to embed Qt.
 
-The X11 window ID is passed as the unique parameter.
+The X11 window ID and the screen size are passed as parameters. The
+'run' function is also used by pilas_host.py to embed from a warm
+process.
 
 """
 
@@ -25,20 +27,26 @@ from PyQt4.QtGui import QX11EmbedWidget
 import pilas
 from pilas import aplicacion
 
-app = QApplication(sys.argv)
 
-parent_window_id = int(sys.argv[1])
-screen_width = int(sys.argv[2])
-screen_height = int(sys.argv[3])
+def run(parent_window_id, screen_width, screen_height):
+    """Embed a pilas window into the X11 window 'parent_window_id'.
 
-window = QX11EmbedWidget()
-window.embedInto(parent_window_id)
-window.show()
+    Returns when the window is closed.
+    """
+    app = QApplication(sys.argv)
 
-hbox = QHBoxLayout(window)
-pilas_height = 2.0 / 3 * screen_height
-pilas_width = 2.0 / 3 * screen_width
-pilas_widget = aplicacion.Window(parent=window, pilas_width=pilas_width, pilas_height=pilas_height)
-hbox.addWidget(pilas_widget)
+    window = QX11EmbedWidget()
+    window.embedInto(parent_window_id)
+    window.show()
 
-sys.exit(app.exec_())
+    hbox = QHBoxLayout(window)
+    pilas_height = 2.0 / 3 * screen_height
+    pilas_width = 2.0 / 3 * screen_width
+    pilas_widget = aplicacion.Window(parent=window, pilas_width=pilas_width, pilas_height=pilas_height)
+    hbox.addWidget(pilas_widget)
+
+    return app.exec_()
+
+
+if __name__ == '__main__':
+    sys.exit(run(int(sys.argv[1]), int(sys.argv[2]), int(sys.argv[3])))